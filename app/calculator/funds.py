@@ -0,0 +1,228 @@
+"""
+Multifondos de las AFP (Fondos A a E) y proyección de todos los fondos en una sola pasada.
+
+Cada fondo tiene una serie de rentabilidades mensuales (por defecto, constante desde un
+supuesto de rentabilidad real anual por fondo). Además de elegir un fondo fijo se puede
+proyectar con la asignación por defecto del sistema, que cambia de fondo según la edad.
+Las sumas acumuladas del log-crecimiento dan el factor de capitalización de cualquier mes hasta
+la jubilación, así que todos los fondos se proyectan juntos con operaciones vectorizadas.
+"""
+import csv
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    PENSION_RESULT_CACHE,
+    REFORM_RATE_SCHEDULE,
+    _Accumulation,
+    _post_reform_result,
+    _pre_reform_result,
+    calculate_pension_comparison,
+    get_months_from_reform_start,
+    pension_cache_key,
+)
+from app.calculator.rate_schedule import RateSchedule
+from app.calculator.result_cache import ResultCache
+from app.calculator.scenario import ScenarioParams
+
+FUNDS = ("A", "B", "C", "D", "E")
+GLIDE_PATH = "por_defecto"            # Asignación por defecto según edad (cambia de fondo al envejecer)
+FUND_OPTIONS = FUNDS + (GLIDE_PATH,)
+
+# Supuestos de rentabilidad real anual de largo plazo por fondo (de más a menos riesgoso).
+# El Fondo C usa el rendimiento fijo con que la calculadora proyecta por defecto.
+FUND_ANNUAL_RETURNS = {"A": 0.045, "B": 0.039, "C": 0.0311, "D": 0.025, "E": 0.02}
+
+# Asignación por defecto: (edad límite exclusiva, fondo) por género
+DEFAULT_GLIDE_PATH = {
+    "M": ((36, "B"), (56, "C"), (math.inf, "D")),
+    "F": ((36, "B"), (51, "C"), (math.inf, "D")),
+}
+
+FUND_HORIZON_MONTHS = 1200            # Meses cubiertos por las series (100 años)
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class FundReturns:
+    """
+    Log-crecimiento mensual de cada fondo (fondos × meses desde hoy), de solo lectura.
+    Más allá del final de la serie se repite su último mes.
+    """
+    version: str
+    log_growth: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_annual_rates(cls,
+                          annual_returns: dict = FUND_ANNUAL_RETURNS,
+                          months: int = FUND_HORIZON_MONTHS) -> "FundReturns":
+        """
+        Series constantes a partir de la rentabilidad anual supuesta de cada fondo.
+        """
+        monthly = np.array([math.log1p(annual_returns[fund]) / 12 for fund in FUNDS])
+        log_growth = np.repeat(monthly[:, None], months, axis=1)
+        label = "-".join(f"{fund}{annual_returns[fund]:g}" for fund in FUNDS)
+        return cls(version=f"anual-{label}", log_growth=_freeze(log_growth))
+
+    @classmethod
+    def from_csv(cls,
+                 path: Path,
+                 annual_returns: dict = FUND_ANNUAL_RETURNS,
+                 months: int = FUND_HORIZON_MONTHS) -> "FundReturns":
+        """
+        Series mensuales desde un CSV con columnas A..E (rentabilidad del mes en decimal, una
+        fila por mes a partir del actual). Los meses posteriores a la serie usan el supuesto anual.
+        """
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = [[float(row[fund]) for fund in FUNDS] for row in csv.DictReader(file)]
+        if not rows:
+            raise ValueError(f"La serie de rentabilidades está vacía: {path}")
+        series = np.log1p(np.array(rows).T[:, :months])
+        log_growth = cls.from_annual_rates(annual_returns, months).log_growth.copy()
+        log_growth[:, :series.shape[1]] = series
+        return cls(version=f"serie-{Path(path).stem}-{series.shape[1]}m", log_growth=_freeze(log_growth))
+
+
+DEFAULT_FUND_RETURNS = FundReturns.from_annual_rates()
+
+
+def default_fund(gender: str, age: float) -> str:
+    """Fondo de la asignación por defecto para una edad."""
+    return next(fund for limit, fund in DEFAULT_GLIDE_PATH[gender.upper()] if age < limit)
+
+
+def _fund_indices(option: str, current_age: float, gender: str, months: int) -> np.ndarray:
+    """Fondo (índice en FUNDS) en que está el saldo cada mes hasta la jubilación."""
+    if option != GLIDE_PATH:
+        return np.full(months, FUNDS.index(option))
+    ages = current_age + np.arange(months) / 12
+    limits = [limit for limit, _ in DEFAULT_GLIDE_PATH[gender.upper()]]
+    funds = np.array([FUNDS.index(fund) for _, fund in DEFAULT_GLIDE_PATH[gender.upper()]])
+    return funds[np.searchsorted(limits, ages, side="right")]
+
+
+def compare_funds(current_age: float,
+                  retirement_age: float,
+                  current_balance: float,
+                  monthly_salary: float,
+                  gender: str,
+                  options: tuple = FUND_OPTIONS,
+                  fund_returns: FundReturns = DEFAULT_FUND_RETURNS,
+                  schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                  scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Proyecta ambos sistemas para cada opción de fondo (letra o GLIDE_PATH) en una sola pasada.
+    Sueldos y tasas del calendario se calculan una vez; sólo la capitalización cambia por fondo.
+
+    Returns:
+        dict: opción -> (resultado pre-reforma, resultado post-reforma), como calculate_pension_comparison
+    """
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = int((retirement_age - current_age) * 12)
+    months = max(months_to_retirement, 0)
+
+    elapsed = np.arange(months)
+    salary = monthly_salary * scenario.quarterly_salary_factor ** (elapsed // 3)
+    individual = salary * schedule.window("individual", current_month_index, months)
+    women_compensation = salary * schedule.window("women_compensation", current_month_index, months)
+    fapp = salary * schedule.window("fapp", current_month_index, months)
+
+    # Log-crecimiento acumulado de cada opción (opciones × meses + 1)
+    month_positions = np.minimum(elapsed, fund_returns.log_growth.shape[1] - 1)
+    path_growth = np.stack([fund_returns.log_growth[_fund_indices(option, current_age, gender, months),
+                                                    month_positions]
+                            for option in options])
+    cumulative = np.concatenate((np.zeros((len(options), 1)), np.cumsum(path_growth, axis=1)), axis=1)
+    # Factor con que un aporte de cada mes llega a la jubilación
+    to_retirement = np.exp(cumulative[:, -1:] - cumulative[:, :-1])
+
+    compounded_salary = to_retirement @ salary
+    compounded_individual = to_retirement @ individual
+    balance_growth = np.exp(cumulative[:, -1])
+    compounded_FAPP = float(fapp @ scenario.fapp_growth ** (months - elapsed))
+    total_salary = float(salary.sum())
+    total_individual = float(individual.sum())
+    total_women_compensation = float(women_compensation.sum())
+
+    results = {}
+    for p, option in enumerate(options):
+        accumulation = _Accumulation(total_salary, float(compounded_salary[p]), total_individual,
+                                     total_women_compensation, float(compounded_individual[p]), compounded_FAPP)
+        growth = float(balance_growth[p])
+        pre = _pre_reform_result(current_age, retirement_age, current_balance, gender, months_to_retirement,
+                                 accumulation.total_salary, accumulation.compounded_salary, scenario, growth)
+        post = _post_reform_result(current_age, retirement_age, current_balance, gender,
+                                   months_to_retirement, current_month_index, accumulation, scenario, growth)
+        results[option] = (pre, post)
+    return results
+
+
+def fund_comparison_cache_key(current_age: float,
+                              retirement_age: float,
+                              current_balance: float,
+                              monthly_salary: float,
+                              gender: str,
+                              options: tuple = FUND_OPTIONS,
+                              fund_returns: FundReturns = DEFAULT_FUND_RETURNS,
+                              schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                              scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple:
+    """Clave con que cached_fund_comparison guarda el resultado en el cache."""
+    return ("fondos",) + pension_cache_key(current_age, retirement_age, current_balance, monthly_salary, gender) + (
+        tuple(options), fund_returns.version, schedule.version, scenario)
+
+
+def cached_fund_comparison(current_age: float,
+                           retirement_age: float,
+                           current_balance: float,
+                           monthly_salary: float,
+                           gender: str,
+                           options: tuple = FUND_OPTIONS,
+                           fund_returns: FundReturns = DEFAULT_FUND_RETURNS,
+                           schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                           scenario: ScenarioParams = DEFAULT_SCENARIO,
+                           cache: ResultCache = PENSION_RESULT_CACHE) -> dict:
+    """
+    Igual que compare_funds, pero memoriza el resultado (misma clave de perfil que
+    cached_pension_comparison, más las opciones y la versión de las series de los fondos).
+    El dict devuelto se comparte entre solicitudes: no modificarlo.
+    """
+    options = tuple(options)
+    key = fund_comparison_cache_key(current_age, retirement_age, current_balance, monthly_salary, gender,
+                                    options, fund_returns, schedule, scenario)
+    return cache.get_or_compute(key, lambda: compare_funds(
+        current_age, retirement_age, current_balance, monthly_salary, gender.upper(), options,
+        fund_returns, schedule, scenario))
+
+
+def compare_funds_and_systems(current_age: float,
+                              retirement_age: float,
+                              current_balance: float,
+                              monthly_salary: float,
+                              gender: str,
+                              include_systems: bool = True,
+                              schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                              scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[dict, tuple | None]:
+    """
+    Proyecta todas las opciones de fondo y, si `include_systems`, también ambos sistemas con el
+    rendimiento fijo, en una sola llamada (sin cache) para enviarla completa al pool de procesos.
+
+    Returns:
+        tuple: (compare_funds, calculate_pension_comparison o None)
+    """
+    gender = gender.upper()
+    fund_results = compare_funds(current_age, retirement_age, current_balance, monthly_salary, gender,
+                                 schedule=schedule, scenario=scenario)
+    comparison = None
+    if include_systems:
+        comparison = calculate_pension_comparison(current_age, retirement_age, current_balance, monthly_salary,
+                                                  gender, schedule, scenario)
+    return fund_results, comparison
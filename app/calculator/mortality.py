@@ -0,0 +1,209 @@
+import functools
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Expectativas de vida que usa la calculadora: la pensión se paga hasta estas edades
+LIFE_EXPECTANCY = {"M": 86.6, "F": 90.8}
+
+GENDERS = ("M", "F")
+MAX_TABLE_AGE = 110                    # Edad máxima de la tabla (años)
+DISCOUNT_RATES = tuple(np.round(np.arange(0, 0.1001, 0.005), 3))  # Tasas técnicas anuales precalculadas
+GOMPERTZ_DISPERSION = 10.0             # Dispersión (años) de la ley de Gompertz de la tabla actuarial
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class AnnuityTable:
+    """
+    Factores de renta vitalicia precalculados por (género, edad en meses, tasa técnica).
+
+    El factor es el valor presente, en meses de pensión, de pagar $1 al inicio de cada mes
+    mientras el pensionado viva: la pensión mensual es saldo / factor. La tabla se construye una
+    sola vez (al importar) como un array contiguo de solo lectura y cada consulta interpola
+    linealmente en edad y tasa, en O(1).
+
+    `truncate` reproduce la calculadora original, que usa meses enteros: int((expectativa - edad) * 12).
+    Las tablas de ANNUITY_TABLES tienen `name` y se envían a otros procesos sólo por nombre.
+    """
+    version: str
+    truncate: bool
+    discount_rates: np.ndarray = field(repr=False)
+    factors: np.ndarray = field(repr=False)    # géneros × tasas × meses de edad (0 .. MAX_TABLE_AGE * 12)
+    name: str = ""
+
+    def __reduce__(self):
+        if self.name:
+            return get_annuity_table, (self.name,)
+        return AnnuityTable, (self.version, self.truncate, self.discount_rates, self.factors)
+
+    @classmethod
+    def legacy(cls, life_expectancy: dict = LIFE_EXPECTANCY, name: str = "") -> "AnnuityTable":
+        """
+        Tabla equivalente al cálculo original: se paga hasta la expectativa de vida fija del
+        género, sin mortalidad ni descuento (todas las tasas dan el mismo factor).
+        """
+        ages = np.arange(MAX_TABLE_AGE * 12 + 1) / 12
+        factors = np.array([[(life_expectancy[gender] - ages) * 12] for gender in GENDERS])
+        return cls(version="expectativa-fija/v1",
+                   truncate=True,
+                   discount_rates=_freeze(np.zeros(1)),
+                   factors=_freeze(factors),
+                   name=name)
+
+    @classmethod
+    def gompertz(cls,
+                 life_expectancy: dict = LIFE_EXPECTANCY,
+                 dispersion: float = GOMPERTZ_DISPERSION,
+                 discount_rates: tuple = DISCOUNT_RATES,
+                 name: str = "") -> "AnnuityTable":
+        """
+        Tabla actuarial con mortalidad de Gompertz, calibrada por género para que a los 65 años
+        la esperanza de vida coincida con `life_expectancy`. El factor descuenta cada pago por la
+        probabilidad de seguir vivo y por la tasa técnica.
+        """
+        months = np.arange(MAX_TABLE_AGE * 12 + 1)
+        rates = np.asarray(discount_rates, dtype=np.float64)
+        factors = np.empty((len(GENDERS), rates.size, months.size))
+        for g, gender in enumerate(GENDERS):
+            modal_age = _calibrate_modal_age(65.0, life_expectancy[gender] - 65.0, dispersion)
+            survival = _gompertz_survival(months / 12, modal_age, dispersion)
+            for r, rate in enumerate(rates):
+                factors[g, r] = _annuity_factors(survival, rate)
+        return cls(version=f"gompertz-b{dispersion:g}/v1",
+                   truncate=False,
+                   discount_rates=_freeze(rates),
+                   factors=_freeze(factors),
+                   name=name)
+
+    def _position(self, retirement_age: float, discount_rate: float) -> tuple[int, float, int, float]:
+        age = min(max(retirement_age * 12, 0.0), self.factors.shape[2] - 1.0)
+        age_index = min(int(age), self.factors.shape[2] - 2)
+        rates = self.discount_rates
+        if rates.size == 1:
+            return age_index, age - age_index, 0, 0.0
+        step = rates[1] - rates[0]
+        rate = min(max((discount_rate - rates[0]) / step, 0.0), rates.size - 1.0)
+        rate_index = min(int(rate), rates.size - 2)
+        return age_index, age - age_index, rate_index, rate - rate_index
+
+    def horizon(self, gender: str) -> float:
+        """
+        Edad de jubilación máxima de la tabla: la última edad de la grilla con al menos un mes de
+        pensión. Después de ella el factor no alcanza para convertir el saldo en pensión.
+        """
+        months = np.flatnonzero(self.factors[GENDERS.index(gender.upper()), 0] >= 1)
+        return float(months[-1] / 12) if months.size else 0.0
+
+    def factor(self, gender: str, retirement_age: float, discount_rate: float = 0.0) -> float:
+        """
+        Factor de renta (meses de pensión equivalentes) para jubilar a `retirement_age`.
+        """
+        table = self.factors[GENDERS.index(gender.upper())]
+        i, a, j, b = self._position(retirement_age, discount_rate)
+        low = table[j, i] + a * (table[j, i + 1] - table[j, i])
+        if b:
+            high = table[j + 1, i] + a * (table[j + 1, i + 1] - table[j + 1, i])
+            low += b * (high - low)
+        return math.trunc(low) if self.truncate else float(low)
+
+    def factors_for(self, is_male, retirement_age, discount_rate: float = 0.0) -> np.ndarray:
+        """
+        Versión vectorizada de factor() para arrays de género (True = hombre) y edad.
+        """
+        age = np.clip(np.asarray(retirement_age, dtype=np.float64) * 12, 0.0, self.factors.shape[2] - 1.0)
+        age_index = np.minimum(age.astype(np.int64), self.factors.shape[2] - 2)
+        weight = age - age_index
+        gender_index = np.where(is_male, 0, 1)
+        _, _, j, b = self._position(0.0, discount_rate)
+
+        def interpolate(rate_index: int) -> np.ndarray:
+            low = self.factors[gender_index, rate_index, age_index]
+            return low + weight * (self.factors[gender_index, rate_index, age_index + 1] - low)
+
+        values = interpolate(j)
+        if b:
+            values = values + b * (interpolate(j + 1) - values)
+        return np.trunc(values) if self.truncate else values
+
+    def life_expectancies_for(self, is_male, age) -> np.ndarray:
+        """
+        Versión vectorizada de life_expectancy().
+        """
+        age = np.asarray(age, dtype=np.float64)
+        position = np.clip(age * 12, 0.0, self.factors.shape[2] - 1.0)
+        age_index = np.minimum(position.astype(np.int64), self.factors.shape[2] - 2)
+        gender_index = np.where(is_male, 0, 1)
+        low = self.factors[gender_index, 0, age_index]
+        months = low + (position - age_index) * (self.factors[gender_index, 0, age_index + 1] - low)
+        return np.round(age + months / 12, 2)
+
+    def life_expectancy(self, gender: str, age: float) -> float:
+        """
+        Edad esperada de fallecimiento para quien tiene `age` años (sin descuento).
+        """
+        table = self.factors[GENDERS.index(gender.upper())]
+        i, a, _, _ = self._position(age, 0.0)
+        months = table[0, i] + a * (table[0, i + 1] - table[0, i])
+        return round(age + months / 12, 2)
+
+
+def _gompertz_survival(ages: np.ndarray, modal_age: float, dispersion: float) -> np.ndarray:
+    """Probabilidad de sobrevivir desde el nacimiento hasta cada edad (en años)."""
+    cumulative_hazard = math.exp(-modal_age / dispersion) * np.expm1(ages / dispersion)
+    return np.exp(-cumulative_hazard)
+
+
+def _annuity_factors(survival: np.ndarray, rate: float) -> np.ndarray:
+    """
+    Factor anticipado mensual para cada edad de la grilla: Σ_{t>=x} v^(t-x) · S(t) / S(x).
+    Se calcula para todas las edades con una suma acumulada inversa.
+    """
+    discounted = (1 + rate) ** (-np.arange(survival.size) / 12) * survival
+    tail = np.cumsum(discounted[::-1])[::-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = tail / discounted
+    return np.where(discounted > 0, factors, 1.0)
+
+
+def _calibrate_modal_age(age: float, expected_years: float, dispersion: float) -> float:
+    """
+    Busca por bisección la edad modal de Gompertz con la que la esperanza de vida a `age`
+    (factor sin descuento / 12) es `expected_years`.
+    """
+    months = np.arange(int(age * 12), MAX_TABLE_AGE * 12 + 1)
+    low, high = age, 150.0
+    for _ in range(100):
+        modal_age = (low + high) / 2
+        survival = _gompertz_survival(months / 12, modal_age, dispersion)
+        if survival.sum() / survival[0] / 12 < expected_years:
+            low = modal_age
+        else:
+            high = modal_age
+    return (low + high) / 2
+
+
+# Tablas seleccionables por nombre (setting ANNUITY_TABLE): "expectativa_fija" reproduce el
+# cálculo original; "actuarial" usa mortalidad de Gompertz y descuento a la tasa técnica
+ANNUITY_TABLES = {
+    "expectativa_fija": AnnuityTable.legacy,
+    "actuarial": AnnuityTable.gompertz,
+}
+
+
+@functools.cache
+def get_annuity_table(name: str) -> AnnuityTable:
+    """Tabla por nombre, construida la primera vez que se pide y compartida después."""
+    if name not in ANNUITY_TABLES:
+        raise ValueError(f"Tabla de rentas desconocida: {name} (opciones: {', '.join(ANNUITY_TABLES)})")
+    return ANNUITY_TABLES[name](name=name)
+
+
+# La tabla por defecto se construye al importar; la actuarial, sólo si se usa
+LEGACY_ANNUITY_TABLE = get_annuity_table("expectativa_fija")
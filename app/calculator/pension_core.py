@@ -1,4 +1,19 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
+from typing import NamedTuple
+
+import numpy as np
+
+from app.calculator.rate_schedule import RateSchedule
+from app.calculator.result_cache import ResultCache
+from app.calculator.scenario import ScenarioParams
+
+try:
+    # Kernel compilado con Cython (setup.py); sin compilar se usa la forma cerrada en Python puro
+    from app.calculator import pension_kernels
+except ImportError:
+    pension_kernels = None
 
 # Constantes del sistema
 REFORM_START_DATE = date(2025, 2, 1)  # Fecha de inicio de la reforma
@@ -9,8 +24,71 @@ EQUIVALENT_FUND_RATE = 0.0391         # Rendimiento anual del Fondo equivalente
 PENSION_MINIMA = 214000               # Pensión mínima garantizada
 INFLATION_RATE = 0.03      
 
-monthly_interest_rate = (1 + ANNUAL_INTEREST_RATE) ** (1/12) - 1  
-monthly_equivalent_fund_rate = (1 + EQUIVALENT_FUND_RATE) ** (1/12) - 1
+# Supuestos por defecto; un cálculo con supuestos propios recibe otro ScenarioParams
+DEFAULT_SCENARIO = ScenarioParams.of(
+    worker_rate=WORKER_RATE,
+    annual_interest_rate=ANNUAL_INTEREST_RATE,
+    salary_growth_rate=SALARY_GROWTH_RATE,
+    equivalent_fund_rate=EQUIVALENT_FUND_RATE,
+    inflation_rate=INFLATION_RATE,
+    pension_minima=PENSION_MINIMA,
+)
+
+monthly_interest_rate = DEFAULT_SCENARIO.monthly_interest_rate
+monthly_equivalent_fund_rate = DEFAULT_SCENARIO.monthly_equivalent_fund_rate
+
+# Tramos de las tasas post-reforma, indexados por mes desde feb 2025 (m=0).
+# Cada tramo es (mes_inicio, valor_inicial, pendiente_mensual) y rige hasta el inicio del siguiente.
+INDIVIDUAL_TOTAL_BANDS = (
+    (0, 0.10, 0.0),
+    (5, 0.101, 0.0),
+    (13, 0.101, 0.0),
+    (25, 0.102, 0.0),
+    (37, 0.11, 0.0),
+    (49, 0.117, 0.0),
+    (61, 0.124, 0.0),
+    (73, 0.131, 0.0),
+    (85, 0.138, 0.0),
+    (97, 0.145, 0.0),
+    (241, 0.145, (0.16 - 0.145) / (361 - 241)),
+    (361, 0.16, 0.0),
+)
+
+WOMEN_COMPENSATION_BANDS = (
+    (0, 0.0, 0.0),
+    (5, 0.009, 0.0),
+    (13, 0.01, 0.0),
+)
+
+FAPP_TARGET_BANDS = (
+    (0, 0.0, 0.0),
+    (13, 0.009, 0.0),
+    (25, 0.015, 0.0),
+    (241, 0.015, -0.015 / (361 - 241)),
+    (361, 0.0, 0.0),
+)
+
+EMPLOYER_ADDITIONAL_BANDS = (
+    (0, 0.0, 0.0),
+    (5, 0.01, 0.0),
+    (13, 0.02, 0.0),
+    (25, 0.027, 0.0),
+    (37, 0.035, 0.0),
+    (49, 0.042, 0.0),
+    (61, 0.049, 0.0),
+    (73, 0.056, 0.0),
+    (85, 0.063, 0.0),
+    (97, 0.07, 0.0),
+)
+
+# Calendario de tasas precalculado de la reforma (Ley 21.735). Un cambio legal es un nuevo calendario.
+REFORM_RATE_SCHEDULE = RateSchedule.from_bands(
+    "ley-21735/v1",
+    individual=INDIVIDUAL_TOTAL_BANDS,
+    women_compensation=WOMEN_COMPENSATION_BANDS,
+    fapp=FAPP_TARGET_BANDS,
+    employer_additional=EMPLOYER_ADDITIONAL_BANDS,
+)
 
 def effective_additional_rate(month_index: int) -> float:
     """
@@ -27,26 +105,7 @@ def effective_additional_rate(month_index: int) -> float:
       - 85 <= m < 97: 0.063 (6,3%)
       - m >= 97: 0.07 (7%)
     """
-    if month_index < 5:
-        return 0.0
-    elif month_index < 13:
-        return 0.01
-    elif month_index < 25:
-        return 0.02
-    elif month_index < 37:
-        return 0.027
-    elif month_index < 49:
-        return 0.035
-    elif month_index < 61:
-        return 0.042
-    elif month_index < 73:
-        return 0.049
-    elif month_index < 85:
-        return 0.056
-    elif month_index < 97:
-        return 0.063
-    else:
-        return 0.07
+    return REFORM_RATE_SCHEDULE.rate("employer_additional", month_index)
 
 def f_individual_total(month_index: int) -> float:
     """
@@ -66,31 +125,7 @@ def f_individual_total(month_index: int) -> float:
       - 241 <= m < 361: lineal de 0.145 a 0.16
       - m >= 361: 0.16
     """
-    if month_index < 5:
-        return 0.10
-    elif month_index < 13:
-        return 0.101
-    elif month_index < 25:
-        return 0.101
-    elif month_index < 37:
-        return 0.102
-    elif month_index < 49:
-        return 0.11
-    elif month_index < 61:
-        return 0.117
-    elif month_index < 73:
-        return 0.124
-    elif month_index < 85:
-        return 0.131
-    elif month_index < 97:
-        return 0.138
-    elif month_index < 241:
-        return 0.145
-    elif month_index < 361:
-        # Interpolación lineal de 0.145 a 0.16
-        return 0.145 + ((month_index - 241) / (361 - 241)) * (0.16 - 0.145)
-    else:
-        return 0.16
+    return REFORM_RATE_SCHEDULE.rate("individual", month_index)
 
 def f_compensacion_mujeres(month_index: int) -> float:
     """
@@ -99,12 +134,7 @@ def f_compensacion_mujeres(month_index: int) -> float:
       - 5 <= m < 13: 0.009 (0.9%)
       - m >= 13: 0.01 (1%)
     """
-    if month_index < 5:
-        return 0.0
-    elif month_index < 13:
-        return 0.009
-    else:
-        return 0.01
+    return REFORM_RATE_SCHEDULE.rate("women_compensation", month_index)
 
 def f_FAPP_target(month_index: int) -> float:
     """
@@ -115,17 +145,8 @@ def f_FAPP_target(month_index: int) -> float:
       - m en [241, 361): disminuye linealmente de 0.015 a 0
       - m >= 361: 0
     """
-    if month_index < 13:
-        return 0.0
-    elif month_index < 25:
-        return 0.009
-    elif month_index < 241:
-        return 0.015
-    elif month_index < 361:
-        return 0.015 - ((month_index - 241) / (361 - 241)) * 0.015
-    else:
-        return 0.0
-    
+    return REFORM_RATE_SCHEDULE.rate("fapp", month_index)
+
 def get_months_from_reform_start() -> int:
     """
     Calcula cuántos meses han pasado desde el inicio de la reforma (febrero 2025)
@@ -138,6 +159,89 @@ def get_months_from_reform_start() -> int:
     months = (today.year - REFORM_START_DATE.year) * 12 + (today.month - REFORM_START_DATE.month)
     return max(0, months)
 
+def pgu_age_threshold(months_from_start: int) -> float:
+    """
+    Devuelve la edad desde la cual se recibe la PGU aumentada ($250.000) según los meses desde feb 2025.
+      - Después de 30 meses: todos los mayores de 65
+      - Después de 18 meses: mayores de 75
+      - Después de 6 meses: mayores de 82
+      - Antes: nadie (PGU base de $214.000)
+    """
+    if months_from_start >= 30:
+        return 0.0
+    elif months_from_start >= 18:
+        return 75.0
+    elif months_from_start >= 6:
+        return 82.0
+    else:
+        return math.inf
+
+def get_pgu_amount(age: float, months_from_start: int) -> float:
+    """
+    Devuelve el monto de PGU que corresponde a la edad de jubilación y al mes de la reforma.
+    """
+    if age >= pgu_age_threshold(months_from_start):
+        return 250000
+    return 214000
+
+def _geometric_sums(ratio: float, terms: int) -> tuple[float, float]:
+    """
+    Devuelve (Σ ratio^i, Σ i·ratio^i) para i en [0, terms) en forma cerrada.
+    Cerca de ratio = 1 (o con pocos términos) suma directamente para no perder precisión.
+    """
+    if terms <= 0:
+        return 0.0, 0.0
+    log_ratio = math.log(ratio)
+    if terms <= 3 or abs(terms * log_ratio) < 1e-4:
+        total = weighted = 0.0
+        power = 1.0
+        for i in range(terms):
+            total += power
+            weighted += i * power
+            power *= ratio
+        return total, weighted
+    step = math.expm1(log_ratio)                # ratio - 1
+    span = math.expm1(terms * log_ratio)        # ratio^terms - 1
+    total = span / step
+    weighted = (terms * (span + 1) * step - span * (step + 1)) / (step * step)
+    return total, weighted
+
+def _salary_prefix(monthly_salary: float,
+                   month: int,
+                   months: int,
+                   growth: float,
+                   quarterly_factor: float) -> tuple[float, float]:
+    """
+    Suma en forma cerrada los sueldos de los meses [0, month) capitalizados hasta el mes `months`.
+    El sueldo crece trimestralmente por `quarterly_factor` (tras cada mes m con m % 3 == 2),
+    igual que en la proyección mensual: los trimestres completos forman una serie geométrica y
+    los meses del trimestre en curso se suman directo.
+
+    Returns:
+        tuple: (Σ sueldo_m · growth^(months-m), Σ m · sueldo_m · growth^(months-m)); la diferencia
+               entre dos meses da las sumas de un tramo y el segundo término permite aplicar
+               tasas que varían linealmente en él.
+    """
+    quarters, rest = divmod(month, 3)
+    inverse = 1 / growth
+    ratio = quarterly_factor * inverse ** 3
+    series, series_ramp = _geometric_sums(ratio, quarters)
+    # Cada trimestre completo j aporta ratio^j · (1 + 1/growth + 1/growth²), con meses 3j, 3j+1, 3j+2
+    quarter_total = 1 + inverse + inverse * inverse
+    quarter_ramp = inverse + 2 * inverse * inverse
+    total = quarter_total * series
+    weighted = 3 * quarter_total * series_ramp + quarter_ramp * series
+    if rest:
+        scale = ratio ** quarters
+        power = 1.0
+        for phase in range(rest):
+            total += scale * power
+            weighted += scale * (3 * quarters + phase) * power
+            power *= inverse
+    base = monthly_salary * growth ** months
+    return base * total, base * weighted
+
+
 #########################
 # Sistema Pre-reforma  #
 #########################
@@ -157,68 +261,60 @@ def calculate_future_value(present_value: float, years: float, inflation_rate: f
     return present_value * (1 + inflation_rate) ** years
 
 
-def calculate_pension_pre_reform(current_age: float,
-                                 retirement_age: float,
-                                 current_balance: float,
-                                 monthly_salary: float,
-                                 gender: str) -> tuple[float, ...]:
+def _historical_components(current_age: float,
+                           current_balance: float,
+                           scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[float, float, float]:
     """
-    Calcula el saldo acumulado y la pensión mensual estimada bajo el sistema pre-reforma.
-    Sólo se acumula el aporte del trabajador (10% del sueldo); el 1.5% del empleador va al SIS.
-    
-    Args:
-        current_age: Edad actual en formato decimal (años + meses/12)
-        retirement_age: Edad de jubilación
-        current_balance: Saldo actual en cuenta individual
-        monthly_salary: Sueldo bruto mensual
-        gender: Género ('M' o 'F')
+    Estima las componentes del saldo actual: rentabilidad histórica, aporte histórico del
+    trabajador y SIS histórico, suponiendo cotizaciones desde los 25 años.
+
+    Returns:
+        tuple: (rentabilidad_historica, aporte_trabajador_historico, sis_historico)
     """
-    # Calcular la expectativa de vida en base al género y, por ende, los años de pensión:
-    life_expectancy = 86.6 if gender.upper() == 'M' else 90.8
-    total_pension_months = int((life_expectancy - retirement_age) * 12)
-    months_to_retirement = int((retirement_age - current_age) * 12)
-    
-    # 2. Inicialización de acumuladores
-    balance = current_balance
-    accumulated_returns = 0  # Nuevo acumulador para rentabilidad
-    total_worker_contribution = 0
-    total_employer_contribution = 0
-    total_sis = 0
-
-    # 3. Acumulación mensual hasta jubilación
-    for month in range(months_to_retirement):
-        # Aporte mensual del trabajador (10%)
-        contribution = monthly_salary * WORKER_RATE
-        total_worker_contribution += contribution
-        
-        # Calcular rentabilidad del mes
-        monthly_return = (balance + contribution) * monthly_interest_rate
-        accumulated_returns += monthly_return
-        
-        # Actualización del saldo incluyendo rentabilidad
-        balance = (balance + contribution) * (1 + monthly_interest_rate)
-        
-        # SIS (1.5% del empleador)
-        sis = monthly_salary * 0.015
-        total_sis += sis
-        
-        # Actualización del sueldo trimestralmente
-        if month % 3 == 2:
-            quarterly_growth_rate = (1 + SALARY_GROWTH_RATE) ** (1/4) - 1
-            monthly_salary *= (1 + quarterly_growth_rate)
-    
-    # 4. Estimar componentes del saldo actual (current_balance)
     years_contributed = current_age - 25 if current_age > 25 else 0
-    initial_estimated_returns = current_balance - (current_balance / (1 + ANNUAL_INTEREST_RATE) ** years_contributed)
+    initial_estimated_returns = current_balance - (current_balance / (1 + scenario.annual_interest_rate) ** years_contributed)
     initial_worker_contribution = current_balance - initial_estimated_returns
-    
-    # 5. Estimar el SIS histórico basado en la contribución histórica del trabajador
+
     # Si 10% del sueldo = initial_worker_contribution, entonces el sueldo total histórico fue:
-    historical_total_salary = initial_worker_contribution / WORKER_RATE
+    historical_total_salary = initial_worker_contribution / scenario.worker_rate
     # El SIS histórico sería el 1.5% de ese sueldo total
     historical_sis = historical_total_salary * 0.015
-    
-    # 6. Actualizar totales finales
+    return initial_estimated_returns, initial_worker_contribution, historical_sis
+
+
+def _pre_reform_result(current_age: float,
+                       retirement_age: float,
+                       current_balance: float,
+                       gender: str,
+                       months_to_retirement: int,
+                       total_salary: float,
+                       compounded_salary: float,
+                       scenario: ScenarioParams = DEFAULT_SCENARIO,
+                       balance_growth: float | None = None) -> tuple[float, ...]:
+    """
+    Arma el resultado pre-reforma a partir de las sumas de sueldos del horizonte
+    (simple y capitalizada al rendimiento del fondo). `balance_growth` es el factor por el que
+    crece el saldo actual hasta la jubilación (por defecto, el rendimiento fijo del escenario).
+    """
+    # Meses de pensión según la tabla de rentas del escenario (por defecto, hasta la expectativa de vida)
+    total_pension_months = scenario.annuity_factor(gender, retirement_age)
+    if balance_growth is None:
+        balance_growth = scenario.fund_growth ** max(months_to_retirement, 0)
+
+    # Saldo final y totales de aportes
+    balance = (current_balance * balance_growth
+               + scenario.worker_rate * compounded_salary)
+    total_worker_contribution = scenario.worker_rate * total_salary
+    total_employer_contribution = 0
+    total_sis = 0.015 * total_salary
+    # La rentabilidad es todo lo que creció el saldo por sobre los aportes
+    accumulated_returns = balance - current_balance - total_worker_contribution
+
+    # Estimar componentes del saldo actual (current_balance)
+    initial_estimated_returns, initial_worker_contribution, historical_sis = _historical_components(
+        current_age, current_balance, scenario)
+
+    # Actualizar totales finales
     total_worker_contribution += initial_worker_contribution  # Agregar contribución histórica
     total_sis += historical_sis  # Agregar SIS histórico # Todo el aporte del empleador va al SIS
     accumulated_returns += initial_estimated_returns  # Agregar rentabilidad histórica
@@ -226,10 +322,9 @@ def calculate_pension_pre_reform(current_age: float,
     # Calcular la pensión mensual
     monthly_pension = balance / total_pension_months
 
-
     # Calcular si aplica PGU
-    if monthly_pension < 214000:
-        monthly_pension = 214000
+    if monthly_pension < scenario.pension_minima:
+        monthly_pension = scenario.pension_minima
         pgu_applied = True
     else:
         pgu_applied = False
@@ -242,95 +337,175 @@ def calculate_pension_pre_reform(current_age: float,
             accumulated_returns,       # rentabilidad_acumulada (incluye histórica)
             pgu_applied)              # indica si se aplicó PGU
 
+
+def calculate_pension_pre_reform(current_age: float,
+                                 retirement_age: float,
+                                 current_balance: float,
+                                 monthly_salary: float,
+                                 gender: str,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[float, ...]:
+    """
+    Calcula el saldo acumulado y la pensión mensual estimada bajo el sistema pre-reforma.
+    Sólo se acumula el aporte del trabajador (10% del sueldo); el 1.5% del empleador va al SIS.
+    
+    Args:
+        current_age: Edad actual en formato decimal (años + meses/12)
+        retirement_age: Edad de jubilación
+        current_balance: Saldo actual en cuenta individual
+        monthly_salary: Sueldo bruto mensual
+        gender: Género ('M' o 'F')
+        scenario: Supuestos económicos (por defecto, los del sistema)
+    """
+    months_to_retirement = int((retirement_age - current_age) * 12)
+
+    # Acumulación hasta jubilación en forma cerrada (equivalente al ciclo mensual)
+    quarterly_factor = scenario.quarterly_salary_factor
+    months = max(months_to_retirement, 0)
+    total_salary, _ = _salary_prefix(monthly_salary, months, months, 1.0, quarterly_factor)
+    compounded_salary, _ = _salary_prefix(monthly_salary, months, months, scenario.fund_growth, quarterly_factor)
+
+    return _pre_reform_result(current_age, retirement_age, current_balance, gender,
+                              months_to_retirement, total_salary, compounded_salary, scenario)
+
 #########################
 # Sistema Post-reforma #
 #########################
 
-def calculate_pension_post_reform(current_age: float,
-                                retirement_age: float,
-                                current_balance: float,
-                                monthly_salary: float,
-                                gender: str) -> tuple[float, ...]:
+class _Accumulation(NamedTuple):
+    """Sumas del horizonte hasta la jubilación, compartidas por ambos sistemas."""
+    total_salary: float                     # Σ sueldo
+    compounded_salary: float                # Σ sueldo capitalizado al rendimiento del fondo
+    total_individual_contribution: float    # Σ aporte a la cuenta individual post-reforma
+    total_women_compensation: float         # Σ aporte compensación por expectativa de vida
+    compounded_individual: float            # Σ aporte individual capitalizado al fondo
+    compounded_FAPP: float                  # Σ aporte FAPP capitalizado al fondo equivalente
+
+
+# Hasta este horizonte (meses) el recorrido mes a mes en Python es más rápido que la forma cerrada
+MONTHLY_ACCUMULATION_MAX_MONTHS = 240
+
+def _accumulate_monthly(current_month_index: int,
+                        months: int,
+                        monthly_salary: float,
+                        schedule: RateSchedule,
+                        scenario: ScenarioParams) -> _Accumulation:
     """
-    Calcula considerando el momento actual en relación a feb 2025
+    Mismas sumas que _accumulate, recorriendo mes a mes como la proyección original.
     """
-    # Obtener el mes actual en relación a febrero 2025
-    current_month_index = get_months_from_reform_start()
-    months_to_retirement = int((retirement_age - current_age) * 12)
-    life_expectancy = 86.6 if gender.upper() == 'M' else 90.8
-    total_pension_months = int((life_expectancy - retirement_age) * 12)
+    growth = scenario.fund_growth
+    fapp_growth = scenario.fapp_growth
+    quarterly_factor = scenario.quarterly_salary_factor
+    rates = zip(schedule.window("individual", current_month_index, months).tolist(),
+                schedule.window("women_compensation", current_month_index, months).tolist(),
+                schedule.window("fapp", current_month_index, months).tolist())
 
-    # 1. Inicialización de acumuladores para cálculos futuros
-    balance = current_balance
-    balance_FAPP = 0
-    accumulated_returns = 0
-    total_worker_contribution = 0
-    total_employer_contribution = 0
-    total_sis = 0
-    total_women_compensation = 0
-    accumulated_FAPP_contribution = 0
-
-    # 2. Acumulación mensual hasta jubilación
-    for month in range(months_to_retirement):
-        reform_month_index = current_month_index + month
-        
-        # Aplicar tasas según el mes correspondiente desde feb 2025
-        individual_rate = f_individual_total(reform_month_index)
-        women_comp_rate = f_compensacion_mujeres(reform_month_index)
-        fapp_rate = f_FAPP_target(reform_month_index)
-        
-        # Calcular aportes mensuales
-        contribution = monthly_salary * individual_rate
-        worker_contribution = monthly_salary * WORKER_RATE
-        sis_contribution = monthly_salary * 0.015
-        women_comp = monthly_salary * women_comp_rate
-        fapp_contribution = monthly_salary * fapp_rate
-        accumulated_FAPP_contribution += fapp_contribution
-
-        # Calcular rentabilidad del mes
-        monthly_return = (balance + contribution) * monthly_interest_rate
-        accumulated_returns += monthly_return
-        
-        # Actualizar acumuladores
-        total_worker_contribution += worker_contribution
-        total_employer_contribution += (individual_rate - WORKER_RATE) * monthly_salary
-        total_sis += sis_contribution
-        total_women_compensation += women_comp
-        
-        # Actualizar saldos incluyendo rentabilidad
-        balance = (balance + contribution) * (1 + monthly_interest_rate)
-        balance_FAPP = (balance_FAPP + fapp_contribution) * (1 + monthly_equivalent_fund_rate)
-
-        
+    total_salary = 0.0
+    compounded_salary = 0.0
+    total_individual_contribution = 0.0
+    total_women_compensation = 0.0
+    compounded_individual = 0.0
+    compounded_FAPP = 0.0
+    salary = monthly_salary
+    for month, (individual_rate, women_comp_rate, fapp_rate) in enumerate(rates):
+        contribution = salary * individual_rate
+        total_salary += salary
+        compounded_salary = (compounded_salary + salary) * growth
+        total_individual_contribution += contribution
+        total_women_compensation += salary * women_comp_rate
+        compounded_individual = (compounded_individual + contribution) * growth
+        compounded_FAPP = (compounded_FAPP + salary * fapp_rate) * fapp_growth
+        # Actualización del sueldo trimestralmente
         if month % 3 == 2:
-            quarterly_growth_rate = (1 + SALARY_GROWTH_RATE) ** (1/4) - 1
-            monthly_salary *= (1 + quarterly_growth_rate)
+            salary *= quarterly_factor
 
-    # 3. Estimar componentes del saldo actual (current_balance)
-    years_contributed = current_age - 25 if current_age > 25 else 0
-    initial_estimated_returns = current_balance - (current_balance / (1 + ANNUAL_INTEREST_RATE) ** years_contributed)
-    initial_worker_contribution = current_balance - initial_estimated_returns
-    
-    # 4. Estimar el SIS histórico y otros aportes históricos
-    historical_total_salary = initial_worker_contribution / WORKER_RATE
-    historical_sis = historical_total_salary * 0.015
-    
-    # 5. Actualizar totales finales
-    total_worker_contribution += initial_worker_contribution
-    total_sis += historical_sis
-   
+    return _Accumulation(total_salary, compounded_salary, total_individual_contribution,
+                         total_women_compensation, compounded_individual, compounded_FAPP)
+
+def _accumulate(current_month_index: int,
+                months_to_retirement: int,
+                monthly_salary: float,
+                schedule: RateSchedule,
+                scenario: ScenarioParams = DEFAULT_SCENARIO) -> _Accumulation:
+    """
+    Recorre el horizonte una sola vez y devuelve las sumas que necesitan los sistemas pre y
+    post-reforma: con el kernel compilado, mes a mes en C; si no, mes a mes en Python para
+    horizontes cortos (hasta MONTHLY_ACCUMULATION_MAX_MONTHS) y un paso por tramo de tasas
+    para los largos.
+    """
+    growth = scenario.fund_growth
+    fapp_growth = scenario.fapp_growth
+    quarterly_factor = scenario.quarterly_salary_factor
 
-    # Calcular los meses de pensión para ambos géneros al inicio de la función
-    life_expectancy_male = 86.6
-    life_expectancy_female = 90.8
-    pension_annuity_years_male = life_expectancy_male - retirement_age
-    pension_annuity_years_female = life_expectancy_female - retirement_age
-    total_pension_months_male = int(pension_annuity_years_male * 12)
-    total_pension_months_female = int(pension_annuity_years_female * 12)
+    if pension_kernels is not None:
+        return _Accumulation(*pension_kernels.accumulate(
+            months_to_retirement,
+            monthly_salary,
+            schedule.window("individual", current_month_index, months_to_retirement),
+            schedule.window("women_compensation", current_month_index, months_to_retirement),
+            schedule.window("fapp", current_month_index, months_to_retirement),
+            growth,
+            fapp_growth,
+            quarterly_factor
+        ))
+    if months_to_retirement <= MONTHLY_ACCUMULATION_MAX_MONTHS:
+        return _accumulate_monthly(current_month_index, max(months_to_retirement, 0), monthly_salary,
+                                   schedule, scenario)
+
+    total_salary = 0.0
+    compounded_salary = 0.0
+    total_individual_contribution = 0.0
+    total_women_compensation = 0.0
+    compounded_individual = 0.0
+    compounded_FAPP = 0.0
+
+    # Sumas del sueldo de los meses [0, start) del tramo actual: simples, al fondo y al FAPP
+    months = max(months_to_retirement, 0)
+    growths = (1.0, growth, fapp_growth)
+    previous = ((0.0, 0.0),) * 3
+
+    for start, end in schedule.segments(current_month_index, months_to_retirement):
+        reform_month_index = current_month_index + start
+        individual_rate, individual_slope = schedule.band_rate("individual", reform_month_index)
+        women_comp_rate, women_comp_slope = schedule.band_rate("women_compensation", reform_month_index)
+        fapp_rate, fapp_slope = schedule.band_rate("fapp", reform_month_index)
+
+        # Sumas del sueldo en el tramo: diferencia de prefijos, con la rampa medida desde `start`
+        prefix = tuple(_salary_prefix(monthly_salary, end, months, rate_growth, quarterly_factor)
+                       for rate_growth in growths)
+        (salary, salary_ramp), (salary_fund, salary_fund_ramp), (salary_fapp, salary_fapp_ramp) = (
+            (total - previous_total, ramp - previous_ramp - start * (total - previous_total))
+            for (total, ramp), (previous_total, previous_ramp) in zip(prefix, previous))
+        previous = prefix
+
+        total_salary += salary
+        compounded_salary += salary_fund
+        total_individual_contribution += individual_rate * salary + individual_slope * salary_ramp
+        total_women_compensation += women_comp_rate * salary + women_comp_slope * salary_ramp
+        compounded_individual += individual_rate * salary_fund + individual_slope * salary_fund_ramp
+        compounded_FAPP += fapp_rate * salary_fapp + fapp_slope * salary_fapp_ramp
+
+    return _Accumulation(total_salary, compounded_salary, total_individual_contribution,
+                         total_women_compensation, compounded_individual, compounded_FAPP)
+
+
+def _post_reform_payout_scalar(balance: float,
+                               retirement_age: float,
+                               gender: str,
+                               current_month_index: int,
+                               scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[float, float, bool]:
+    """
+    Convierte el saldo post-reforma en pensión mensual: divide por los meses de pensión
+    (factor de renta de la tabla del escenario), agrega la compensación para mujeres y aplica la PGU.
+
+    Returns:
+        tuple: (pension_mensual, pension_adicional, pgu_aplicada)
+    """
+    # Calcular los meses de pensión para ambos géneros
+    total_pension_months_male = scenario.annuity_factor('M', retirement_age)
+    total_pension_months_female = scenario.annuity_factor('F', retirement_age)
 
     # Si es mujer, calcular también como si fuera hombre
     additional_pension = 0
-    monthly_BSPA = balance_FAPP / 240
 
     if gender.upper() == 'F':
         # Calcular pensión adicional (diferencia con mínimo de 10000)
@@ -342,20 +517,6 @@ def calculate_pension_post_reform(current_age: float,
         additional_pension = 0
     
     # Aplicar PGU según corresponda
-    def get_pgu_amount(age: float, months_from_start: int) -> float:
-        if months_from_start >= 30:
-            # Después de 30 meses, todos los mayores de 65 reciben $250.000
-            return 250000
-        elif months_from_start >= 18 and age >= 75:
-            # Después de 18 meses, mayores de 75 reciben $250.000
-            return 250000
-        elif months_from_start >= 6 and age >= 82:
-            # Después de 6 meses, mayores de 82 reciben $250.000
-            return 250000
-        else:
-            # PGU base actual
-            return 214000
-
     # Calcular la PGU correspondiente (considerando 6 meses desde feb 2025)
     pgu_amount = get_pgu_amount(retirement_age, current_month_index)
     
@@ -365,6 +526,44 @@ def calculate_pension_post_reform(current_age: float,
     else:
         pgu_applied = False
 
+    return monthly_pension, additional_pension, pgu_applied
+
+
+def _post_reform_result(current_age: float,
+                        retirement_age: float,
+                        current_balance: float,
+                        gender: str,
+                        months_to_retirement: int,
+                        current_month_index: int,
+                        accumulation: _Accumulation,
+                        scenario: ScenarioParams = DEFAULT_SCENARIO,
+                        balance_growth: float | None = None) -> tuple[float, ...]:
+    """
+    Arma el resultado post-reforma a partir de las sumas del horizonte (ver _pre_reform_result
+    para `balance_growth`).
+    """
+    if balance_growth is None:
+        balance_growth = scenario.fund_growth ** max(months_to_retirement, 0)
+
+    # 1. Saldos finales y totales de aportes
+    balance = (current_balance * balance_growth
+               + accumulation.compounded_individual)
+    balance_FAPP = accumulation.compounded_FAPP
+    total_worker_contribution = scenario.worker_rate * accumulation.total_salary
+    total_employer_contribution = accumulation.total_individual_contribution - total_worker_contribution
+    total_sis = 0.015 * accumulation.total_salary
+    total_women_compensation = accumulation.total_women_compensation
+    accumulated_returns = balance - current_balance - accumulation.total_individual_contribution
+
+    # 2. Estimar componentes del saldo actual (current_balance) y actualizar totales finales
+    initial_estimated_returns, initial_worker_contribution, historical_sis = _historical_components(
+        current_age, current_balance, scenario)
+    total_worker_contribution += initial_worker_contribution
+    total_sis += historical_sis
+
+    monthly_BSPA = balance_FAPP / 240
+    monthly_pension, additional_pension, pgu_applied = _post_reform_payout_scalar(
+        balance, retirement_age, gender, current_month_index, scenario)
 
     # Calcular la rentabilidad total de la cuenta individual
     total_returns = accumulated_returns + initial_estimated_returns
@@ -382,6 +581,884 @@ def calculate_pension_post_reform(current_age: float,
             pgu_applied)             # pgu_aplicada
 
 
+def calculate_pension_post_reform(current_age: float,
+                                retirement_age: float,
+                                current_balance: float,
+                                monthly_salary: float,
+                                gender: str,
+                                schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[float, ...]:
+    """
+    Calcula considerando el momento actual en relación a feb 2025.
+    Las tasas de cada mes se toman del calendario `schedule` (por defecto, el de la reforma vigente)
+    y los supuestos económicos de `scenario`.
+    """
+    # Obtener el mes actual en relación a febrero 2025
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = int((retirement_age - current_age) * 12)
+
+    accumulation = _accumulate(current_month_index, months_to_retirement, monthly_salary, schedule, scenario)
+    return _post_reform_result(current_age, retirement_age, current_balance, gender,
+                               months_to_retirement, current_month_index, accumulation, scenario)
+
+
+def calculate_pension_comparison(current_age: float,
+                                 retirement_age: float,
+                                 current_balance: float,
+                                 monthly_salary: float,
+                                 gender: str,
+                                 schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[tuple, tuple]:
+    """
+    Calcula ambos sistemas en una sola pasada: la trayectoria de sueldos, su capitalización,
+    la descomposición del saldo histórico y la expectativa de vida se calculan una vez.
+
+    Returns:
+        tuple: (resultado de calculate_pension_pre_reform, resultado de calculate_pension_post_reform)
+    """
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = int((retirement_age - current_age) * 12)
+
+    accumulation = _accumulate(current_month_index, months_to_retirement, monthly_salary, schedule, scenario)
+    pre = _pre_reform_result(current_age, retirement_age, current_balance, gender, months_to_retirement,
+                             accumulation.total_salary, accumulation.compounded_salary, scenario)
+    post = _post_reform_result(current_age, retirement_age, current_balance, gender,
+                               months_to_retirement, current_month_index, accumulation, scenario)
+    return pre, post
+
+
+#########################
+# Cache de resultados  #
+#########################
+
+# Resultados recientes de calculate_pension_comparison (tuplas inmutables, se comparten sin copiar)
+PENSION_RESULT_CACHE = ResultCache(maxsize=4096, ttl=3600)
+
+def pension_cache_key(current_age: float,
+                      retirement_age: float,
+                      current_balance: float,
+                      monthly_salary: float,
+                      gender: str) -> tuple:
+    """Parte de la clave de cache que identifica al perfil en el mes actual de la reforma."""
+    return (round(current_age, 9), round(retirement_age, 9), round(current_balance, 2),
+            round(monthly_salary, 2), gender.upper(), int((retirement_age - current_age) * 12),
+            get_months_from_reform_start())
+
+def pension_comparison_cache_key(current_age: float,
+                                 retirement_age: float,
+                                 current_balance: float,
+                                 monthly_salary: float,
+                                 gender: str,
+                                 schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple:
+    """Clave con que cached_pension_comparison guarda el resultado en el cache."""
+    return pension_cache_key(current_age, retirement_age, current_balance, monthly_salary, gender) + (
+        schedule.version, scenario)
+
+def cached_pension_comparison(current_age: float,
+                              retirement_age: float,
+                              current_balance: float,
+                              monthly_salary: float,
+                              gender: str,
+                              schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                              scenario: ScenarioParams = DEFAULT_SCENARIO,
+                              cache: ResultCache = PENSION_RESULT_CACHE) -> tuple[tuple, tuple]:
+    """
+    Igual que calculate_pension_comparison, pero memoriza el resultado. La clave son las
+    entradas normalizadas (edades a 1e-9 años, montos al centavo, género en mayúscula), los meses
+    hasta la jubilación, el mes actual de la reforma, la versión del calendario de tasas y los
+    supuestos de `scenario`. El cálculo usa las entradas originales: redondear las edades puede
+    cambiar la cantidad entera de meses hasta la jubilación.
+    """
+    key = pension_comparison_cache_key(current_age, retirement_age, current_balance, monthly_salary, gender,
+                                       schedule, scenario)
+    return cache.get_or_compute(key, lambda: calculate_pension_comparison(
+        current_age, retirement_age, current_balance, monthly_salary, gender.upper(), schedule, scenario))
+
+
+#########################
+# Proyección en lote   #
+#########################
+
+PRE_REFORM_DTYPE = np.dtype([
+    ("saldo_acumulado", np.float64),
+    ("pension_mensual", np.float64),
+    ("aporte_trabajador", np.float64),
+    ("aporte_empleador", np.float64),
+    ("aporte_sis", np.float64),
+    ("rentabilidad_acumulada", np.float64),
+    ("pgu_aplicada", np.bool_),
+])
+
+POST_REFORM_DTYPE = np.dtype([
+    ("saldo_cuenta_individual", np.float64),
+    ("pension_total", np.float64),
+    ("pension_adicional", np.float64),
+    ("balance_fapp", np.float64),
+    ("bono_seguridad_previsional", np.float64),
+    ("aporte_sis", np.float64),
+    ("aporte_compensacion_expectativa_vida", np.float64),
+    ("aporte_trabajador", np.float64),
+    ("aporte_empleador", np.float64),
+    ("rentabilidad_acumulada", np.float64),
+    ("pgu_aplicada", np.bool_),
+])
+
+def _post_reform_payout(balance: np.ndarray,
+                        retirement_age,
+                        is_male,
+                        current_month_index: int,
+                        total_pension_months_male,
+                        total_pension_months_female) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convierte saldos post-reforma en pensión mensual en forma vectorizada: divide por los meses
+    de pensión (factores de renta) según género, agrega la compensación para mujeres
+    (mínimo $10.000) y aplica la PGU.
+
+    Returns:
+        tuple: (pension_mensual, pension_adicional, pgu_aplicada)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pension_male = balance / total_pension_months_male
+        pension_female = balance / total_pension_months_female
+
+    monthly_pension = np.where(is_male, pension_male, pension_female)
+    additional_pension = np.where(is_male, 0.0, np.maximum(pension_male - pension_female, 10000))
+    pgu_amount = np.where(np.asarray(retirement_age) >= pgu_age_threshold(current_month_index), 250000, 214000)
+    pgu_applied = monthly_pension < pgu_amount
+    return np.where(pgu_applied, pgu_amount, monthly_pension), additional_pension, pgu_applied
+
+def _accumulate_batch_vectorized(months_to_retirement: np.ndarray,
+                                 monthly_salary: np.ndarray,
+                                 rate_windows: tuple,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> np.ndarray:
+    """
+    Acumula todos los perfiles juntos mes a mes en forma vectorizada; los que ya llegaron
+    a su edad de jubilación quedan enmascarados y no siguen acumulando.
+
+    Returns:
+        np.ndarray: Sumas por perfil (perfiles × campos de _Accumulation)
+    """
+    individual_rates, women_comp_rates, fapp_rates = rate_windows
+    salary = monthly_salary.copy()
+    sums = np.zeros((len(_Accumulation._fields), salary.size))
+    (total_salary, compounded_salary, total_individual_contribution,
+     total_women_compensation, compounded_individual, compounded_FAPP) = sums
+    quarterly_factor = scenario.quarterly_salary_factor
+    interest_rate = scenario.monthly_interest_rate
+    fapp_rate = scenario.monthly_equivalent_fund_rate
+
+    # `active` vale 1 mientras el perfil no se jubila
+    for month in range(individual_rates.size):
+        active = (months_to_retirement > month).astype(np.float64)
+        active_salary = salary * active
+        contribution = active_salary * individual_rates[month]
+
+        total_salary += active_salary
+        total_individual_contribution += contribution
+        total_women_compensation += active_salary * women_comp_rates[month]
+
+        compounded_salary += active_salary
+        compounded_salary *= 1 + interest_rate * active
+        compounded_individual += contribution
+        compounded_individual *= 1 + interest_rate * active
+        compounded_FAPP += active_salary * fapp_rates[month]
+        compounded_FAPP *= 1 + fapp_rate * active
+
+        if month % 3 == 2:
+            salary *= 1 + (quarterly_factor - 1) * active
+
+    return sums.T
+
+def _accumulate_batch_compiled(months_to_retirement: np.ndarray,
+                               monthly_salary: np.ndarray,
+                               rate_windows: tuple,
+                               scenario: ScenarioParams = DEFAULT_SCENARIO,
+                               workers: int | None = None,
+                               chunk_size: int = 4096) -> np.ndarray:
+    """
+    Acumula los perfiles con el kernel compilado, repartiendo bloques entre hilos:
+    el kernel libera el GIL, así que los bloques se proyectan en paralelo.
+
+    Returns:
+        np.ndarray: Sumas por perfil (perfiles × campos de _Accumulation)
+    """
+    months = np.ascontiguousarray(months_to_retirement, dtype=np.int64)
+    salary = np.ascontiguousarray(monthly_salary, dtype=np.float64)
+    sums = np.empty((salary.size, len(_Accumulation._fields)))
+    growth = scenario.fund_growth
+    fapp_growth = scenario.fapp_growth
+    quarterly_factor = scenario.quarterly_salary_factor
+    individual_rates, women_comp_rates, fapp_rates = (np.ascontiguousarray(rates) for rates in rate_windows)
+
+    def project(start: int) -> None:
+        end = start + chunk_size
+        pension_kernels.accumulate_batch(months[start:end], salary[start:end],
+                                         individual_rates, women_comp_rates, fapp_rates,
+                                         growth, fapp_growth, quarterly_factor, sums[start:end])
+
+    starts = range(0, salary.size, chunk_size)
+    if workers == 1 or salary.size <= chunk_size:
+        for start in starts:
+            project(start)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(project, starts))
+    return sums
+
+def calculate_pension_batch(profiles,
+                            schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                            workers: int | None = None,
+                            scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula los sistemas pre y post-reforma para muchos perfiles a la vez.
+    Con el kernel compilado los perfiles se proyectan por bloques en varios hilos (sin GIL);
+    si no, todos avanzan juntos mes a mes en forma vectorizada con NumPy.
+
+    Args:
+        profiles: Mapeo con columnas (listas o arrays de igual largo) current_age,
+                  retirement_age, current_balance, monthly_salary y gender ('M' o 'F')
+        schedule: Calendario de tasas de la reforma
+        workers: Hilos para el kernel compilado (None: los de ThreadPoolExecutor)
+        scenario: Supuestos económicos de la proyección
+
+    Returns:
+        tuple: (pre_reforma, post_reforma) como arrays estructurados con los mismos campos
+               que devuelven calculate_pension_pre_reform y calculate_pension_post_reform
+    """
+    current_age = np.asarray(profiles["current_age"], dtype=np.float64)
+    retirement_age = np.asarray(profiles["retirement_age"], dtype=np.float64)
+    current_balance = np.asarray(profiles["current_balance"], dtype=np.float64)
+    salary = np.asarray(profiles["monthly_salary"], dtype=np.float64)
+    is_male = np.char.upper(np.asarray(profiles["gender"], dtype=str)) == 'M'
+
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = ((retirement_age - current_age) * 12).astype(np.int64)
+    total_pension_months_male = scenario.annuity_factors_for(True, retirement_age)
+    total_pension_months_female = scenario.annuity_factors_for(False, retirement_age)
+
+    # 1. Sumas del horizonte por perfil (ver _Accumulation)
+    horizon = max(int(months_to_retirement.max(initial=0)), 0)
+    rate_windows = tuple(schedule.window(name, current_month_index, horizon)
+                         for name in ("individual", "women_compensation", "fapp"))
+    if pension_kernels is not None:
+        sums = _accumulate_batch_compiled(months_to_retirement, salary, rate_windows, scenario, workers)
+    else:
+        sums = _accumulate_batch_vectorized(months_to_retirement, salary, rate_windows, scenario)
+    (total_salary, compounded_salary, total_individual_contribution,
+     total_women_compensation, compounded_individual, balance_FAPP) = sums.T
+
+    # 2. Saldos finales: el saldo actual se capitaliza durante los meses hasta la jubilación
+    worker_rate = scenario.worker_rate
+    initial_growth = scenario.fund_growth ** np.maximum(months_to_retirement, 0)
+    balance_pre = current_balance * initial_growth + worker_rate * compounded_salary
+    balance_post = current_balance * initial_growth + compounded_individual
+
+    # 3. Componentes históricas del saldo actual
+    years_contributed = np.where(current_age > 25, current_age - 25, 0.0)
+    initial_estimated_returns = current_balance - (current_balance / (1 + scenario.annual_interest_rate) ** years_contributed)
+    initial_worker_contribution = current_balance - initial_estimated_returns
+    historical_sis = initial_worker_contribution / worker_rate * 0.015
+
+    worker_contribution = worker_rate * total_salary
+    total_sis = 0.015 * total_salary + historical_sis
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pension_pre = balance_pre / np.where(is_male, total_pension_months_male, total_pension_months_female)
+
+    # 4. Resultado pre-reforma
+    pre = np.empty(current_age.shape, dtype=PRE_REFORM_DTYPE)
+    pre["saldo_acumulado"] = balance_pre
+    pre["pgu_aplicada"] = pension_pre < scenario.pension_minima
+    pre["pension_mensual"] = np.where(pre["pgu_aplicada"], scenario.pension_minima, pension_pre)
+    pre["aporte_trabajador"] = worker_contribution + initial_worker_contribution
+    pre["aporte_empleador"] = 0.0
+    pre["aporte_sis"] = total_sis
+    pre["rentabilidad_acumulada"] = (balance_pre - current_balance - worker_contribution
+                                     + initial_estimated_returns)
+
+    # 5. Resultado post-reforma, con compensación para mujeres y PGU según el mes de la reforma
+    monthly_pension, additional_pension, pgu_applied = _post_reform_payout(
+        balance_post, retirement_age, is_male, current_month_index,
+        total_pension_months_male, total_pension_months_female)
+
+    post = np.empty(current_age.shape, dtype=POST_REFORM_DTYPE)
+    post["saldo_cuenta_individual"] = balance_post
+    post["pgu_aplicada"] = pgu_applied
+    post["pension_total"] = monthly_pension
+    post["pension_adicional"] = additional_pension
+    post["balance_fapp"] = balance_FAPP
+    post["bono_seguridad_previsional"] = balance_FAPP / 240
+    post["aporte_sis"] = total_sis
+    post["aporte_compensacion_expectativa_vida"] = total_women_compensation
+    post["aporte_trabajador"] = worker_contribution + initial_worker_contribution
+    post["aporte_empleador"] = total_individual_contribution - worker_contribution
+    post["rentabilidad_acumulada"] = (balance_post - current_balance - total_individual_contribution
+                                      + initial_estimated_returns)
+
+    return pre, post
+
+
+##############################
+# Simulación estocástica     #
+##############################
+
+ANNUAL_RETURN_VOLATILITY = 0.08       # Volatilidad anual supuesta del rendimiento del fondo
+SIMULATION_PERCENTILES = (10, 50, 90)
+SIMULATION_MAX_PATH_MONTHS = 3_000_000  # Trayectorias × meses por simulación (10.000 trayectorias a 25 años)
+
+def _discounted_contributions(discount: np.ndarray,
+                              weights: np.ndarray,
+                              quarterly_salary: np.ndarray | None,
+                              salary: np.ndarray | None) -> np.ndarray:
+    """
+    Valor al inicio de los aportes de cada trayectoria: Σ_m aporte_m · discount[:, m].
+
+    Args:
+        discount: Factor de descuento de cada mes por trayectoria (trayectorias × meses, con los
+                  meses completados a trimestres enteros)
+        weights: Tasa de aporte por mes, ya multiplicada por la parte determinística del descuento
+                 (cero en los meses de relleno)
+        quarterly_salary: Sueldo por trayectoria y trimestre (trayectorias × trimestres), o None
+        salary: Sueldo por mes cuando es determinístico (meses), o None
+    """
+    if quarterly_salary is None:
+        return discount @ (salary * weights).astype(np.float32)
+    # El sueldo es constante en cada trimestre: trayectoria × trimestre × mes del trimestre
+    return np.einsum('pqk,qk,pq->p', discount.reshape(len(discount), -1, 3),
+                     weights.reshape(-1, 3).astype(np.float32), quarterly_salary.astype(np.float32))
+
+def simulate_pension_post_reform(current_age: float,
+                                 retirement_age: float,
+                                 current_balance: float,
+                                 monthly_salary: float,
+                                 gender: str,
+                                 n_paths: int = 10000,
+                                 seed: int | None = None,
+                                 return_volatility: float = ANNUAL_RETURN_VOLATILITY,
+                                 salary_volatility: float | None = None,
+                                 schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Simula el sistema post-reforma con rendimientos mensuales aleatorios (Monte Carlo).
+    Cada trayectoria sortea un rendimiento lognormal por mes con media igual al rendimiento del escenario
+    (en pares antitéticos); opcionalmente también sortea el crecimiento trimestral del sueldo.
+    Todas las trayectorias se evalúan juntas como un array trayectorias × meses.
+
+    Args:
+        current_age: Edad actual en formato decimal (años + meses/12)
+        retirement_age: Edad de jubilación
+        current_balance: Saldo actual en cuenta individual
+        monthly_salary: Sueldo bruto mensual
+        gender: Género ('M' o 'F')
+        n_paths: Cantidad de trayectorias; con horizontes largos se reduce para que trayectorias × meses
+                 no supere SIMULATION_MAX_PATH_MONTHS
+        seed: Semilla del generador, para resultados reproducibles
+        return_volatility: Volatilidad anual del rendimiento
+        salary_volatility: Volatilidad anual del crecimiento salarial (None: sueldo determinístico)
+        schedule: Calendario de tasas de la reforma
+        scenario: Supuestos económicos (rendimiento medio, crecimiento salarial, fondo equivalente)
+
+    Returns:
+        dict: Percentiles (SIMULATION_PERCENTILES) y media del saldo final, la pensión base y la pensión total
+    """
+    current_month_index = get_months_from_reform_start()
+    months = max(int((retirement_age - current_age) * 12), 0)
+    rng = np.random.default_rng(seed)
+    n_paths = max(1, min(n_paths, SIMULATION_MAX_PATH_MONTHS // max(months, 1)))
+
+    pairs = (n_paths + 1) // 2
+    rest = n_paths - pairs                # Trayectorias que usan los sorteos con el signo opuesto
+    quarters = (months + 2) // 3
+    width = 3 * quarters                  # Meses completados a trimestres enteros (el relleno no aporta)
+    month = np.arange(width)
+
+    # 1. Sueldo (crece tras cada mes m con m % 3 == 2): determinístico por mes o, con volatilidad,
+    #    por trayectoria y trimestre, con los shocks trimestrales también en pares antitéticos
+    quarterly_factor = scenario.quarterly_salary_factor
+    salary = quarterly_salary = None
+    if salary_volatility and months:
+        quarterly_sigma = salary_volatility / 2
+        salary_walk = np.zeros((pairs, quarters))
+        salary_walk[:, 1:] = np.cumsum(rng.standard_normal((pairs, quarters - 1), dtype=np.float32), axis=1)
+        salary_walk *= quarterly_sigma
+        salary_trend = monthly_salary * np.exp((math.log(quarterly_factor) - quarterly_sigma ** 2 / 2)
+                                               * np.arange(quarters))
+        quarterly_salary = np.concatenate((salary_trend * np.exp(salary_walk),
+                                           salary_trend * np.exp(-salary_walk[:rest])))
+    else:
+        salary = monthly_salary * quarterly_factor ** (month // 3)
+
+    # 2. Aportes al FAPP, que rinde la tasa del fondo equivalente
+    fapp_weights = np.zeros(width)
+    fapp_weights[:months] = (schedule.window("fapp", current_month_index, months)
+                             * scenario.fapp_growth ** (months - month[:months]))
+    if quarterly_salary is None:
+        balance_FAPP = salary @ fapp_weights
+    else:
+        balance_FAPP = quarterly_salary @ fapp_weights.reshape(-1, 3).sum(axis=1)
+
+    # 3. Rendimientos lognormales con variables antitéticas: cada sorteo se usa con ambos signos.
+    #    Con W_m la suma de los shocks de los meses previos a m, el log-crecimiento hasta el mes m
+    #    es drift·m ± σ·W_m: una suma acumulada y una exponencial sirven para ambos signos, y la
+    #    parte determinística se aplica una sola vez a los pesos de cada mes.
+    monthly_sigma = return_volatility / math.sqrt(12)
+    drift = math.log1p(scenario.monthly_interest_rate) - monthly_sigma ** 2 / 2
+    shocks = rng.standard_normal((pairs, months), dtype=np.float32)
+    discount = np.zeros((pairs, width), dtype=np.float32)
+    final_walk = np.zeros(pairs)
+    if months:
+        np.cumsum(shocks[:, :-1], axis=1, out=discount[:, 1:months])
+        final_walk = monthly_sigma * (discount[:, months - 1].astype(np.float64) + shocks[:, -1])
+    del shocks
+    discount *= monthly_sigma
+    np.exp(discount, out=discount)
+    weights = np.zeros(width)
+    weights[:months] = schedule.window("individual", current_month_index, months) * np.exp(-drift * month[:months])
+    total_growth = math.exp(drift * months)
+
+    balance = np.empty(n_paths)
+    # Signo negativo: el descuento del mes m es exp(-drift·m) · exp(σ·W_m)
+    balance[pairs:] = total_growth * np.exp(-final_walk[:rest]) * (current_balance + _discounted_contributions(
+        discount[:rest], weights, None if quarterly_salary is None else quarterly_salary[pairs:], salary))
+    # Signo positivo: exp(-drift·m) · exp(-σ·W_m)
+    np.reciprocal(discount, out=discount)
+    balance[:pairs] = total_growth * np.exp(final_walk) * (current_balance + _discounted_contributions(
+        discount, weights, None if quarterly_salary is None else quarterly_salary[:pairs], salary))
+
+    # 4. Pensión por trayectoria
+    monthly_pension, additional_pension, _ = _post_reform_payout(
+        balance, retirement_age, gender.upper() == 'M', current_month_index,
+        scenario.annuity_factor('M', retirement_age), scenario.annuity_factor('F', retirement_age))
+    pension_total = monthly_pension + additional_pension + balance_FAPP / 240
+
+    def summarize(values) -> dict:
+        quantiles = np.percentile(values, SIMULATION_PERCENTILES)
+        summary = {f"p{p}": float(q) for p, q in zip(SIMULATION_PERCENTILES, quantiles)}
+        summary["media"] = float(np.mean(values))
+        return summary
+
+    return {
+        "trayectorias": n_paths,
+        "semilla": seed,
+        "saldo_cuenta_individual": summarize(balance),
+        "pension_mensual_base": summarize(monthly_pension),
+        "pension_total": summarize(pension_total),
+    }
+
+
+##############################
+# Sensibilidad a supuestos   #
+##############################
+
+def sweep_pension_assumptions(current_age: float,
+                              retirement_age: float,
+                              current_balance: float,
+                              monthly_salary: float,
+                              gender: str,
+                              ideal_pension: float = 0,
+                              interest_rates=None,
+                              salary_growth_rates=None,
+                              inflation_rates=None,
+                              equivalent_fund_rates=None,
+                              schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                              scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Evalúa un perfil sobre una grilla de supuestos (rendimiento, crecimiento salarial, inflación y
+    rendimiento del fondo equivalente FAPP). La trayectoria de sueldos y los aportes se calculan una
+    sola vez por tasa de crecimiento salarial y se comparten entre todos los puntos de la grilla;
+    cada rendimiento sólo aporta un vector de factores de capitalización. Las grillas omitidas
+    (None) toman el valor único de `scenario`, que también fija la tasa de aporte y la pensión mínima.
+
+    Returns:
+        dict: Arrays densos de forma (rendimientos, crecimientos, inflaciones, fondos_equivalentes)
+    """
+    def grid(values, default: float) -> np.ndarray:
+        return np.asarray((default,) if values is None else values, dtype=np.float64)
+
+    interest_rates = grid(interest_rates, scenario.annual_interest_rate)
+    salary_growth_rates = grid(salary_growth_rates, scenario.salary_growth_rate)
+    inflation_rates = grid(inflation_rates, scenario.inflation_rate)
+    equivalent_fund_rates = grid(equivalent_fund_rates, scenario.equivalent_fund_rate)
+    shape = (interest_rates.size, salary_growth_rates.size, inflation_rates.size, equivalent_fund_rates.size)
+
+    current_month_index = get_months_from_reform_start()
+    months = max(int((retirement_age - current_age) * 12), 0)
+    remaining = months - np.arange(months)
+    quarter = np.arange(months) // 3
+
+    # 1. Sueldos y aportes por tasa de crecimiento salarial (crecimiento × meses)
+    quarterly_factor = 1 + ((1 + salary_growth_rates) ** (1/4) - 1)
+    salary = monthly_salary * quarterly_factor[:, None] ** quarter
+    individual = salary * schedule.window("individual", current_month_index, months)
+    fapp = salary * schedule.window("fapp", current_month_index, months)
+
+    # 2. Factores de capitalización por rendimiento (rendimiento × meses) y saldos finales
+    growth = (1 + interest_rates) ** (1/12)
+    compounding = growth[:, None] ** remaining
+    initial_balance = current_balance * growth ** months
+    balance_pre = initial_balance[:, None] + scenario.worker_rate * compounding @ salary.T
+    balance_post = initial_balance[:, None] + compounding @ individual.T
+    fapp_compounding = ((1 + equivalent_fund_rates) ** (1/12))[:, None] ** remaining
+    balance_FAPP = fapp @ fapp_compounding.T
+
+    # 3. Pensiones pre y post-reforma
+    # Factores de renta descontados a cada rendimiento de la grilla (rendimiento × 1)
+    table = scenario.annuity_table
+    months_male = np.array([[table.factor('M', retirement_age, rate)] for rate in interest_rates])
+    months_female = np.array([[table.factor('F', retirement_age, rate)] for rate in interest_rates])
+    total_pension_months = months_male if gender.upper() == 'M' else months_female
+    pension_pre = np.maximum(balance_pre / total_pension_months, scenario.pension_minima)
+    monthly_pension, additional_pension, _ = _post_reform_payout(
+        balance_post, retirement_age, gender.upper() == 'M', current_month_index, months_male, months_female)
+    pension_post = ((monthly_pension + additional_pension)[:, :, None, None]
+                    + balance_FAPP[None, :, None, :] / 240)
+
+    # 4. Pensión objetivo según inflación y brecha
+    future_value = calculate_future_value(ideal_pension, retirement_age - current_age, inflation_rates)
+    gap = np.maximum(0, future_value[None, None, :, None] - pension_post)
+
+    return {
+        "saldo_pre_reforma": np.broadcast_to(balance_pre[:, :, None, None], shape).copy(),
+        "pension_pre_reforma": np.broadcast_to(pension_pre[:, :, None, None], shape).copy(),
+        "saldo_post_reforma": np.broadcast_to(balance_post[:, :, None, None], shape).copy(),
+        "pension_post_reforma": np.broadcast_to(pension_post, shape).copy(),
+        "brecha_mensual_post_reforma": gap,
+    }
+
+
+##############################
+# Cierre de la brecha        #
+##############################
+
+MAX_SOLVER_RETIREMENT_AGE = 75        # Edad máxima que considera el solver de edad de jubilación
+MAX_SAVING_DOUBLINGS = 40             # Duplicaciones del ahorro antes de declarar la brecha imposible de cerrar
+
+def _bracketed_root(f, low: float, high: float, tolerance: float, max_iterations: int = 100) -> float:
+    """
+    Busca la raíz de una función creciente en [low, high], con f(low) < 0 <= f(high),
+    por regula falsi modificada (Illinois): converge como la secante sin salir del intervalo.
+    Devuelve un punto con f >= 0 a menos de `tolerance` de la raíz.
+    """
+    f_low, f_high = f(low), f(high)
+    side = 0
+    for _ in range(max_iterations):
+        if high - low <= tolerance:
+            break
+        point = high - f_high * (high - low) / (f_high - f_low)
+        if not low < point < high:
+            point = (low + high) / 2
+        f_point = f(point)
+        if f_point >= 0:
+            high, f_high = point, f_point
+            if side == 1:
+                f_low /= 2
+            side = 1
+        else:
+            low, f_low = point, f_point
+            if side == -1:
+                f_high /= 2
+            side = -1
+    return high
+
+def _total_pension_post_reform(balance: float,
+                               balance_FAPP: float,
+                               retirement_age: float,
+                               gender: str,
+                               current_month_index: int,
+                               scenario: ScenarioParams = DEFAULT_SCENARIO) -> float:
+    """
+    Pensión total post-reforma: pensión base (con PGU), compensación y bono del FAPP.
+    """
+    monthly_pension, additional_pension, _ = _post_reform_payout_scalar(
+        balance, retirement_age, gender, current_month_index, scenario)
+    return monthly_pension + additional_pension + balance_FAPP / 240
+
+def solve_extra_monthly_saving(current_age: float,
+                               retirement_age: float,
+                               current_balance: float,
+                               monthly_salary: float,
+                               gender: str,
+                               ideal_pension: float,
+                               schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                               scenario: ScenarioParams = DEFAULT_SCENARIO) -> float | None:
+    """
+    Calcula el ahorro mensual adicional (depósito fijo a la cuenta individual hasta la jubilación)
+    con el que la pensión total post-reforma alcanza la pensión objetivo a la edad de jubilación.
+    La proyección se calcula una sola vez; cada evaluación del solver es O(1).
+
+    Returns:
+        float | None: Ahorro mensual en pesos (0 si no hay brecha); None si no queda tiempo para
+        ahorrar o si ningún ahorro cierra la brecha (p. ej. jubilando después del horizonte de la
+        tabla de rentas, donde la pensión queda fija en la PGU)
+    """
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = int((retirement_age - current_age) * 12)
+    target = calculate_future_value(ideal_pension, retirement_age - current_age, scenario.inflation_rate)
+
+    accumulation = _accumulate(current_month_index, months_to_retirement, monthly_salary, schedule, scenario)
+    growth = scenario.fund_growth
+    months = max(months_to_retirement, 0)
+    balance = current_balance * growth ** months + accumulation.compounded_individual
+    # Valor a la jubilación de depositar $1 al inicio de cada mes
+    deposit_factor = growth * _geometric_sums(growth, months)[0]
+
+    def gap(saving: float) -> float:
+        return _total_pension_post_reform(balance + saving * deposit_factor, accumulation.compounded_FAPP,
+                                          retirement_age, gender, current_month_index, scenario) - target
+
+    if gap(0.0) >= 0:
+        return 0.0
+    if months == 0:
+        return None
+    high = max(target / 12, 1.0)
+    for _ in range(MAX_SAVING_DOUBLINGS):
+        if gap(high) >= 0:
+            return _bracketed_root(gap, 0.0, high, tolerance=1.0)
+        high *= 2
+    return None
+
+def solve_retirement_age(current_age: float,
+                         retirement_age: float,
+                         current_balance: float,
+                         monthly_salary: float,
+                         gender: str,
+                         ideal_pension: float,
+                         max_retirement_age: float = MAX_SOLVER_RETIREMENT_AGE,
+                         schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                         scenario: ScenarioParams = DEFAULT_SCENARIO) -> float | None:
+    """
+    Calcula la edad de jubilación mínima (en pasos de un mes desde `retirement_age`) con la que
+    la pensión total post-reforma alcanza la pensión objetivo, que también se reajusta por
+    inflación hasta esa edad. Busca por bisección sobre los meses de postergación.
+
+    Returns:
+        float | None: Edad de jubilación necesaria; None si no se alcanza antes de max_retirement_age
+    """
+    current_month_index = get_months_from_reform_start()
+
+    def gap(delay_months: int) -> float:
+        age = retirement_age + delay_months / 12
+        months_to_retirement = int((age - current_age) * 12)
+        accumulation = _accumulate(current_month_index, months_to_retirement, monthly_salary,
+                                   schedule, scenario)
+        balance = (current_balance * scenario.fund_growth ** max(months_to_retirement, 0)
+                   + accumulation.compounded_individual)
+        pension = _total_pension_post_reform(balance, accumulation.compounded_FAPP,
+                                             age, gender, current_month_index, scenario)
+        return pension - calculate_future_value(ideal_pension, age - current_age, scenario.inflation_rate)
+
+    max_delay = int((max_retirement_age - retirement_age) * 12)
+    if gap(0) >= 0:
+        return retirement_age
+    if max_delay <= 0 or gap(max_delay) < 0:
+        return None
+
+    low, high = 0, max_delay
+    while high - low > 1:
+        middle = (low + high) // 2
+        if gap(middle) >= 0:
+            high = middle
+        else:
+            low = middle
+    return retirement_age + high / 12
+
+def solve_pension_gap(current_age: float,
+                      retirement_age: float,
+                      current_balance: float,
+                      monthly_salary: float,
+                      gender: str,
+                      ideal_pension: float,
+                      max_retirement_age: float = MAX_SOLVER_RETIREMENT_AGE,
+                      schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                      scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[float, float | None, float | None]:
+    """
+    Pensión total post-reforma y ambos solvers de la brecha en una sola llamada, para enviarla
+    completa al pool de procesos.
+
+    Returns:
+        tuple: (pension_total_post_reforma, solve_extra_monthly_saving, solve_retirement_age)
+    """
+    profile = (current_age, retirement_age, current_balance, monthly_salary, gender)
+    (_, monthly_pension, additional_pension, _, monthly_bspa,
+     *_) = calculate_pension_post_reform(*profile, schedule, scenario)
+    extra_saving = solve_extra_monthly_saving(*profile, ideal_pension, schedule, scenario)
+    required_age = solve_retirement_age(*profile, ideal_pension, max_retirement_age, schedule, scenario)
+    return monthly_pension + additional_pension + monthly_bspa, extra_saving, required_age
+
+
+#################################
+# Curva por edad de jubilación  #
+#################################
+
+RETIREMENT_CURVE_AGES = tuple(range(60, 71))
+
+def _prefix_accumulations(current_month_index: int,
+                          months: int,
+                          monthly_salary: float,
+                          schedule: RateSchedule,
+                          scenario: ScenarioParams) -> np.ndarray:
+    """
+    Recorre una vez los `months` meses y devuelve, para cada horizonte M en [0, months], las
+    sumas de _Accumulation como si la jubilación fuera tras M meses (filas × campos).
+    Las sumas capitalizadas usan Σ_{m<M} aporte_m · g^(M-m) = g^M · Σ_{m<M} aporte_m · g^(-m),
+    así que todas salen de sumas acumuladas.
+    """
+    elapsed = np.arange(months)
+    salary = monthly_salary * scenario.quarterly_salary_factor ** (elapsed // 3)
+    individual = salary * schedule.window("individual", current_month_index, months)
+    women_compensation = salary * schedule.window("women_compensation", current_month_index, months)
+    fapp = salary * schedule.window("fapp", current_month_index, months)
+
+    horizon = np.arange(months + 1)
+    growth = scenario.fund_growth ** horizon
+    fapp_growth = scenario.fapp_growth ** horizon
+
+    def prefix(values: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    sums = np.empty((months + 1, len(_Accumulation._fields)))
+    sums[:, 0] = prefix(salary)
+    sums[:, 1] = growth * prefix(salary / growth[:-1])
+    sums[:, 2] = prefix(individual)
+    sums[:, 3] = prefix(women_compensation)
+    sums[:, 4] = growth * prefix(individual / growth[:-1])
+    sums[:, 5] = fapp_growth * prefix(fapp / fapp_growth[:-1])
+    return sums
+
+def pension_curve_by_retirement_age(current_age: float,
+                                    current_balance: float,
+                                    monthly_salary: float,
+                                    gender: str,
+                                    retirement_ages=RETIREMENT_CURVE_AGES,
+                                    schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                    scenario: ScenarioParams = DEFAULT_SCENARIO) -> list[dict]:
+    """
+    Calcula la pensión pre y post-reforma para cada edad de jubilación candidata con una sola
+    pasada hasta la mayor edad: se guardan las sumas del horizonte en cada mes y cada edad sólo
+    arma su resultado (PGU, compensación y bono incluidos) a partir de ellas.
+
+    Returns:
+        list[dict]: Un resultado por edad, en el orden de `retirement_ages`
+    """
+    current_month_index = get_months_from_reform_start()
+    horizons = [int((age - current_age) * 12) for age in retirement_ages]
+    sums = _prefix_accumulations(current_month_index, max(max(horizons, default=0), 0),
+                                 monthly_salary, schedule, scenario)
+
+    curve = []
+    for retirement_age, months_to_retirement in zip(retirement_ages, horizons):
+        accumulation = _Accumulation(*sums[max(months_to_retirement, 0)].tolist())
+        pre = _pre_reform_result(current_age, retirement_age, current_balance, gender, months_to_retirement,
+                                 accumulation.total_salary, accumulation.compounded_salary, scenario)
+        post = _post_reform_result(current_age, retirement_age, current_balance, gender,
+                                   months_to_retirement, current_month_index, accumulation, scenario)
+        curve.append({
+            "edad_jubilacion": retirement_age,
+            "pre_reforma": {
+                "saldo_acumulado": pre[0],
+                "pension_total": pre[1],
+                "pgu_aplicada": pre[6]
+            },
+            "post_reforma": {
+                "saldo_cuenta_individual": post[0],
+                "pension_mensual_base": post[1],
+                "pension_adicional_compensacion": post[2],
+                "bono_seguridad_previsional": post[4],
+                "pension_total": post[1] + post[2] + post[4],
+                "pgu_aplicada": post[10]
+            }
+        })
+    return curve
+
+
+#########################
+# Trayectoria mensual  #
+#########################
+
+class TrajectoryPoint(NamedTuple):
+    """
+    Estado de la cuenta post-reforma al cierre de un mes de la proyección (mes 0 = hoy).
+    """
+    mes: int
+    edad: float
+    sueldo: float
+    saldo_cuenta_individual: float
+    saldo_FAPP: float
+    aportes_acumulados: float
+    rentabilidad_acumulada: float
+
+
+def _sample_months(months: int, step_months: int, max_points: int | None):
+    """
+    Genera en orden los meses a reportar: cada `step_months` meses más el último mes y,
+    si se pide `max_points`, un submuestreo uniforme de esos meses que conserva los extremos.
+    """
+    candidates = months // step_months + 1 + (1 if months % step_months else 0)
+    count = candidates if max_points is None else max(min(max_points, candidates), 1)
+    for k in range(count):
+        j = candidates - 1 if count == 1 else round(k * (candidates - 1) / (count - 1))
+        yield min(j * step_months, months)
+
+
+def iter_post_reform_trajectory(current_age: float,
+                                retirement_age: float,
+                                current_balance: float,
+                                monthly_salary: float,
+                                step_months: int = 1,
+                                max_points: int | None = None,
+                                schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                scenario: ScenarioParams = DEFAULT_SCENARIO):
+    """
+    Recorre la proyección post-reforma mes a mes y va entregando el estado de la cuenta
+    individual y del FAPP sin guardar la trayectoria completa.
+
+    Args:
+        step_months: Reporta un punto cada `step_months` meses (12 para una curva anual)
+        max_points: Si se indica, submuestrea la curva a lo más a esa cantidad de puntos
+
+    Yields:
+        TrajectoryPoint: Estado al cierre de cada mes muestreado, incluidos el mes 0 y el último
+    """
+    if step_months < 1:
+        raise ValueError("step_months debe ser al menos 1")
+
+    current_month_index = get_months_from_reform_start()
+    months_to_retirement = max(int((retirement_age - current_age) * 12), 0)
+    growth = scenario.fund_growth
+    fapp_growth = scenario.fapp_growth
+    quarterly_factor = scenario.quarterly_salary_factor
+
+    individual = schedule.window("individual", current_month_index, months_to_retirement).tolist()
+    fapp = schedule.window("fapp", current_month_index, months_to_retirement).tolist()
+
+    salary = monthly_salary
+    balance = current_balance
+    balance_FAPP = 0.0
+    contributions = 0.0
+    samples = _sample_months(months_to_retirement, step_months, max_points)
+    next_sample = next(samples)
+
+    for month in range(months_to_retirement + 1):
+        if month == next_sample:
+            yield TrajectoryPoint(month, current_age + month / 12, salary, balance, balance_FAPP,
+                                  contributions, balance - current_balance - contributions)
+            next_sample = next(samples, None)
+            if next_sample is None:
+                return
+        if month == months_to_retirement:
+            return
+
+        contribution = salary * individual[month]
+        contributions += contribution
+        balance = (balance + contribution) * growth
+        balance_FAPP = (balance_FAPP + salary * fapp[month]) * fapp_growth
+
+        # Actualización del sueldo trimestralmente
+        if month % 3 == 2:
+            salary *= quarterly_factor
+
+
 def main():
     # Parámetros de ejemplo:
     current_age_years = 41      # Años
@@ -393,7 +1470,8 @@ def main():
     gender = 'F'                 # 'M' para hombre, 'F' para mujer
 
     print("\n=== Sistema Pre-reforma ===")
-    final_balance_pre, pension_pre, worker_total_pre, employer_total_pre, sis_total_pre, returns_pre = calculate_pension_pre_reform(
+    (final_balance_pre, pension_pre, worker_total_pre, employer_total_pre, sis_total_pre, returns_pre,
+     pgu_applied_pre) = calculate_pension_pre_reform(
         current_age,
         retirement_age,
         current_balance,
@@ -402,7 +1480,7 @@ def main():
     )
     
     # Cálculo de años y meses común para ambos sistemas
-    life_expectancy = 86.6 if gender.upper() == 'M' else 90.8
+    life_expectancy = DEFAULT_SCENARIO.annuity_table.life_expectancy(gender, retirement_age)
     total_pension_years = life_expectancy - retirement_age
     pension_years = int(total_pension_years)
     pension_months = int((total_pension_years - pension_years) * 12)
@@ -417,15 +1495,16 @@ def main():
     print(f"Años de pensión según expectativa de vida: {pension_years} años y {pension_months} meses")
 
     print("\n=== Sistema Post-reforma ===")
-    (final_balance_post, pension_post, total_pension_post, additional_pension_post,
-     fapp_balance, monthly_bspa, sis_total_post, women_comp_total, worker_total_post, 
-     employer_total_post, returns_post) = calculate_pension_post_reform(
+    (final_balance_post, pension_post, additional_pension_post,
+     fapp_balance, monthly_bspa, sis_total_post, women_comp_total, worker_total_post,
+     employer_total_post, returns_post, pgu_applied_post) = calculate_pension_post_reform(
         current_age,
         retirement_age,
         current_balance,
         monthly_salary,
         gender
     )
+    total_pension_post = pension_post + additional_pension_post + monthly_bspa
     print(f"Saldo acumulado en cuenta individual: {final_balance_post:,.0f} pesos")
     print(f"Aporte al seguro de invalidez y sobrevivencia: {sis_total_post:,.0f} pesos")
     print(f"Aporte compensación por diferencias de expectativa de vida: {women_comp_total:,.0f} pesos")
@@ -0,0 +1,117 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Kernels compilados de la acumulación mensual hasta la jubilación.
+
+Recorren el horizonte mes a mes con aritmética en C (doubles e ints tipados) sobre las
+ventanas de tasas del calendario de la reforma. Devuelven las mismas sumas que
+pension_core._accumulate; si este módulo no está compilado, pension_core usa su
+forma cerrada en Python puro.
+"""
+
+# Cantidad de sumas que devuelve cada acumulación (ver pension_core._Accumulation)
+cdef enum:
+    FIELDS = 6
+
+ACCUMULATION_FIELDS = FIELDS
+
+
+cdef void _accumulate_into(Py_ssize_t months,
+                           double monthly_salary,
+                           const double[::1] individual,
+                           const double[::1] women_compensation,
+                           const double[::1] fapp,
+                           double growth,
+                           double fapp_growth,
+                           double quarterly_factor,
+                           double* out) noexcept nogil:
+    cdef double salary = monthly_salary
+    cdef double total_salary = 0.0
+    cdef double compounded_salary = 0.0
+    cdef double total_individual = 0.0
+    cdef double total_women = 0.0
+    cdef double compounded_individual = 0.0
+    cdef double compounded_fapp = 0.0
+    cdef double contribution
+    cdef Py_ssize_t month
+
+    for month in range(months):
+        contribution = salary * individual[month]
+        total_salary += salary
+        total_individual += contribution
+        total_women += salary * women_compensation[month]
+
+        # Cada suma capitalizada avanza como un saldo: (saldo + aporte) * (1 + tasa)
+        compounded_salary = (compounded_salary + salary) * growth
+        compounded_individual = (compounded_individual + contribution) * growth
+        compounded_fapp = (compounded_fapp + salary * fapp[month]) * fapp_growth
+
+        # Actualización del sueldo trimestralmente
+        if month % 3 == 2:
+            salary *= quarterly_factor
+
+    out[0] = total_salary
+    out[1] = compounded_salary
+    out[2] = total_individual
+    out[3] = total_women
+    out[4] = compounded_individual
+    out[5] = compounded_fapp
+
+
+cpdef tuple accumulate(long months,
+                       double monthly_salary,
+                       const double[::1] individual,
+                       const double[::1] women_compensation,
+                       const double[::1] fapp,
+                       double growth,
+                       double fapp_growth,
+                       double quarterly_factor):
+    """
+    Acumula un perfil. Las ventanas de tasas deben cubrir al menos `months` meses.
+
+    Returns:
+        tuple: (total_salary, compounded_salary, total_individual_contribution,
+                total_women_compensation, compounded_individual, compounded_FAPP)
+    """
+    cdef double out[FIELDS]
+    if months < 0:
+        months = 0
+    if individual.shape[0] < months or women_compensation.shape[0] < months or fapp.shape[0] < months:
+        raise ValueError("Las ventanas de tasas no cubren el horizonte")
+    _accumulate_into(months, monthly_salary, individual, women_compensation, fapp,
+                     growth, fapp_growth, quarterly_factor, out)
+    return (out[0], out[1], out[2], out[3], out[4], out[5])
+
+
+def accumulate_batch(const long long[::1] months,
+                     const double[::1] monthly_salary,
+                     const double[::1] individual,
+                     const double[::1] women_compensation,
+                     const double[::1] fapp,
+                     double growth,
+                     double fapp_growth,
+                     double quarterly_factor,
+                     double[:, ::1] out):
+    """
+    Acumula muchos perfiles que comparten el mes actual de la reforma, escribiendo una fila
+    de `out` (perfiles × ACCUMULATION_FIELDS) por perfil. Libera el GIL durante todo el
+    cálculo, de modo que varios hilos pueden proyectar bloques distintos a la vez.
+    """
+    cdef Py_ssize_t count = months.shape[0]
+    cdef Py_ssize_t horizon = individual.shape[0]
+    cdef Py_ssize_t i
+    cdef long long profile_months
+
+    if monthly_salary.shape[0] != count or out.shape[0] != count or out.shape[1] != FIELDS:
+        raise ValueError("Las dimensiones de los perfiles no coinciden")
+    if women_compensation.shape[0] < horizon or fapp.shape[0] < horizon:
+        raise ValueError("Las ventanas de tasas no cubren el horizonte")
+
+    with nogil:
+        for i in range(count):
+            profile_months = months[i]
+            if profile_months < 0:
+                profile_months = 0
+            if profile_months > horizon:
+                profile_months = horizon
+            _accumulate_into(profile_months, monthly_salary[i], individual, women_compensation, fapp,
+                             growth, fapp_growth, quarterly_factor, &out[i, 0])
@@ -0,0 +1,208 @@
+"""
+Proyección agregada del sistema post-reforma sobre una población de afiliados.
+
+La población se recorre por bloques (sintética o desde un CSV) y de cada bloque sólo se guarda
+la masa salarial activa por mes: todos los flujos del sistema (aportes al FAPP, compensación
+para mujeres, SIS y aportes del empleador) son una tasa del calendario por esa masa. La memoria
+depende del tamaño de bloque y del horizonte, no del tamaño de la población.
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    get_months_from_reform_start,
+)
+from app.calculator.rate_schedule import RateSchedule
+from app.calculator.scenario import ScenarioParams
+
+SYSTEM_HORIZON_MONTHS = 480           # 40 años
+POPULATION_CHUNK_SIZE = 100_000
+SIS_RATE = 0.015                      # Seguro de invalidez y sobrevivencia, sobre el sueldo
+RETIREMENT_AGE = {"M": 65, "F": 60}   # Edad legal de jubilación por género
+
+
+def synthetic_population_chunk(chunk_index: int, chunk_size: int, seed: int) -> dict:
+    """
+    Genera un bloque de afiliados sintéticos. Cada bloque usa su propio generador derivado de
+    (seed, chunk_index), así que los bloques se pueden generar en cualquier orden o proceso.
+
+    Returns:
+        dict: Arrays current_age, retirement_age, monthly_salary y gender del bloque
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    is_male = rng.random(chunk_size) < 0.5
+    return {
+        "current_age": rng.uniform(18, 65, chunk_size),
+        "retirement_age": np.where(is_male, RETIREMENT_AGE["M"], RETIREMENT_AGE["F"]).astype(np.float64),
+        "monthly_salary": np.clip(rng.lognormal(np.log(750000), 0.65, chunk_size), 500000, 10000000),
+        "gender": np.where(is_male, "M", "F"),
+    }
+
+
+def iter_population_csv(path: str, chunk_size: int = POPULATION_CHUNK_SIZE):
+    """
+    Lee afiliados desde un CSV por bloques. Columnas: current_age (o current_age_years y
+    current_age_months), monthly_salary, gender y, opcionalmente, retirement_age (si falta,
+    la edad legal según género).
+
+    Yields:
+        dict: Arrays por columna de cada bloque de hasta `chunk_size` afiliados
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.DictReader(file)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            gender = np.array([row["gender"].strip().upper() for row in rows])
+            if "current_age" in rows[0]:
+                current_age = np.array([float(row["current_age"]) for row in rows])
+            else:
+                current_age = np.array([int(row["current_age_years"]) + int(row["current_age_months"]) / 12
+                                        for row in rows])
+            if rows[0].get("retirement_age"):
+                retirement_age = np.array([float(row["retirement_age"]) for row in rows])
+            else:
+                retirement_age = np.where(gender == "M", RETIREMENT_AGE["M"], RETIREMENT_AGE["F"]).astype(np.float64)
+            yield {
+                "current_age": current_age,
+                "retirement_age": retirement_age,
+                "monthly_salary": np.array([float(row["monthly_salary"]) for row in rows]),
+                "gender": gender,
+            }
+
+
+def _chunk_salary_mass(chunk: dict, horizon: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce un bloque a (masa salarial inicial de los que siguen cotizando en cada mes, cotizantes
+    por mes). Un afiliado cotiza en el mes t si le quedan más de t meses para jubilar.
+    """
+    months = np.clip(((chunk["retirement_age"] - chunk["current_age"]) * 12).astype(np.int64), 0, horizon)
+    # Sueldo y cantidad de quienes dejan de cotizar en cada mes; la cola acumulada da los activos
+    leaving_salary = np.bincount(months, weights=chunk["monthly_salary"], minlength=horizon + 1)
+    leaving = np.bincount(months, minlength=horizon + 1)
+    salary_mass = leaving_salary[::-1].cumsum()[::-1][1:]
+    contributors = leaving[::-1].cumsum()[::-1][1:]
+    return salary_mass, contributors
+
+
+def _synthetic_chunk_salary_mass(task: tuple) -> tuple[np.ndarray, np.ndarray, int]:
+    chunk_index, chunk_size, seed, horizon = task
+    chunk = synthetic_population_chunk(chunk_index, chunk_size, seed)
+    return (*_chunk_salary_mass(chunk, horizon), chunk_size)
+
+
+def _csv_chunk_salary_mass(task: tuple) -> tuple[np.ndarray, np.ndarray, int]:
+    chunk, horizon = task
+    return (*_chunk_salary_mass(chunk, horizon), chunk["monthly_salary"].size)
+
+
+def _bounded_map(function, tasks, workers: int | None):
+    """
+    Aplica `function` a las tareas en un pool de procesos con a lo más 2 × procesos tareas en
+    vuelo, para no materializar la población completa; con un solo proceso, en línea.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(function, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = iter(tasks)
+        pending = [executor.submit(function, task) for task in islice(tasks, 2 * workers)]
+        while pending:
+            result = pending.pop(0).result()
+            for task in islice(tasks, 1):
+                pending.append(executor.submit(function, task))
+            yield result
+
+
+def _system_flows(salary_mass: np.ndarray,
+                  contributors: np.ndarray,
+                  affiliates: int,
+                  horizon: int,
+                  schedule: RateSchedule,
+                  scenario: ScenarioParams) -> dict:
+    """
+    Convierte la masa salarial inicial activa por mes en los flujos mensuales del sistema.
+    """
+    current_month_index = get_months_from_reform_start()
+    # Masa salarial efectiva: los sueldos crecen cada trimestre igual que en la proyección individual
+    wages = salary_mass * scenario.quarterly_salary_factor ** (np.arange(horizon) // 3)
+    individual = schedule.window("individual", current_month_index, horizon)
+    fapp_contribution = wages * schedule.window("fapp", current_month_index, horizon)
+
+    # Saldo del FAPP sin considerar pagos de beneficios: (saldo + aporte) * (1 + tasa) cada mes
+    fapp_growth = scenario.fapp_growth
+    fapp_balance = np.cumsum(fapp_contribution * fapp_growth ** -np.arange(horizon)) * fapp_growth ** np.arange(1, horizon + 1)
+
+    return {
+        "afiliados": affiliates,
+        "meses": horizon,
+        "mes_reforma_inicial": current_month_index,
+        "cotizantes": contributors,
+        "masa_salarial": wages,
+        "aporte_trabajador": scenario.worker_rate * wages,
+        "aporte_empleador_cuenta_individual": (individual - scenario.worker_rate) * wages,
+        "compensacion_mujeres": wages * schedule.window("women_compensation", current_month_index, horizon),
+        "aporte_FAPP": fapp_contribution,
+        "aporte_sis": SIS_RATE * wages,
+        "aporte_empleador_adicional": wages * schedule.window("employer_additional", current_month_index, horizon),
+        "saldo_FAPP": fapp_balance,
+    }
+
+
+def _aggregate(results, horizon: int) -> tuple[np.ndarray, np.ndarray, int]:
+    salary_mass = np.zeros(horizon)
+    contributors = np.zeros(horizon, dtype=np.int64)
+    affiliates = 0
+    for chunk_mass, chunk_contributors, chunk_size in results:
+        salary_mass += chunk_mass
+        contributors += chunk_contributors
+        affiliates += chunk_size
+    return salary_mass, contributors, affiliates
+
+
+def project_synthetic_population(size: int,
+                                 seed: int = 0,
+                                 horizon_months: int = SYSTEM_HORIZON_MONTHS,
+                                 chunk_size: int = POPULATION_CHUNK_SIZE,
+                                 workers: int | None = None,
+                                 schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                                 scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Proyecta los flujos mensuales del sistema para `size` afiliados sintéticos. Cada proceso
+    genera y reduce sus propios bloques, así que sólo viajan entre procesos los vectores por mes.
+
+    Returns:
+        dict: Totales mensuales del sistema (arrays de `horizon_months` meses)
+    """
+    tasks = ((index, min(chunk_size, size - start), seed, horizon_months)
+             for index, start in enumerate(range(0, size, chunk_size)))
+    salary_mass, contributors, affiliates = _aggregate(
+        _bounded_map(_synthetic_chunk_salary_mass, tasks, workers), horizon_months)
+    return _system_flows(salary_mass, contributors, affiliates, horizon_months, schedule, scenario)
+
+
+def project_population_csv(path: str,
+                           horizon_months: int = SYSTEM_HORIZON_MONTHS,
+                           chunk_size: int = POPULATION_CHUNK_SIZE,
+                           workers: int | None = None,
+                           schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                           scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Proyecta los flujos mensuales del sistema para los afiliados de un CSV (ver
+    iter_population_csv), leyéndolo por bloques.
+
+    Returns:
+        dict: Totales mensuales del sistema (arrays de `horizon_months` meses)
+    """
+    tasks = ((chunk, horizon_months) for chunk in iter_population_csv(path, chunk_size))
+    salary_mass, contributors, affiliates = _aggregate(
+        _bounded_map(_csv_chunk_salary_mass, tasks, workers), horizon_months)
+    return _system_flows(salary_mass, contributors, affiliates, horizon_months, schedule, scenario)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Horizonte de las tablas: 100 años de meses desde feb 2025. Más allá se repite el último valor.
+DEFAULT_HORIZON = 1200
+
+RATE_NAMES = ("individual", "women_compensation", "fapp", "employer_additional")
+
+
+def _expand_bands(bands: tuple, horizon: int) -> np.ndarray:
+    """
+    Convierte una tabla de tramos (mes_inicio, valor_inicial, pendiente_mensual) en un array
+    con la tasa de cada mes en [0, horizon).
+    """
+    months = np.arange(horizon, dtype=np.float64)
+    rates = np.empty(horizon, dtype=np.float64)
+    starts = [start for start, _, _ in bands[1:]] + [horizon]
+    for (start, value, slope), end in zip(bands, starts):
+        rates[start:end] = value + slope * (months[start:end] - start)
+    return rates
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class RateSchedule:
+    """
+    Calendario inmutable de tasas de la reforma, indexado por mes desde feb 2025 (m=0).
+
+    Se construye una sola vez a partir de tablas de tramos y guarda, para cada tasa, un array
+    contiguo con el valor de cada mes y el tramo vigente en cada mes, de modo que las consultas
+    (tasa o tramo) son O(1) y los kernels pueden tomar ventanas completas sin recorrer los tramos.
+    Cada calendario se identifica por su `version`: un cambio legal es un nuevo calendario.
+    """
+    version: str
+    horizon: int
+    bands: dict = field(repr=False)
+    breakpoints: tuple = field(repr=False)
+    rates: dict = field(repr=False)
+    band_index: dict = field(repr=False)       # tasa -> índice del tramo vigente en cada mes
+
+    @classmethod
+    def from_bands(cls, version: str, horizon: int = DEFAULT_HORIZON, **bands: tuple) -> "RateSchedule":
+        """
+        Construye el calendario a partir de las tablas de tramos de cada tasa.
+
+        Args:
+            version: Identificador del calendario (p. ej. la ley que lo define)
+            horizon: Cantidad de meses precalculados
+            **bands: Una tabla de tramos por cada nombre en RATE_NAMES
+        """
+        missing = set(RATE_NAMES) - set(bands)
+        if missing:
+            raise ValueError(f"Faltan tramos para: {', '.join(sorted(missing))}")
+
+        rates = {}
+        band_index = {}
+        months = np.arange(horizon)
+        for name in RATE_NAMES:
+            rates[name] = _freeze(_expand_bands(bands[name], horizon))
+            starts = [start for start, _, _ in bands[name]]
+            band_index[name] = _freeze(np.maximum(np.searchsorted(starts, months, side="right") - 1, 0))
+
+        breakpoints = tuple(sorted({start for name in RATE_NAMES for start, _, _ in bands[name]}))
+        return cls(version=version,
+                   horizon=horizon,
+                   bands={name: tuple(bands[name]) for name in RATE_NAMES},
+                   breakpoints=breakpoints,
+                   rates=rates,
+                   band_index=band_index)
+
+    @property
+    def individual(self) -> np.ndarray:
+        return self.rates["individual"]
+
+    @property
+    def women_compensation(self) -> np.ndarray:
+        return self.rates["women_compensation"]
+
+    @property
+    def fapp(self) -> np.ndarray:
+        return self.rates["fapp"]
+
+    @property
+    def employer_additional(self) -> np.ndarray:
+        return self.rates["employer_additional"]
+
+    def rate(self, name: str, month_index: int) -> float:
+        """
+        Devuelve la tasa `name` del mes indicado en O(1).
+        """
+        table = self.rates[name]
+        return float(table[min(max(month_index, 0), self.horizon - 1)])
+
+    def window(self, name: str, start: int, months: int) -> np.ndarray:
+        """
+        Devuelve las tasas `name` de los meses [start, start + months).
+        Es una vista sin copia mientras la ventana cabe en el horizonte.
+        """
+        table = self.rates[name]
+        start = max(start, 0)
+        end = start + max(months, 0)
+        if end <= self.horizon:
+            return table[start:end]
+        inside = table[min(start, self.horizon):]
+        return np.concatenate((inside, np.full(end - max(start, self.horizon), table[-1])))
+
+    def band_rate(self, name: str, month_index: int) -> tuple[float, float]:
+        """
+        Devuelve (tasa, pendiente_mensual) vigentes en el mes indicado, para los cálculos por tramo.
+        El tramo sale del índice precalculado en O(1); más allá del horizonte rige el último.
+        """
+        bands = self.bands[name]
+        if month_index < bands[0][0]:
+            return bands[0][1], bands[0][2]
+        start, value, slope = bands[self.band_index[name][min(month_index, self.horizon - 1)]]
+        return value + slope * (month_index - start), slope
+
+    def segments(self, month_offset: int, months: int):
+        """
+        Divide el horizonte [0, months) en segmentos donde todas las tasas son constantes o
+        lineales. Los meses son relativos al mes actual (month_offset).
+        """
+        edges = [0]
+        for start in self.breakpoints:
+            local = start - month_offset
+            if 0 < local < months:
+                edges.append(local)
+        edges.append(months)
+        for start, end in zip(edges, edges[1:]):
+            if end > start:
+                yield start, end
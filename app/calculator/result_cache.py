@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    Cache acotado LRU con expiración (TTL) para resultados inmutables de la calculadora.
+
+    Guarda a lo más `maxsize` entradas; al llenarse descarta la usada hace más tiempo y cada
+    entrada vence `ttl` segundos después de calculada. Es seguro entre hilos y lleva contadores
+    de aciertos, fallos y desalojos.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize debe ser al menos 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Devuelve el valor guardado para `key`, o `default` si no existe o ya venció.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado para `key`; si no está, lo calcula con `compute()` y lo guarda.
+        El cálculo se hace fuera del lock, así que dos fallos simultáneos pueden calcular dos veces.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "capacidad": self.maxsize,
+                "ttl_segundos": self.ttl,
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "desalojos": self.evictions,
+                "expiraciones": self.expirations,
+                "tasa_aciertos": self.hits / requests if requests else 0.0
+            }
@@ -0,0 +1,354 @@
+"""
+Resultado tipado de un cálculo de pensiones y sus vistas serializadas.
+
+El resultado se arma una sola vez a partir de las tuplas del kernel (pension_core / funds) y de
+él salen el documento de MongoDB, la respuesta de la API, la respuesta de /api/get_session y el
+contexto del PDF, sin repetir cálculos ni reconstruir diccionarios intermedios.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.calculator.pension_core import (
+    ANNUAL_INTEREST_RATE,
+    DEFAULT_SCENARIO,
+    EQUIVALENT_FUND_RATE,
+    INFLATION_RATE,
+    SALARY_GROWTH_RATE,
+    calculate_future_value,
+)
+from app.calculator.scenario import ScenarioParams
+
+# Constantes guardadas con cada documento
+DOCUMENT_CONSTANTS = {
+    "ANNUAL_INTEREST_RATE": ANNUAL_INTEREST_RATE,
+    "SALARY_GROWTH_RATE": SALARY_GROWTH_RATE,
+    "EQUIVALENT_FUND_RATE": EQUIVALENT_FUND_RATE,
+    "INFLATION_RATE": INFLATION_RATE,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class PreReformResult:
+    """Resultado pre-reforma (mismo orden que la tupla de calculate_pension_pre_reform)."""
+    balance: float
+    monthly_pension: float
+    worker_contribution: float
+    employer_contribution: float
+    sis_contribution: float
+    accumulated_returns: float
+    pgu_applied: bool
+
+    @property
+    def total_pension(self) -> float:
+        return self.monthly_pension
+
+    def to_document(self) -> dict:
+        return {
+            "saldo_acumulado": {
+                "saldo_cuenta_individual": self.balance,
+                "aporte_trabajador": self.worker_contribution,
+                "aporte_empleador": self.employer_contribution,
+                "rentabilidad_acumulada": self.accumulated_returns
+            },
+            "aporte_sis": self.sis_contribution,
+            "pension_mensual_base": self.monthly_pension,
+            "pension_total": self.monthly_pension,
+            "pgu_aplicada": self.pgu_applied
+        }
+
+    def to_summary(self) -> dict:
+        return {
+            "pension_total": round(self.monthly_pension, 2),
+            "saldo_acumulado": {
+                "aporte_trabajador": round(self.worker_contribution, 2),
+                "aporte_empleador": round(self.employer_contribution, 2),
+                "rentabilidad_acumulada": round(self.accumulated_returns, 2)
+            }
+        }
+
+    @classmethod
+    def from_tuple(cls, result: tuple) -> "PreReformResult":
+        """
+        Desde la tupla del kernel, con montos float y PGU bool sin importar quién la calculó
+        (escalar, lote vectorizado, fondos o tabla sustituta).
+        """
+        *amounts, pgu_applied = result
+        return cls(*map(float, amounts), bool(pgu_applied))
+
+    @classmethod
+    def from_document(cls, section: dict) -> "PreReformResult":
+        balance = section["saldo_acumulado"]
+        return cls(balance["saldo_cuenta_individual"], section["pension_mensual_base"],
+                   balance["aporte_trabajador"], balance["aporte_empleador"], section["aporte_sis"],
+                   balance["rentabilidad_acumulada"], section["pgu_aplicada"])
+
+
+@dataclass(frozen=True, slots=True)
+class PostReformResult:
+    """Resultado post-reforma (mismo orden que la tupla de calculate_pension_post_reform)."""
+    balance: float
+    monthly_pension: float
+    additional_pension: float
+    fapp_balance: float
+    monthly_bspa: float
+    sis_contribution: float
+    women_compensation: float
+    worker_contribution: float
+    employer_contribution: float
+    accumulated_returns: float
+    pgu_applied: bool
+
+    @property
+    def total_pension(self) -> float:
+        # Pensión base + compensación por expectativa de vida + bono de seguridad previsional
+        return self.monthly_pension + self.additional_pension + self.monthly_bspa
+
+    def to_document(self) -> dict:
+        return {
+            "saldo_acumulado": {
+                "saldo_cuenta_individual": self.balance,
+                "aporte_trabajador": self.worker_contribution,
+                "aporte_empleador": self.employer_contribution,
+                "rentabilidad_acumulada": self.accumulated_returns
+            },
+            "aporte_sis": self.sis_contribution,
+            "aporte_compensacion_expectativa_vida": self.women_compensation,
+            "balance_fapp": self.fapp_balance,
+            "bono_seguridad_previsional": self.monthly_bspa,
+            "pension_mensual_base": self.monthly_pension,
+            "pension_adicional_compensacion": self.additional_pension,
+            "pension_total": self.total_pension,
+            "pgu_aplicada": self.pgu_applied
+        }
+
+    def to_summary(self) -> dict:
+        return {
+            "pension_total": round(self.total_pension, 2),
+            "pension_mensual_base": round(self.monthly_pension, 2),
+            "pension_adicional_compensacion": round(self.additional_pension, 2),
+            "bono_seguridad_previsional": round(self.monthly_bspa, 2),
+            "saldo_acumulado": {
+                "aporte_trabajador": round(self.worker_contribution, 2),
+                "aporte_empleador": round(self.employer_contribution, 2),
+                "rentabilidad_acumulada": round(self.accumulated_returns, 2)
+            }
+        }
+
+    @classmethod
+    def from_tuple(cls, result: tuple) -> "PostReformResult":
+        """
+        Desde la tupla del kernel, con montos float y PGU bool sin importar quién la calculó
+        (escalar, lote vectorizado, fondos o tabla sustituta).
+        """
+        *amounts, pgu_applied = result
+        return cls(*map(float, amounts), bool(pgu_applied))
+
+    @classmethod
+    def from_document(cls, section: dict) -> "PostReformResult":
+        balance = section["saldo_acumulado"]
+        return cls(balance["saldo_cuenta_individual"], section["pension_mensual_base"],
+                   section["pension_adicional_compensacion"], section["balance_fapp"],
+                   section["bono_seguridad_previsional"], section["aporte_sis"],
+                   section["aporte_compensacion_expectativa_vida"], balance["aporte_trabajador"],
+                   balance["aporte_empleador"], balance["rentabilidad_acumulada"], section["pgu_aplicada"])
+
+
+@dataclass(frozen=True, slots=True)
+class FundOutcome:
+    """Saldo y pensión total de una opción de fondo en ambos sistemas."""
+    pre_balance: float
+    pre_pension: float
+    post_balance: float
+    post_pension: float
+
+    @classmethod
+    def from_results(cls, pre_result: tuple, post_result: tuple) -> "FundOutcome":
+        return cls(pre_result[0], pre_result[1], post_result[0],
+                   PostReformResult.from_tuple(post_result).total_pension)
+
+    def to_dict(self) -> dict:
+        return {
+            "pre_reforma": {
+                "saldo_cuenta_individual": round(self.pre_balance, 2),
+                "pension_total": round(self.pre_pension, 2)
+            },
+            "post_reforma": {
+                "saldo_cuenta_individual": round(self.post_balance, 2),
+                "pension_total": round(self.post_pension, 2)
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, outcome: dict) -> "FundOutcome":
+        return cls(outcome["pre_reforma"]["saldo_cuenta_individual"], outcome["pre_reforma"]["pension_total"],
+                   outcome["post_reforma"]["saldo_cuenta_individual"], outcome["post_reforma"]["pension_total"])
+
+
+@dataclass(frozen=True, slots=True)
+class PensionTarget:
+    """Pensión objetivo del afiliado a la fecha de jubilación y brecha con la pensión post-reforma."""
+    present_value: float
+    future_value: float
+    monthly_gap: float
+    inflation_rate: float = INFLATION_RATE
+
+    def to_document(self) -> dict:
+        return {
+            "valor_presente": self.present_value,
+            "valor_futuro": self.future_value,
+            "tasa_inflacion_anual": self.inflation_rate,
+            "brecha_mensual_post_reforma": self.monthly_gap
+        }
+
+    def to_summary(self) -> dict:
+        return {
+            "valor_presente": round(self.present_value, 2),
+            "valor_futuro": round(self.future_value, 2),
+            "brecha_mensual_post_reforma": round(self.monthly_gap, 2)
+        }
+
+    @classmethod
+    def from_document(cls, section: dict) -> "PensionTarget":
+        return cls(section["valor_presente"], section["valor_futuro"], section["brecha_mensual_post_reforma"],
+                   section.get("tasa_inflacion_anual", INFLATION_RATE))
+
+
+@dataclass(frozen=True, slots=True)
+class PensionResult:
+    """
+    Resultado completo de un cálculo: perfil del afiliado, ambos sistemas, pensión objetivo y,
+    si se pidieron, la comparación de fondos y la simulación.
+    """
+    session_id: str
+    name: str
+    current_age: float
+    gender: str
+    retirement_age: float
+    current_balance: float
+    monthly_salary: float
+    studies: str
+    life_expectancy: float
+    fund: Optional[str]
+    pre: PreReformResult
+    post: PostReformResult
+    target: PensionTarget
+    fund_comparison: Optional[dict] = None      # opción -> FundOutcome
+    simulation: Optional[dict] = None
+
+    @classmethod
+    def from_calculation(cls,
+                         session_id: str,
+                         name: str,
+                         current_age: float,
+                         gender: str,
+                         retirement_age: float,
+                         current_balance: float,
+                         monthly_salary: float,
+                         ideal_pension: float,
+                         pre_result: tuple,
+                         post_result: tuple,
+                         studies: str = "",
+                         fund: Optional[str] = None,
+                         fund_results: Optional[dict] = None,
+                         simulation: Optional[dict] = None,
+                         scenario: ScenarioParams = DEFAULT_SCENARIO) -> "PensionResult":
+        """
+        Arma el resultado desde las tuplas (pre, post) del kernel y, opcionalmente, el dict
+        opción -> (pre, post) de compare_funds.
+        """
+        pre = PreReformResult.from_tuple(pre_result)
+        post = PostReformResult.from_tuple(post_result)
+        future_value = calculate_future_value(ideal_pension, retirement_age - current_age, scenario.inflation_rate)
+        target = PensionTarget(ideal_pension, future_value, max(0, future_value - post.total_pension),
+                               scenario.inflation_rate)
+        fund_comparison = None if fund_results is None else {
+            option: FundOutcome.from_results(fund_pre, fund_post)
+            for option, (fund_pre, fund_post) in fund_results.items()
+        }
+        return cls(session_id, name, current_age, gender, retirement_age, current_balance, monthly_salary,
+                   studies, scenario.annuity_table.life_expectancy(gender, retirement_age), fund,
+                   pre, post, target, fund_comparison, simulation)
+
+    @classmethod
+    def from_document(cls, document: dict) -> "PensionResult":
+        """Reconstruye el resultado desde un documento guardado (o su proyección sin constantes)."""
+        metadata = document["metadata"]
+        fund_comparison = document.get("comparacion_fondos")
+        if fund_comparison is not None:
+            fund_comparison = {option: FundOutcome.from_dict(outcome) for option, outcome in fund_comparison.items()}
+        return cls(document.get("sessionId", ""), metadata["nombre"], metadata["edad"], metadata["genero"],
+                   metadata["edad_jubilacion"], metadata["balance_actual"], metadata["salario_mensual"],
+                   metadata.get("estudios", ""), metadata["expectativa_vida"], metadata.get("fondo"),
+                   PreReformResult.from_document(document["pre_reforma"]),
+                   PostReformResult.from_document(document["post_reforma"]),
+                   PensionTarget.from_document(document["pension_objetivo"]),
+                   fund_comparison, document.get("simulacion"))
+
+    def _metadata(self) -> dict:
+        return {
+            "nombre": self.name,
+            "edad": self.current_age,
+            "genero": self.gender,
+            "edad_jubilacion": self.retirement_age,
+            "balance_actual": self.current_balance,
+            "salario_mensual": self.monthly_salary,
+            "estudios": self.studies,
+            "expectativa_vida": self.life_expectancy,
+            "fondo": self.fund
+        }
+
+    def _fund_comparison_dict(self) -> dict:
+        return {option: outcome.to_dict() for option, outcome in self.fund_comparison.items()}
+
+    def to_pdf_context(self) -> dict:
+        """Datos que leen el PDF y el asesor (sin redondear)."""
+        return {
+            "pre_reforma": self.pre.to_document(),
+            "post_reforma": self.post.to_document(),
+            "pension_objetivo": self.target.to_document(),
+            "metadata": self._metadata()
+        }
+
+    def to_document(self, timestamp: Optional[datetime] = None) -> dict:
+        """Documento de MongoDB."""
+        document = {
+            "sessionId": self.session_id,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+            **self.to_pdf_context(),
+            "constants": dict(DOCUMENT_CONSTANTS)
+        }
+        if self.fund_comparison is not None:
+            document["comparacion_fondos"] = self._fund_comparison_dict()
+        if self.simulation is not None:
+            document["simulacion"] = self.simulation
+        return document
+
+    def _summary(self) -> dict:
+        return {
+            "sessionId": self.session_id,
+            "pre_reforma": self.pre.to_summary(),
+            "post_reforma": self.post.to_summary(),
+            "pension_objetivo": self.target.to_summary(),
+            "metadata": {
+                "expectativa_vida": round(self.life_expectancy, 2),
+                "genero": self.gender.upper()
+            }
+        }
+
+    def to_response(self) -> dict:
+        """Respuesta simplificada de /api/calculate_pension."""
+        response = self._summary()
+        response["metadata"]["fondo"] = self.fund
+        if self.fund_comparison is not None:
+            response["comparacion_fondos"] = self._fund_comparison_dict()
+        if self.simulation is not None:
+            response["simulacion"] = self.simulation
+        return response
+
+    def to_session_response(self) -> dict:
+        """Respuesta de /api/get_session (sin la simulación)."""
+        response = self._summary()
+        if self.fund_comparison is not None:
+            response["comparacion_fondos"] = self._fund_comparison_dict()
+        return response
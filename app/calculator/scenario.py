@@ -0,0 +1,92 @@
+import threading
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+from app.calculator.mortality import LEGACY_ANNUITY_TABLE, AnnuityTable
+
+# Parámetros ya construidos, para que cada combinación de supuestos exista una sola vez
+_INTERNED: dict = {}
+_INTERNED_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ScenarioParams:
+    """
+    Supuestos inmutables de una proyección (económicos y tabla de rentas vitalicias), con sus
+    tasas derivadas precalculadas.
+
+    Reemplaza a los globales del módulo cuando un cálculo usa supuestos propios: cada solicitud
+    recibe su propio objeto, por lo que los cálculos concurrentes nunca se pisan. Construir con
+    ScenarioParams.of(...) o .replace(...): combinaciones iguales devuelven el mismo objeto, así
+    que las tasas derivadas se calculan una sola vez por combinación.
+    """
+    worker_rate: float
+    annual_interest_rate: float
+    salary_growth_rate: float
+    equivalent_fund_rate: float
+    inflation_rate: float
+    pension_minima: float
+    # Convierte saldos en pensiones mensuales (ver mortality.AnnuityTable)
+    annuity_table: AnnuityTable = LEGACY_ANNUITY_TABLE
+
+    # Derivados (se calculan al construir)
+    monthly_interest_rate: float = field(init=False, repr=False, compare=False)
+    monthly_equivalent_fund_rate: float = field(init=False, repr=False, compare=False)
+    quarterly_salary_factor: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        set_derived = object.__setattr__
+        set_derived(self, "monthly_interest_rate", (1 + self.annual_interest_rate) ** (1/12) - 1)
+        set_derived(self, "monthly_equivalent_fund_rate", (1 + self.equivalent_fund_rate) ** (1/12) - 1)
+        # Factor por el que crece el sueldo cada trimestre
+        set_derived(self, "quarterly_salary_factor", 1 + ((1 + self.salary_growth_rate) ** (1/4) - 1))
+
+    @classmethod
+    def of(cls,
+           worker_rate: float,
+           annual_interest_rate: float,
+           salary_growth_rate: float,
+           equivalent_fund_rate: float,
+           inflation_rate: float,
+           pension_minima: float,
+           annuity_table: AnnuityTable = LEGACY_ANNUITY_TABLE) -> "ScenarioParams":
+        """
+        Devuelve los parámetros internados para esta combinación de supuestos.
+        """
+        key = (float(worker_rate), float(annual_interest_rate), float(salary_growth_rate),
+               float(equivalent_fund_rate), float(inflation_rate), float(pension_minima), annuity_table)
+        params = _INTERNED.get(key)
+        if params is None:
+            with _INTERNED_LOCK:
+                params = _INTERNED.setdefault(key, cls(*key))
+        return params
+
+    def replace(self, **changes) -> "ScenarioParams":
+        """
+        Devuelve los parámetros internados con algunos supuestos cambiados.
+        """
+        values = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        unknown = set(changes) - set(values)
+        if unknown:
+            raise ValueError(f"Supuestos desconocidos: {', '.join(sorted(unknown))}")
+        values.update(changes)
+        return ScenarioParams.of(**values)
+
+    def annuity_factor(self, gender: str, retirement_age: float) -> float:
+        """Meses de pensión equivalentes al jubilar a `retirement_age`, descontados al rendimiento."""
+        return self.annuity_table.factor(gender, retirement_age, self.annual_interest_rate)
+
+    def annuity_factors_for(self, is_male, retirement_age) -> np.ndarray:
+        """Versión vectorizada de annuity_factor()."""
+        return self.annuity_table.factors_for(is_male, retirement_age, self.annual_interest_rate)
+
+    @property
+    def fund_growth(self) -> float:
+        """Factor mensual de capitalización de la cuenta individual."""
+        return 1 + self.monthly_interest_rate
+
+    @property
+    def fapp_growth(self) -> float:
+        """Factor mensual de capitalización del FAPP."""
+        return 1 + self.monthly_equivalent_fund_rate
@@ -0,0 +1,195 @@
+"""
+Tabla sustituta precalculada para proyecciones aproximadas instantáneas.
+
+Las sumas del horizonte (_Accumulation) son proporcionales al sueldo y sólo dependen de los
+meses hasta la jubilación y del mes de la reforma en que se parte; el saldo actual entra en
+forma lineal. Por eso la tabla guarda las sumas por peso de sueldo en una grilla
+(meses hasta la jubilación × mes de la reforma) y cada consulta interpola bilinealmente,
+escala por el sueldo y arma el resultado con las mismas funciones del cálculo exacto
+(saldo actual, PGU, compensación, bono y factores de renta se aplican sin aproximar).
+
+La tabla se genera offline (app/scripts/generate_surrogate.py) como un .npy que se abre con
+memory-map, junto a un .json con sus ejes, supuestos y la cota de error medida contra el
+cálculo exacto.
+"""
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    _Accumulation,
+    _post_reform_result,
+    _pre_reform_result,
+    _prefix_accumulations,
+    calculate_pension_comparison,
+    get_months_from_reform_start,
+)
+from app.calculator.rate_schedule import RateSchedule
+from app.calculator.scenario import ScenarioParams
+
+SURROGATE_PATH = Path(__file__).parent / "data" / "pension_surrogate.npy"
+SURROGATE_MAX_MONTHS = 720            # Hasta 60 años de horizonte
+SURROGATE_MAX_REFORM_MONTH = 360      # Válida para partir hasta 30 años después de feb 2025
+SURROGATE_ERROR_MARGIN = 2.0          # Holgura sobre el máximo error observado al publicar la cota
+
+
+def _scenario_metadata(scenario: ScenarioParams) -> dict:
+    # La tabla de rentas no entra: las sumas no dependen de ella y se aplica al consultar
+    return {
+        "worker_rate": scenario.worker_rate,
+        "annual_interest_rate": scenario.annual_interest_rate,
+        "salary_growth_rate": scenario.salary_growth_rate,
+        "equivalent_fund_rate": scenario.equivalent_fund_rate,
+        "inflation_rate": scenario.inflation_rate,
+        "pension_minima": scenario.pension_minima,
+    }
+
+
+@dataclass(frozen=True, eq=False)
+class SurrogateTable:
+    """
+    Tabla sustituta abierta con memory-map. `sums` tiene forma
+    (meses de la reforma × meses hasta la jubilación × campos de _Accumulation), por peso de sueldo.
+    """
+    sums: np.ndarray = field(repr=False)
+    step_months: int
+    schedule_version: str
+    scenario: dict
+    error_bound: dict
+
+    @classmethod
+    def load(cls, path: Path = SURROGATE_PATH) -> "SurrogateTable":
+        metadata = json.loads(Path(path).with_suffix(".json").read_text(encoding="utf-8"))
+        return cls(sums=np.load(path, mmap_mode="r"),
+                   step_months=metadata["paso_meses"],
+                   schedule_version=metadata["calendario"],
+                   scenario=metadata["supuestos"],
+                   error_bound=metadata["cota_error_relativo"])
+
+    def matches(self, schedule: RateSchedule, scenario: ScenarioParams) -> bool:
+        """
+        Indica si la tabla se generó con este calendario y estos supuestos. Se ignoran los campos
+        guardados que ya no forman parte de los supuestos (p. ej. la tabla de rentas de tablas antiguas).
+        """
+        expected = _scenario_metadata(scenario)
+        return (self.schedule_version == schedule.version
+                and all(self.scenario.get(name) == value for name, value in expected.items()))
+
+    def covers(self, months_to_retirement: int, current_month_index: int) -> bool:
+        """Indica si el horizonte y el mes de la reforma caen dentro de la grilla."""
+        return (0 <= current_month_index <= (self.sums.shape[0] - 1) * self.step_months
+                and months_to_retirement <= (self.sums.shape[1] - 1) * self.step_months)
+
+    def accumulation(self, months_to_retirement: int, current_month_index: int) -> _Accumulation:
+        """
+        Sumas del horizonte por peso de sueldo, interpoladas bilinealmente en la grilla.
+        """
+        if not self.covers(months_to_retirement, current_month_index):
+            raise ValueError("El horizonte está fuera del rango de la tabla sustituta")
+        reform_position = current_month_index / self.step_months
+        months_position = max(months_to_retirement / self.step_months, 0.0)
+        i = min(int(reform_position), self.sums.shape[0] - 2)
+        j = min(int(months_position), self.sums.shape[1] - 2)
+        a = reform_position - i
+        b = months_position - j
+        corner = self.sums[i:i + 2, j:j + 2]
+        row = corner[0] + a * (corner[1] - corner[0])
+        return _Accumulation(*(row[0] + b * (row[1] - row[0])).tolist())
+
+    def pension_comparison(self,
+                           current_age: float,
+                           retirement_age: float,
+                           current_balance: float,
+                           monthly_salary: float,
+                           gender: str,
+                           scenario: ScenarioParams = DEFAULT_SCENARIO) -> tuple[tuple, tuple]:
+        """
+        Aproximación de calculate_pension_comparison con los mismos resultados (pre, post).
+        """
+        current_month_index = get_months_from_reform_start()
+        months_to_retirement = int((retirement_age - current_age) * 12)
+        unit = self.accumulation(max(months_to_retirement, 0), current_month_index)
+        accumulation = _Accumulation(*(monthly_salary * value for value in unit))
+        pre = _pre_reform_result(current_age, retirement_age, current_balance, gender, months_to_retirement,
+                                 accumulation.total_salary, accumulation.compounded_salary, scenario)
+        post = _post_reform_result(current_age, retirement_age, current_balance, gender,
+                                   months_to_retirement, current_month_index, accumulation, scenario)
+        return pre, post
+
+
+def measure_error_bound(table: SurrogateTable,
+                        samples: int = 2000,
+                        seed: int = 0,
+                        schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                        scenario: ScenarioParams = DEFAULT_SCENARIO) -> dict:
+    """
+    Compara la tabla con el cálculo exacto en perfiles aleatorios y devuelve el máximo error
+    relativo de los saldos y pensiones totales (pre y post-reforma).
+    """
+    rng = np.random.default_rng(seed)
+    worst = {"saldo_pre_reforma": 0.0, "pension_pre_reforma": 0.0,
+             "saldo_post_reforma": 0.0, "pension_post_reforma": 0.0}
+    for _ in range(samples):
+        current_age = float(rng.uniform(20, 64))
+        retirement_age = float(rng.choice([60, 65]) + rng.integers(0, 6))
+        monthly_salary = float(rng.lognormal(math.log(900000), 0.6))
+        current_balance = float(monthly_salary * rng.uniform(0, 200))
+        gender = str(rng.choice(["M", "F"]))
+        profile = (current_age, retirement_age, current_balance, monthly_salary, gender)
+
+        exact_pre, exact_post = calculate_pension_comparison(*profile, schedule=schedule, scenario=scenario)
+        approx_pre, approx_post = table.pension_comparison(*profile, scenario=scenario)
+        pairs = {
+            "saldo_pre_reforma": (exact_pre[0], approx_pre[0]),
+            "pension_pre_reforma": (exact_pre[1], approx_pre[1]),
+            "saldo_post_reforma": (exact_post[0], approx_post[0]),
+            "pension_post_reforma": (exact_post[1] + exact_post[2] + exact_post[4],
+                                     approx_post[1] + approx_post[2] + approx_post[4]),
+        }
+        for name, (exact, approx) in pairs.items():
+            if exact:
+                worst[name] = max(worst[name], abs(approx - exact) / abs(exact))
+    return worst
+
+
+def generate_surrogate_table(path: Path = SURROGATE_PATH,
+                             step_months: int = 1,
+                             max_months: int = SURROGATE_MAX_MONTHS,
+                             max_reform_month: int = SURROGATE_MAX_REFORM_MONTH,
+                             samples: int = 2000,
+                             schedule: RateSchedule = REFORM_RATE_SCHEDULE,
+                             scenario: ScenarioParams = DEFAULT_SCENARIO) -> SurrogateTable:
+    """
+    Genera la tabla: una pasada de sumas acumuladas por mes de la reforma entrega las sumas de
+    todos los horizontes a la vez. Escribe el .npy (directo al archivo vía memory-map) y el .json.
+    La cota guardada es el máximo error de la muestra por SURROGATE_ERROR_MARGIN, para que cubra
+    también perfiles fuera de la muestra.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    reform_months = range(0, max_reform_month + 1, step_months)
+    horizons = np.arange(0, max_months + 1, step_months)
+    sums = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64,
+                                     shape=(len(reform_months), horizons.size, len(_Accumulation._fields)))
+    for row, reform_month in enumerate(reform_months):
+        sums[row] = _prefix_accumulations(reform_month, max_months, 1.0, schedule, scenario)[horizons]
+    sums.flush()
+    del sums
+
+    metadata = {
+        "paso_meses": step_months,
+        "calendario": schedule.version,
+        "supuestos": _scenario_metadata(scenario),
+        "cota_error_relativo": {},
+    }
+    path.with_suffix(".json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    table = SurrogateTable.load(path)
+    worst = measure_error_bound(table, samples, schedule=schedule, scenario=scenario)
+    metadata["cota_error_relativo"] = {name: SURROGATE_ERROR_MARGIN * error for name, error in worst.items()}
+    path.with_suffix(".json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return SurrogateTable.load(path)
@@ -1,28 +1,60 @@
+import json
+import math
 import os
+import zlib
 from fastapi import FastAPI, HTTPException, Depends, Path, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from typing import Optional, Dict, Any, List
 from app.calculator.pension_core import (
-    calculate_pension_pre_reform, 
-    calculate_pension_post_reform,
+    pension_comparison_cache_key,
+    calculate_pension_batch,
+    PENSION_RESULT_CACHE,
     calculate_future_value,
+    simulate_pension_post_reform,
+    sweep_pension_assumptions,
+    solve_pension_gap,
+    iter_post_reform_trajectory,
+    pension_curve_by_retirement_age,
+    MAX_SOLVER_RETIREMENT_AGE,
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    get_months_from_reform_start,
     WORKER_RATE,
     ANNUAL_INTEREST_RATE,
     SALARY_GROWTH_RATE,
     EQUIVALENT_FUND_RATE,
     INFLATION_RATE
 )
+from app.calculator.surrogate import SurrogateTable
+from app.calculator.funds import (
+    cached_fund_comparison,
+    compare_funds_and_systems,
+    fund_comparison_cache_key,
+    FUND_OPTIONS
+)
+from app.calculator.results import PensionResult
+from app.calculator.mortality import get_annuity_table
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime, timedelta
 from uuid import UUID
 from config import settings
-from app.utils.pdf_generator import PensionPDFGenerator
+from app.utils.pdf_generator import render_pdf_bytes
+from app.utils.pension_advisor import PensionAdvisor
+from app.utils.executors import start_executors, shutdown_executors, run_in_thread, run_in_process
+from app.utils.write_behind import WriteBehindBuffer, WriteBehindFull
+from app.utils.session_cache import SessionResponseCache, serialize_response
+from app.utils.json_response import FastJSONResponse, dumps_json
 from app.utils.email_template import get_email_template
 from app.utils.email_sender import EmailSender
 import jwt
 import logging
 
+# Supuestos de los cálculos de la API (la tabla de rentas vitalicias se elige con ANNUITY_TABLE)
+SCENARIO = DEFAULT_SCENARIO.replace(annuity_table=get_annuity_table(settings.ANNUITY_TABLE))
+
 # Crear la instancia de FastAPI con el prefijo /api
 app = FastAPI(
     title="Pension Calculator API",
@@ -47,16 +79,80 @@ mongodb_client: Optional[AsyncIOMotorClient] = None
 async def startup_db_client():
     global mongodb_client
     mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    # Pools para llamadas bloqueantes y cálculos pesados fuera del event loop
+    start_executors(settings.EXECUTOR_THREAD_WORKERS, settings.EXECUTOR_PROCESS_WORKERS)
+    await ensure_indexes()
+    await calculation_writer.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Guardar los resultados pendientes antes de cerrar la conexión
+    await calculation_writer.stop()
     if mongodb_client:
         mongodb_client.close()
+    shutdown_executors()
 
 async def get_collection():
     db = mongodb_client[settings.MONGODB_DB_NAME]
     return db[settings.MONGODB_COLLECTION]
 
+# Índices de cada colección, creados al iniciar (create_indexes no hace nada si ya existen)
+COLLECTION_INDEXES = {
+    settings.MONGODB_COLLECTION: [
+        IndexModel([("sessionId", ASCENDING)], name="sessionId"),
+    ],
+    "newsletter": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+async def ensure_indexes():
+    db = mongodb_client[settings.MONGODB_DB_NAME]
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except Exception as e:
+            # Sin el índice las consultas siguen funcionando (p. ej. emails duplicados previos impiden el único)
+            logging.error(f"No se pudieron crear los índices de {collection_name}: {e}")
+
+# Campos que necesitan /api/get_session y el PDF: se omiten las constantes y la simulación
+SESSION_PROJECTION = {
+    "_id": 0,
+    "sessionId": 1,
+    "pre_reforma": 1,
+    "post_reforma": 1,
+    "pension_objetivo": 1,
+    "metadata": 1,
+    "comparacion_fondos": 1,
+}
+
+# Resultados de cálculo por guardar: se escriben en lote fuera del camino de la solicitud
+calculation_writer = WriteBehindBuffer(
+    lambda: get_collection(),
+    max_batch=settings.WRITE_BEHIND_MAX_BATCH,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_SECONDS,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING
+)
+
+# Respuestas de /api/get_session serializadas, llenadas al guardar cada cálculo
+session_responses = SessionResponseCache(
+    maxsize=settings.SESSION_CACHE_MAX_ENTRIES,
+    ttl=settings.SESSION_CACHE_TTL_SECONDS,
+    serialize=dumps_json if settings.FAST_JSON_RESPONSES else serialize_response
+)
+
+def json_response(content: dict):
+    # Con FAST_JSON_RESPONSES se serializa directo, sin pasar por jsonable_encoder
+    return FastJSONResponse(content) if settings.FAST_JSON_RESPONSES else content
+
+async def find_session(session_id: str, projection: Optional[dict] = None) -> Optional[dict]:
+    # Una sesión recién calculada puede estar aún en la cola de escritura (documento completo)
+    pending = calculation_writer.get(session_id)
+    if pending is not None:
+        return pending
+    collection = await get_collection()
+    return await collection.find_one({"sessionId": session_id}, projection)
+
 # Definir el modelo de datos para las operaciones básicas
 class OperationInput(BaseModel):
     number1: float
@@ -75,6 +171,10 @@ class PensionInput(BaseModel):
     gender: str
     ideal_pension: float = 0
     nivel_estudios: str = ""
+    # Trayectorias de rentabilidad a simular (0: sólo proyección determinística)
+    simulation_paths: int = Field(0, ge=0, le=10000)
+    # Fondo de la AFP ("A".."E" o "por_defecto" para la asignación por edad); sin fondo, rendimiento fijo
+    fondo: Optional[str] = None
 
 # Modelo para la respuesta simplificada
 class SimplifiedResponse(BaseModel):
@@ -87,37 +187,267 @@ class SimplifiedResponse(BaseModel):
 async def root():
     return {"message": "Bienvenido a la calculadora de pensiones API"}
 
-async def save_calculation_result(collection, session_id: str, calculation_result: dict):
-    document = {
-        "sessionId": session_id,
-        "timestamp": datetime.utcnow(),
-        "pre_reforma": calculation_result["pre_reforma"],
-        "post_reforma": calculation_result["post_reforma"],
-        "pension_objetivo": calculation_result["pension_objetivo"],
-        "metadata": calculation_result["metadata"],
-        "constants": {
-            "ANNUAL_INTEREST_RATE": ANNUAL_INTEREST_RATE,
-            "SALARY_GROWTH_RATE": SALARY_GROWTH_RATE,
-            "EQUIVALENT_FUND_RATE": EQUIVALENT_FUND_RATE,
-            "INFLATION_RATE": INFLATION_RATE
-        }
+# Endpoint con las estadísticas del cache de resultados
+@app.get("/api/cache_stats")
+async def cache_stats():
+    return {
+        **PENSION_RESULT_CACHE.stats(),
+        "escritura_diferida": calculation_writer.stats(),
+        "sesiones": session_responses.stats()
     }
-    await collection.insert_one(document)
+
+async def save_calculation_result(result: PensionResult):
+    try:
+        await calculation_writer.put(result.to_document())
+    except WriteBehindFull:
+        raise HTTPException(status_code=503, detail="No se pudo guardar el resultado, intenta nuevamente")
+    session_responses.put(result.session_id, result.to_session_response())
+
+def cache_session_responses(results: list):
+    for result in results:
+        session_responses.put(result.session_id, result.to_session_response())
+
+def validate_pension_input(input_data: PensionInput):
+    if input_data.gender.upper() not in ['M', 'F']:
+        raise HTTPException(status_code=400, detail="Género debe ser 'M' o 'F'")
+    if input_data.fondo is not None and input_data.fondo not in FUND_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Fondo debe ser uno de: {', '.join(FUND_OPTIONS)}")
+
+def build_pension_result(input_data: PensionInput,
+                         current_age: float,
+                         pre_result: tuple,
+                         post_result: tuple,
+                         fund_results: Optional[dict] = None,
+                         simulation: Optional[dict] = None) -> PensionResult:
+    """Resultado tipado de un cálculo; de él salen el documento de MongoDB y la respuesta."""
+    return PensionResult.from_calculation(
+        input_data.sessionId,
+        input_data.name,
+        current_age,
+        input_data.gender,
+        input_data.retirement_age,
+        input_data.current_balance,
+        input_data.monthly_salary,
+        input_data.ideal_pension,
+        pre_result,
+        post_result,
+        studies=input_data.nivel_estudios,
+        fund=input_data.fondo,
+        fund_results=fund_results,
+        simulation=simulation,
+        scenario=SCENARIO
+    )
+
+async def project_pension_comparisons(current_age: float, input_data: PensionInput) -> tuple:
+    """
+    Devuelve (comparación de fondos, comparación de sistemas o None si se eligió fondo). Lo que no
+    esté en PENSION_RESULT_CACHE se proyecta en una sola tarea del pool de procesos y se guarda.
+    """
+    profile = (
+        current_age,
+        input_data.retirement_age,
+        input_data.current_balance,
+        input_data.monthly_salary,
+        input_data.gender
+    )
+    include_systems = input_data.fondo is None
+    fund_key = fund_comparison_cache_key(*profile, scenario=SCENARIO)
+    systems_key = pension_comparison_cache_key(*profile, scenario=SCENARIO)
+
+    fund_results = PENSION_RESULT_CACHE.get(fund_key)
+    comparison = PENSION_RESULT_CACHE.get(systems_key) if include_systems else None
+    if fund_results is None or (include_systems and comparison is None):
+        fund_results, comparison = await run_in_process(
+            compare_funds_and_systems, *profile, include_systems=include_systems, scenario=SCENARIO)
+        PENSION_RESULT_CACHE.put(fund_key, fund_results)
+        if include_systems:
+            PENSION_RESULT_CACHE.put(systems_key, comparison)
+    return fund_results, comparison
 
 # Endpoint para calcular pensiones
 @app.post("/api/calculate_pension")
 async def calculate_pension(input_data: PensionInput):
+    try:
+        validate_pension_input(input_data)
+
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+
+        # Comparación de fondos y de ambos sistemas (del cache, o en el pool de procesos)
+        fund_results, comparison = await project_pension_comparisons(current_age, input_data)
+        if input_data.fondo is not None:
+            pre_result, post_result = fund_results[input_data.fondo]
+        else:
+            pre_result, post_result = comparison
+
+        # Simulación estocástica opcional de la rentabilidad (en el pool de procesos)
+        simulation = None
+        if input_data.simulation_paths:
+            simulation = await run_in_process(
+                simulate_pension_post_reform,
+                current_age,
+                input_data.retirement_age,
+                input_data.current_balance,
+                input_data.monthly_salary,
+                input_data.gender,
+                n_paths=input_data.simulation_paths,
+                # Semilla derivada de la sesión para que la simulación sea reproducible
+                seed=zlib.crc32(input_data.sessionId.encode()),
+                scenario=SCENARIO
+            )
+
+        result = build_pension_result(
+            input_data, current_age, pre_result, post_result, fund_results, simulation)
+
+        # Encolar el resultado completo para guardarlo en MongoDB
+        await save_calculation_result(result)
+
+        return json_response(result.to_response())
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Máximo de registros por solicitud en lote
+MAX_BATCH_SIZE = 5000
+
+class PensionBatchInput(BaseModel):
+    # Cada registro se valida por separado como PensionInput, para informar errores por registro
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    # Agregar la comparación de fondos a cada resultado (una proyección más por registro)
+    incluir_comparacion_fondos: bool = False
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+                     for item in error.errors())
+
+def build_batch_results(valid: list, batch_rows: list, include_fund_comparison: bool, results: list) -> list:
+    """
+    Completa `results` (en el orden de entrada) con el resultado o el error de cada registro
+    válido y devuelve (índice, resultado, documento) de los que hay que guardar. `batch_rows`
+    son las filas (pre, post) de la proyección vectorizada, en el orden de los registros sin fondo.
+    """
+    pension_results = []
+    batch_rows = iter(batch_rows)
+    for index, pension_input in valid:
+        if pension_input.fondo is None:
+            pre_result, post_result = next(batch_rows)
+        try:
+            current_age = pension_input.current_age_years + (pension_input.current_age_months/12)
+            profile = (current_age, pension_input.retirement_age, pension_input.current_balance,
+                       pension_input.monthly_salary, pension_input.gender)
+
+            fund_results = None
+            if include_fund_comparison:
+                fund_results = cached_fund_comparison(*profile, scenario=SCENARIO)
+            if pension_input.fondo is not None:
+                selected = fund_results or cached_fund_comparison(*profile, options=(pension_input.fondo,), scenario=SCENARIO)
+                pre_result, post_result = selected[pension_input.fondo]
+
+            simulation = None
+            if pension_input.simulation_paths:
+                simulation = simulate_pension_post_reform(
+                    *profile,
+                    n_paths=pension_input.simulation_paths,
+                    seed=zlib.crc32(pension_input.sessionId.encode()),
+                    scenario=SCENARIO
+                )
+
+            result = build_pension_result(
+                pension_input, current_age, pre_result, post_result, fund_results, simulation)
+            pension_results.append((index, result, result.to_document()))
+            results[index] = {"indice": index, "resultado": result.to_response()}
+        except Exception as e:
+            results[index] = {"indice": index, "error": str(e)}
+    return pension_results
+
+# Endpoint para calcular pensiones de muchos afiliados en una sola solicitud
+@app.post("/api/calculate_pension/batch")
+async def calculate_pension_batch_endpoint(input_data: PensionBatchInput):
+    try:
+        results: List[Optional[dict]] = [None] * len(input_data.items)
+
+        # 1. Validar cada registro; los inválidos quedan con su error
+        valid = []
+        for index, item in enumerate(input_data.items):
+            try:
+                pension_input = PensionInput.model_validate(item)
+                validate_pension_input(pension_input)
+            except ValidationError as e:
+                results[index] = {"indice": index, "error": format_validation_error(e)}
+            except HTTPException as e:
+                results[index] = {"indice": index, "error": e.detail}
+            else:
+                valid.append((index, pension_input))
+
+        # 2. Proyectar juntos (vectorizado, en el pool de procesos) los registros con rendimiento fijo
+        fixed = [pension_input for _, pension_input in valid if pension_input.fondo is None]
+        batch_rows = []
+        if fixed:
+            pre_batch, post_batch = await run_in_process(calculate_pension_batch, {
+                "current_age": [p.current_age_years + p.current_age_months/12 for p in fixed],
+                "retirement_age": [p.retirement_age for p in fixed],
+                "current_balance": [p.current_balance for p in fixed],
+                "monthly_salary": [p.monthly_salary for p in fixed],
+                "gender": [p.gender for p in fixed],
+            }, scenario=SCENARIO)
+            batch_rows = list(zip(pre_batch.tolist(), post_batch.tolist()))
+
+        # 3. Armar cada resultado en el orden de entrada (fuera del event loop)
+        pension_results = await run_in_thread(
+            build_batch_results, valid, batch_rows, input_data.incluir_comparacion_fondos, results)
+
+        # 4. Encolar los documentos en la escritura diferida (mismos reintentos que el cálculo individual)
+        saved = []
+        for index, result, document in pension_results:
+            try:
+                await calculation_writer.put(document)
+            except WriteBehindFull:
+                results[index] = {"indice": index, "error": "No se pudo guardar el resultado, intenta nuevamente"}
+            else:
+                saved.append(result)
+        if saved:
+            await run_in_thread(cache_session_responses, saved)
+
+        return json_response({
+            "resultados": results,
+            "procesados": len(saved),
+            "errores": len(results) - len(saved)
+        })
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class GapInput(BaseModel):
+    current_age_years: int
+    current_age_months: int
+    retirement_age: float
+    current_balance: float
+    monthly_salary: float
+    gender: str
+    ideal_pension: float
+    max_retirement_age: float = MAX_SOLVER_RETIREMENT_AGE
+
+# Endpoint para calcular cómo cerrar la brecha con la pensión objetivo
+@app.post("/api/calculate_pension/gap")
+async def close_pension_gap(input_data: GapInput):
     try:
         if input_data.gender.upper() not in ['M', 'F']:
             raise HTTPException(status_code=400, detail="Género debe ser 'M' o 'F'")
-            
-        current_age = input_data.current_age_years + (input_data.current_age_months/12)
-        life_expectancy = 86.6 if input_data.gender.upper() == 'M' else 90.8
+        # Después del horizonte de la tabla de rentas no hay pensión que ajustar
+        horizon = SCENARIO.annuity_table.horizon(input_data.gender)
+        if max(input_data.retirement_age, input_data.max_retirement_age) > horizon:
+            raise HTTPException(
+                status_code=400,
+                detail=f"La edad de jubilación no puede superar los {horizon:g} años"
+            )
 
-        # Calcular sistema pre-reforma
-        (final_balance_pre, pension_pre, worker_total_pre, 
-         employer_total_pre, sis_total_pre, returns_pre,
-         pgu_applied_pre) = calculate_pension_pre_reform(
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+        profile = (
             current_age,
             input_data.retirement_age,
             input_data.current_balance,
@@ -125,144 +455,278 @@ async def calculate_pension(input_data: PensionInput):
             input_data.gender
         )
 
-        # Calcular sistema post-reforma
-        (final_balance_post, monthly_pension_post, additional_pension_post,
-         fapp_balance, monthly_bspa, sis_total_post, women_comp_total, 
-         worker_total_post, employer_total_post, returns_post,
-         pgu_applied_post) = calculate_pension_post_reform(
+        valor_futuro = calculate_future_value(
+            input_data.ideal_pension,
+            input_data.retirement_age - current_age,
+            SCENARIO.inflation_rate
+        )
+
+        # Proyección y ambos solvers en una sola tarea del pool de procesos
+        pension_total_post, extra_saving, required_age = await run_in_process(
+            solve_pension_gap,
+            *profile,
+            input_data.ideal_pension,
+            max_retirement_age=input_data.max_retirement_age,
+            scenario=SCENARIO
+        )
+
+        return {
+            "pension_objetivo": {
+                "valor_presente": round(input_data.ideal_pension, 2),
+                "valor_futuro": round(valor_futuro, 2)
+            },
+            "pension_total_post_reforma": round(pension_total_post, 2),
+            "brecha_mensual_post_reforma": round(max(0, valor_futuro - pension_total_post), 2),
+            "ahorro_mensual_adicional": None if extra_saving is None else round(extra_saving, 2),
+            "edad_jubilacion_necesaria": None if required_age is None else round(required_age, 2)
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class TrajectoryInput(BaseModel):
+    current_age_years: int
+    current_age_months: int
+    retirement_age: float
+    current_balance: float
+    monthly_salary: float
+    step_months: int = Field(1, ge=1, le=12)
+    max_points: Optional[int] = Field(None, ge=1, le=1200)
+
+# Endpoint para obtener la trayectoria post-reforma como NDJSON (un punto por línea)
+@app.post("/api/calculate_pension/trajectory")
+async def pension_trajectory(input_data: TrajectoryInput):
+    try:
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+        if input_data.retirement_age < current_age:
+            raise HTTPException(status_code=400, detail="La edad de jubilación debe ser mayor a la edad actual")
+
+        trajectory = iter_post_reform_trajectory(
             current_age,
             input_data.retirement_age,
             input_data.current_balance,
             input_data.monthly_salary,
-            input_data.gender
+            step_months=input_data.step_months,
+            max_points=input_data.max_points,
+            scenario=SCENARIO
         )
 
-        # Calcular años y meses de pensión
-        total_pension_years = life_expectancy - input_data.retirement_age
-        pension_years = int(total_pension_years)
-        pension_months = int((total_pension_years - pension_years) * 12)
+        def ndjson_lines():
+            for point in trajectory:
+                row = {
+                    "mes": point.mes,
+                    "edad": round(point.edad, 2),
+                    "sueldo": round(point.sueldo, 2),
+                    "saldo_cuenta_individual": round(point.saldo_cuenta_individual, 2),
+                    "saldo_FAPP": round(point.saldo_FAPP, 2),
+                    "aportes_acumulados": round(point.aportes_acumulados, 2),
+                    "rentabilidad_acumulada": round(point.rentabilidad_acumulada, 2)
+                }
+                yield dumps_json(row) + b"\n" if settings.FAST_JSON_RESPONSES else json.dumps(row) + "\n"
 
-        # Calcular años hasta jubilación
-        years_to_retirement = input_data.retirement_age - (input_data.current_age_years + input_data.current_age_months/12)
-        
-        # Resultado completo para MongoDB
-        full_result = {
-            "pre_reforma": {
-                "saldo_acumulado": {
-                    "saldo_cuenta_individual": final_balance_pre,
-                    "aporte_trabajador": worker_total_pre,
-                    "aporte_empleador": 0,
-                    "rentabilidad_acumulada": returns_pre
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class RetirementCurveInput(BaseModel):
+    current_age_years: int
+    current_age_months: int
+    current_balance: float
+    monthly_salary: float
+    gender: str
+    min_retirement_age: int = Field(60, ge=50, le=80)
+    max_retirement_age: int = Field(70, ge=50, le=80)
+    ideal_pension: float = 0
+
+# Endpoint para obtener la pensión según la edad de jubilación (una sola proyección)
+@app.post("/api/calculate_pension/retirement_curve")
+async def retirement_curve(input_data: RetirementCurveInput):
+    try:
+        if input_data.gender.upper() not in ['M', 'F']:
+            raise HTTPException(status_code=400, detail="Género debe ser 'M' o 'F'")
+        if input_data.min_retirement_age > input_data.max_retirement_age:
+            raise HTTPException(status_code=400, detail="La edad mínima de jubilación no puede superar a la máxima")
+
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+        retirement_ages = [age for age in range(input_data.min_retirement_age, input_data.max_retirement_age + 1)
+                           if age > current_age]
+
+        curve = pension_curve_by_retirement_age(
+            current_age,
+            input_data.current_balance,
+            input_data.monthly_salary,
+            input_data.gender,
+            retirement_ages=retirement_ages,
+            scenario=SCENARIO
+        )
+
+        response = []
+        for point in curve:
+            valor_futuro = calculate_future_value(input_data.ideal_pension, point["edad_jubilacion"] - current_age,
+                                                  SCENARIO.inflation_rate)
+            pension_total_post = point["post_reforma"]["pension_total"]
+            response.append({
+                "edad_jubilacion": point["edad_jubilacion"],
+                "pre_reforma": {
+                    "pension_total": round(point["pre_reforma"]["pension_total"], 2),
+                    "pgu_aplicada": point["pre_reforma"]["pgu_aplicada"]
                 },
-                "aporte_sis": sis_total_pre,
-                "pension_mensual_base": pension_pre,
-                "pension_total": pension_pre,
-                "pgu_aplicada": pgu_applied_pre
-            },
-            "post_reforma": {
-                "saldo_acumulado": {
-                    "saldo_cuenta_individual": final_balance_post,
-                    "aporte_trabajador": worker_total_post,
-                    "aporte_empleador": employer_total_post,
-                    "rentabilidad_acumulada": returns_post
+                "post_reforma": {
+                    "pension_total": round(pension_total_post, 2),
+                    "pension_mensual_base": round(point["post_reforma"]["pension_mensual_base"], 2),
+                    "pension_adicional_compensacion": round(point["post_reforma"]["pension_adicional_compensacion"], 2),
+                    "bono_seguridad_previsional": round(point["post_reforma"]["bono_seguridad_previsional"], 2),
+                    "pgu_aplicada": point["post_reforma"]["pgu_aplicada"]
                 },
-                "aporte_sis": sis_total_post,
-                "aporte_compensacion_expectativa_vida": women_comp_total,
-                "balance_fapp": fapp_balance,
-                "bono_seguridad_previsional": monthly_bspa,
-                "pension_mensual_base": monthly_pension_post,
-                "pension_adicional_compensacion": additional_pension_post,
-                "pension_total": monthly_pension_post + additional_pension_post + monthly_bspa,
-                "pgu_aplicada": pgu_applied_post
-            },
-            "pension_objetivo": {
-                "valor_presente": input_data.ideal_pension,
-                "valor_futuro": calculate_future_value(
-                    input_data.ideal_pension,
-                    input_data.retirement_age - current_age
-                ),
-                "tasa_inflacion_anual": INFLATION_RATE,
-                "brecha_mensual_post_reforma": max(0, calculate_future_value(
-                    input_data.ideal_pension,
-                    input_data.retirement_age - current_age
-                ) - (monthly_pension_post + additional_pension_post + monthly_bspa))
-            },
-            "metadata": {
-                "nombre": input_data.name,
-                "edad": current_age,
-                "genero": input_data.gender,
-                "edad_jubilacion": input_data.retirement_age,
-                "balance_actual": input_data.current_balance,
-                "salario_mensual": input_data.monthly_salary,
-                "estudios": input_data.nivel_estudios,
-                "expectativa_vida": life_expectancy
-            }, 
-            "constants": {
-                "ANNUAL_INTEREST_RATE": ANNUAL_INTEREST_RATE,
-                "SALARY_GROWTH_RATE": SALARY_GROWTH_RATE,
-                "EQUIVALENT_FUND_RATE": EQUIVALENT_FUND_RATE,
-                "INFLATION_RATE": INFLATION_RATE
-            }
-        }
+                "pension_objetivo": {
+                    "valor_futuro": round(valor_futuro, 2),
+                    "brecha_mensual_post_reforma": round(max(0, valor_futuro - pension_total_post), 2)
+                }
+            })
+        return json_response({"curva": response})
 
-        # Calcular valores para pension_objetivo
-        valor_futuro = calculate_future_value(
-            input_data.ideal_pension,
-            input_data.retirement_age - current_age
-        )
-        
-        pension_total_post = monthly_pension_post + additional_pension_post + monthly_bspa
-        brecha_mensual = max(0, valor_futuro - pension_total_post)
-
-        # Guardar resultado completo en MongoDB
-        collection = await get_collection()
-        await save_calculation_result(
-            collection,
-            input_data.sessionId,
-            full_result
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Tabla sustituta (se abre con memory-map la primera vez que se usa)
+surrogate_table: Optional[SurrogateTable] = None
+
+def get_surrogate_table() -> Optional[SurrogateTable]:
+    global surrogate_table
+    if surrogate_table is None:
+        try:
+            surrogate_table = SurrogateTable.load()
+        except FileNotFoundError:
+            return None
+    return surrogate_table
+
+class ApproxPensionInput(BaseModel):
+    current_age_years: int
+    current_age_months: int
+    retirement_age: float
+    current_balance: float
+    monthly_salary: float
+    gender: str
+
+# Endpoint para una proyección aproximada instantánea desde la tabla sustituta
+@app.post("/api/calculate_pension/approx")
+async def calculate_pension_approx(input_data: ApproxPensionInput):
+    try:
+        if input_data.gender.upper() not in ['M', 'F']:
+            raise HTTPException(status_code=400, detail="Género debe ser 'M' o 'F'")
+
+        table = get_surrogate_table()
+        if table is None or not table.matches(REFORM_RATE_SCHEDULE, SCENARIO):
+            raise HTTPException(status_code=503, detail="La tabla sustituta no está generada para los supuestos actuales")
+
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+        months_to_retirement = int((input_data.retirement_age - current_age) * 12)
+        if not table.covers(months_to_retirement, get_months_from_reform_start()):
+            raise HTTPException(status_code=400, detail="El horizonte está fuera del rango de la tabla sustituta")
+
+        pre_result, post_result = table.pension_comparison(
+            current_age,
+            input_data.retirement_age,
+            input_data.current_balance,
+            input_data.monthly_salary,
+            input_data.gender,
+            SCENARIO
         )
+        monthly_pension_post, additional_pension_post, monthly_bspa = post_result[1], post_result[2], post_result[4]
 
-        # Preparar respuesta simplificada para el frontend
-        simplified_response = {
-            "sessionId": input_data.sessionId,
+        return {
             "pre_reforma": {
-                "pension_total": round(pension_pre, 2),
-                "saldo_acumulado": {
-                    "aporte_trabajador": round(worker_total_pre, 2),
-                    "aporte_empleador": 0,
-                    "rentabilidad_acumulada": round(returns_pre, 2)
-                }
+                "saldo_cuenta_individual": round(pre_result[0], 2),
+                "pension_total": round(pre_result[1], 2),
+                "pgu_aplicada": pre_result[6]
             },
             "post_reforma": {
+                "saldo_cuenta_individual": round(post_result[0], 2),
                 "pension_total": round(monthly_pension_post + additional_pension_post + monthly_bspa, 2),
                 "pension_mensual_base": round(monthly_pension_post, 2),
                 "pension_adicional_compensacion": round(additional_pension_post, 2),
                 "bono_seguridad_previsional": round(monthly_bspa, 2),
-                "saldo_acumulado": {
-                    "aporte_trabajador": round(worker_total_post, 2),
-                    "aporte_empleador": round(employer_total_post, 2),
-                    "rentabilidad_acumulada": round(returns_post, 2)
-                }
+                "pgu_aplicada": post_result[10]
             },
-            "pension_objetivo": {
-                "valor_presente": round(input_data.ideal_pension, 2),
-                "valor_futuro": round(calculate_future_value(
-                    input_data.ideal_pension,
-                    input_data.retirement_age - current_age
-                ), 2),
-                "brecha_mensual_post_reforma": round(max(0, calculate_future_value(
-                    input_data.ideal_pension,
-                    input_data.retirement_age - current_age
-                ) - (monthly_pension_post + additional_pension_post + monthly_bspa)), 2)
-            },
-            "metadata": {
-                "expectativa_vida": round(life_expectancy, 2),
-                "genero": input_data.gender.upper()
-            }
+            "cota_error_relativo": table.error_bound
         }
 
-        return simplified_response
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Máximo de puntos por grilla de sensibilidad
+MAX_SENSITIVITY_POINTS = 20000
+
+class SensitivityInput(BaseModel):
+    current_age_years: int
+    current_age_months: int
+    retirement_age: float
+    current_balance: float
+    monthly_salary: float
+    gender: str
+    ideal_pension: float = 0
+    interest_rates: List[float] = [ANNUAL_INTEREST_RATE]
+    salary_growth_rates: List[float] = [SALARY_GROWTH_RATE]
+    inflation_rates: List[float] = [INFLATION_RATE]
+    equivalent_fund_rates: List[float] = [EQUIVALENT_FUND_RATE]
+
+# Endpoint para evaluar un perfil sobre una grilla de supuestos
+@app.post("/api/sensitivity")
+async def sensitivity_grid(input_data: SensitivityInput):
+    try:
+        if input_data.gender.upper() not in ['M', 'F']:
+            raise HTTPException(status_code=400, detail="Género debe ser 'M' o 'F'")
+
+        axes = {
+            "ANNUAL_INTEREST_RATE": input_data.interest_rates,
+            "SALARY_GROWTH_RATE": input_data.salary_growth_rates,
+            "INFLATION_RATE": input_data.inflation_rates,
+            "EQUIVALENT_FUND_RATE": input_data.equivalent_fund_rates
+        }
+        shape = [len(values) for values in axes.values()]
+        if min(shape) == 0 or math.prod(shape) > MAX_SENSITIVITY_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"La grilla debe tener entre 1 y {MAX_SENSITIVITY_POINTS} puntos"
+            )
+
+        current_age = input_data.current_age_years + (input_data.current_age_months/12)
+        results = await run_in_process(
+            sweep_pension_assumptions,
+            current_age,
+            input_data.retirement_age,
+            input_data.current_balance,
+            input_data.monthly_salary,
+            input_data.gender,
+            ideal_pension=input_data.ideal_pension,
+            interest_rates=input_data.interest_rates,
+            salary_growth_rates=input_data.salary_growth_rates,
+            inflation_rates=input_data.inflation_rates,
+            equivalent_fund_rates=input_data.equivalent_fund_rates,
+            scenario=SCENARIO
+        )
 
+        return json_response({
+            "ejes": axes,
+            "forma": shape,
+            "resultados": {name: values.round(2).tolist() for name, values in results.items()}
+        })
+
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -270,52 +734,20 @@ async def calculate_pension(input_data: PensionInput):
 @app.get("/api/get_session/{session_id}")
 async def get_session(session_id: str = Path(..., title="Session ID")):
     try:
-        collection = await get_collection()
-        result = await collection.find_one({"sessionId": session_id})
-        
-        if result is None:
+        async def load_session_response():
+            document = await find_session(session_id, SESSION_PROJECTION)
+            return None if document is None else PensionResult.from_document(document).to_session_response()
+
+        # Respuesta ya serializada desde el cache (una sola consulta por sesión ante fallos simultáneos)
+        body = await session_responses.get_or_load(session_id, load_session_response)
+
+        if body is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Session with ID {session_id} not found"
             )
 
-        # Convertir ObjectId a str para serialización JSON
-        result["_id"] = str(result["_id"])
-        
-        # Preparar respuesta en el formato solicitado
-        simplified_response = {
-            "sessionId": session_id,
-            "pre_reforma": {
-                "pension_total": round(result["pre_reforma"]["pension_total"], 2),
-                "saldo_acumulado": {
-                    "aporte_trabajador": round(result["pre_reforma"]["saldo_acumulado"]["aporte_trabajador"], 2),
-                    "aporte_empleador": round(result["pre_reforma"]["saldo_acumulado"]["aporte_empleador"], 2),
-                    "rentabilidad_acumulada": round(result["pre_reforma"]["saldo_acumulado"]["rentabilidad_acumulada"], 2)
-                }
-            },
-            "post_reforma": {
-                "pension_total": round(result["post_reforma"]["pension_total"], 2),
-                "pension_mensual_base": round(result["post_reforma"]["pension_mensual_base"], 2),
-                "pension_adicional_compensacion": round(result["post_reforma"]["pension_adicional_compensacion"], 2),
-                "bono_seguridad_previsional": round(result["post_reforma"]["bono_seguridad_previsional"], 2),
-                "saldo_acumulado": {
-                    "aporte_trabajador": round(result["post_reforma"]["saldo_acumulado"]["aporte_trabajador"], 2),
-                    "aporte_empleador": round(result["post_reforma"]["saldo_acumulado"]["aporte_empleador"], 2),
-                    "rentabilidad_acumulada": round(result["post_reforma"]["saldo_acumulado"]["rentabilidad_acumulada"], 2)
-                }
-            },
-            "pension_objetivo": {
-                "valor_presente": round(result["pension_objetivo"]["valor_presente"], 2),
-                "valor_futuro": round(result["pension_objetivo"]["valor_futuro"], 2),
-                "brecha_mensual_post_reforma": round(result["pension_objetivo"]["brecha_mensual_post_reforma"], 2)
-            },
-            "metadata": {
-                "expectativa_vida": round(result["metadata"]["expectativa_vida"], 2),
-                "genero": result["metadata"]["genero"]
-            }
-        }
-
-        return simplified_response
+        return Response(content=body, media_type="application/json")
 
     except HTTPException as e:
         raise e
@@ -334,18 +766,19 @@ class EmailRequest(BaseModel):
 async def send_pdf(request: EmailRequest):
     try:
         # Obtener datos de la sesión
-        collection = await get_collection()
-        session_data = await collection.find_one({"sessionId": request.session_id})
+        document = await find_session(request.session_id, SESSION_PROJECTION)
         
-        if not session_data:
+        if not document:
             raise HTTPException(status_code=404, detail="Session not found")
+        result = PensionResult.from_document(document)
+        session_data = result.to_pdf_context()
 
-        # Generar PDF en memoria
-        pdf_generator = PensionPDFGenerator()
-        pdf_content = pdf_generator.generate_pdf_bytes(session_data)
+        # Consejos del asesor (llamada bloqueante al LLM) y PDF en memoria, fuera del event loop
+        consejos = await run_in_thread(lambda: PensionAdvisor().get_personalized_advice(session_data))
+        pdf_content = await run_in_process(render_pdf_bytes, session_data, consejos)
 
         # Obtener el nombre desde los datos de la sesión
-        nombre = session_data["metadata"]["nombre"]
+        nombre = result.name
         if not nombre:
             nombre = "Usuario"
 
@@ -374,29 +807,22 @@ async def send_pdf(request: EmailRequest):
         db = mongodb_client[settings.MONGODB_DB_NAME]
         newsletter_collection = db['newsletter']
 
-        # Buscar si el email ya existe
-        existing_subscriber = await newsletter_collection.find_one({"email": request.email})
-
-        if existing_subscriber:
-            # Actualizar el sessionId si el email ya existe
-            await newsletter_collection.update_one(
-                {"email": request.email},
-                {
-                    "$set": {
-                        "sessionId": request.session_id,
-                        "updated_at": datetime.utcnow()
-                    }
+        # Alta o actualización en una sola operación (el índice único evita duplicados)
+        now = datetime.utcnow()
+        await newsletter_collection.update_one(
+            {"email": request.email},
+            {
+                "$set": {
+                    "sessionId": request.session_id,
+                    "updated_at": now
+                },
+                "$setOnInsert": {
+                    "optin_comercial": request.optin_comercial,
+                    "created_at": now
                 }
-            )
-        else:
-            # Crear nuevo registro si el email no existe
-            await newsletter_collection.insert_one({
-                "email": request.email,
-                "sessionId": request.session_id,
-                "optin_comercial": request.optin_comercial,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            })
+            },
+            upsert=True
+        )
 
         return {
             "message": "Email sent successfully",
@@ -0,0 +1,350 @@
+"""
+Recalcula pensiones en lote desde un archivo de perfiles (CSV o Parquet).
+
+El archivo se lee por bloques; los datos numéricos de cada bloque se copian a memoria compartida
+y un pool de procesos proyecta porciones del bloque con calculate_pension_batch, escribiendo los
+resultados en otra zona compartida (sin serializar arrays entre procesos). Mientras el pool
+calcula un bloque se escribe el anterior y se lee el siguiente.
+
+Columnas de entrada (como PensionInput): current_age_years, current_age_months, retirement_age,
+current_balance, monthly_salary, gender y, opcionales, sessionId, name, ideal_pension y
+nivel_estudios. La salida tiene los mismos campos que full_result en app/main.py, aplanados
+con '.' (p. ej. post_reforma.saldo_acumulado.saldo_cuenta_individual), una fila por perfil en
+el orden de entrada. Los perfiles inválidos no detienen la corrida: su fila lleva el motivo en
+la columna "error" y los resultados en NaN.
+
+    PYTHONPATH=$(pwd) python app/scripts/batch_pension.py perfiles.csv resultados.parquet
+"""
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.append(str(root_dir))
+
+from app.calculator.pension_core import (
+    ANNUAL_INTEREST_RATE,
+    DEFAULT_SCENARIO,
+    EQUIVALENT_FUND_RATE,
+    INFLATION_RATE,
+    POST_REFORM_DTYPE,
+    PRE_REFORM_DTYPE,
+    SALARY_GROWTH_RATE,
+    calculate_future_value,
+    calculate_pension_batch,
+)
+
+try:
+    # Parquet es opcional: sin pyarrow sólo se leen y escriben CSV
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+BATCH_CHUNK_SIZE = 100_000
+
+# Columnas numéricas que viajan a los procesos por memoria compartida
+INPUT_COLUMNS = ("current_age", "retirement_age", "current_balance", "monthly_salary", "is_male")
+OUTPUT_COLUMNS = (tuple(f"pre.{name}" for name in PRE_REFORM_DTYPE.names)
+                  + tuple(f"post.{name}" for name in POST_REFORM_DTYPE.names))
+
+
+class _SharedMatrix:
+    """Matriz float64 (filas × columnas) en memoria compartida, reutilizada entre bloques."""
+
+    def __init__(self, rows: int, columns: int):
+        self.shape = (rows, columns)
+        self.memory = SharedMemory(create=True, size=max(rows * columns * 8, 1))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.memory.buf)
+
+    def release(self):
+        del self.array
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _score_slice(task: tuple) -> int:
+    """
+    Proyecta las filas [start, end) de un bloque en memoria compartida (corre en el pool).
+    """
+    input_name, output_name, rows, start, end = task
+    input_memory = SharedMemory(name=input_name)
+    output_memory = SharedMemory(name=output_name)
+    try:
+        inputs = np.ndarray((rows, len(INPUT_COLUMNS)), dtype=np.float64, buffer=input_memory.buf)[start:end]
+        outputs = np.ndarray((rows, len(OUTPUT_COLUMNS)), dtype=np.float64, buffer=output_memory.buf)
+        pre, post = calculate_pension_batch({
+            "current_age": inputs[:, 0],
+            "retirement_age": inputs[:, 1],
+            "current_balance": inputs[:, 2],
+            "monthly_salary": inputs[:, 3],
+            "gender": np.where(inputs[:, 4] > 0, "M", "F"),
+        }, workers=1)
+        for column, name in enumerate(PRE_REFORM_DTYPE.names):
+            outputs[start:end, column] = pre[name]
+        offset = len(PRE_REFORM_DTYPE.names)
+        for column, name in enumerate(POST_REFORM_DTYPE.names):
+            outputs[start:end, offset + column] = post[name]
+        del inputs, outputs
+    finally:
+        input_memory.close()
+        output_memory.close()
+    return end - start
+
+
+def _read_chunks(path: Path, chunk_size: int):
+    """
+    Lee el archivo de perfiles por bloques como dict de listas por columna.
+    """
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise SystemExit("Leer Parquet requiere pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pydict()
+        return
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.DictReader(file)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield {column: [row[column] for row in rows] for column in rows[0]}
+
+
+def _parse_numbers(values, name: str, errors: list) -> np.ndarray:
+    """
+    Convierte una columna a float64. Los valores que no son números finitos quedan en 0 y dejan
+    su error en la fila, en vez de abortar el bloque.
+    """
+    try:
+        parsed = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        parsed = np.full(len(values), np.nan)
+        for row, value in enumerate(values):
+            try:
+                parsed[row] = float(value)
+            except (TypeError, ValueError):
+                pass
+    for row in np.flatnonzero(~np.isfinite(parsed)):
+        errors[row] = errors[row] or f"{name}: número inválido ({values[row]!r})"
+        parsed[row] = 0.0
+    return parsed
+
+
+def _fill_inputs(chunk: dict, inputs: np.ndarray) -> dict:
+    """
+    Copia las columnas numéricas del bloque a la matriz compartida y devuelve las columnas
+    del bloque ya normalizadas para armar la salida. Las filas inválidas llevan su mensaje en
+    la columna "error" y se proyectan con horizonte 0.
+    """
+    size = len(chunk["monthly_salary"])
+    errors = [""] * size
+    gender = np.char.upper(np.char.strip(np.asarray(chunk["gender"], dtype=str)))
+    for row in np.flatnonzero(~np.isin(gender, ("M", "F"))):
+        errors[row] = "Género debe ser 'M' o 'F'"
+    columns = {
+        "current_age": (_parse_numbers(chunk["current_age_years"], "current_age_years", errors)
+                        + _parse_numbers(chunk["current_age_months"], "current_age_months", errors) / 12),
+        "retirement_age": _parse_numbers(chunk["retirement_age"], "retirement_age", errors),
+        "current_balance": _parse_numbers(chunk["current_balance"], "current_balance", errors),
+        "monthly_salary": _parse_numbers(chunk["monthly_salary"], "monthly_salary", errors),
+        "gender": gender,
+        "ideal_pension": _parse_numbers([value or 0 for value in chunk.get("ideal_pension") or [0] * size],
+                                        "ideal_pension", errors),
+        "sessionId": list(chunk.get("sessionId") or [""] * size),
+        "name": list(chunk.get("name") or [""] * size),
+        "nivel_estudios": list(chunk.get("nivel_estudios") or [""] * size),
+        "error": np.array(errors, dtype=object),
+    }
+    for column, name in enumerate(INPUT_COLUMNS[:-1]):
+        inputs[:size, column] = columns[name]
+    inputs[:size, -1] = gender == "M"
+    retirement_column = INPUT_COLUMNS.index("retirement_age")
+    inputs[:size, retirement_column] = np.where(columns["error"] != "", columns["current_age"],
+                                                columns["retirement_age"])
+    return columns
+
+
+def _full_result_columns(columns: dict, outputs: np.ndarray) -> dict:
+    """
+    Arma las columnas de salida con los campos de full_result (app/main.py); las filas con
+    error quedan con los resultados en NaN.
+    """
+    size = len(columns["sessionId"])
+    outputs[:size][columns["error"] != ""] = np.nan
+    result = {name: outputs[:size, index] for index, name in enumerate(OUTPUT_COLUMNS)}
+    is_male = columns["gender"] == "M"
+    pension_total_post = (result["post.pension_total"] + result["post.pension_adicional"]
+                          + result["post.bono_seguridad_previsional"])
+    valor_futuro = calculate_future_value(columns["ideal_pension"],
+                                          columns["retirement_age"] - columns["current_age"])
+    return {
+        "sessionId": columns["sessionId"],
+        "error": columns["error"],
+        "pre_reforma.saldo_acumulado.saldo_cuenta_individual": result["pre.saldo_acumulado"],
+        "pre_reforma.saldo_acumulado.aporte_trabajador": result["pre.aporte_trabajador"],
+        "pre_reforma.saldo_acumulado.aporte_empleador": np.zeros(size),
+        "pre_reforma.saldo_acumulado.rentabilidad_acumulada": result["pre.rentabilidad_acumulada"],
+        "pre_reforma.aporte_sis": result["pre.aporte_sis"],
+        "pre_reforma.pension_mensual_base": result["pre.pension_mensual"],
+        "pre_reforma.pension_total": result["pre.pension_mensual"],
+        "pre_reforma.pgu_aplicada": result["pre.pgu_aplicada"] > 0,
+        "post_reforma.saldo_acumulado.saldo_cuenta_individual": result["post.saldo_cuenta_individual"],
+        "post_reforma.saldo_acumulado.aporte_trabajador": result["post.aporte_trabajador"],
+        "post_reforma.saldo_acumulado.aporte_empleador": result["post.aporte_empleador"],
+        "post_reforma.saldo_acumulado.rentabilidad_acumulada": result["post.rentabilidad_acumulada"],
+        "post_reforma.aporte_sis": result["post.aporte_sis"],
+        "post_reforma.aporte_compensacion_expectativa_vida": result["post.aporte_compensacion_expectativa_vida"],
+        "post_reforma.balance_fapp": result["post.balance_fapp"],
+        "post_reforma.bono_seguridad_previsional": result["post.bono_seguridad_previsional"],
+        "post_reforma.pension_mensual_base": result["post.pension_total"],
+        "post_reforma.pension_adicional_compensacion": result["post.pension_adicional"],
+        "post_reforma.pension_total": pension_total_post,
+        "post_reforma.pgu_aplicada": result["post.pgu_aplicada"] > 0,
+        "pension_objetivo.valor_presente": columns["ideal_pension"],
+        "pension_objetivo.valor_futuro": valor_futuro,
+        "pension_objetivo.tasa_inflacion_anual": np.full(size, INFLATION_RATE),
+        "pension_objetivo.brecha_mensual_post_reforma": np.maximum(0, valor_futuro - pension_total_post),
+        "metadata.nombre": columns["name"],
+        "metadata.edad": columns["current_age"],
+        "metadata.genero": columns["gender"],
+        "metadata.edad_jubilacion": columns["retirement_age"],
+        "metadata.balance_actual": columns["current_balance"],
+        "metadata.salario_mensual": columns["monthly_salary"],
+        "metadata.estudios": columns["nivel_estudios"],
+        "metadata.expectativa_vida": DEFAULT_SCENARIO.annuity_table.life_expectancies_for(
+            is_male, columns["retirement_age"]),
+        "constants.ANNUAL_INTEREST_RATE": np.full(size, ANNUAL_INTEREST_RATE),
+        "constants.SALARY_GROWTH_RATE": np.full(size, SALARY_GROWTH_RATE),
+        "constants.EQUIVALENT_FUND_RATE": np.full(size, EQUIVALENT_FUND_RATE),
+        "constants.INFLATION_RATE": np.full(size, INFLATION_RATE),
+    }
+
+
+class _ResultWriter:
+    """Escribe los bloques de resultados en CSV o Parquet según la extensión del archivo."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix == ".parquet"
+        if self.parquet and pq is None:
+            raise SystemExit("Escribir Parquet requiere pyarrow (pip install pyarrow)")
+        self.writer = None
+        self.file = None
+
+    def write(self, columns: dict):
+        if self.parquet:
+            table = pyarrow.table({name: np.asarray(values) for name, values in columns.items()})
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+            return
+        if self.writer is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(columns)
+        values = [value.tolist() if isinstance(value, np.ndarray) else value for value in columns.values()]
+        self.writer.writerows(zip(*values))
+
+    def close(self):
+        if self.parquet and self.writer is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+
+
+def run_batch(input_path: Path,
+              output_path: Path,
+              chunk_size: int = BATCH_CHUNK_SIZE,
+              workers: int | None = None,
+              progress=sys.stderr) -> dict:
+    """
+    Recalcula todos los perfiles de `input_path` y escribe los resultados en `output_path`.
+
+    Returns:
+        dict: Estadísticas de la corrida (perfiles, perfiles con error, segundos, perfiles por segundo)
+    """
+    workers = workers or os.cpu_count() or 1
+    buffers = [(_SharedMatrix(chunk_size, len(INPUT_COLUMNS)), _SharedMatrix(chunk_size, len(OUTPUT_COLUMNS)))
+               for _ in range(2)]
+    writer = _ResultWriter(output_path)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    start = time.perf_counter()
+    processed = 0
+    errors = 0
+
+    def finish(pending) -> int:
+        (_, outputs), columns, tasks = pending
+        if executor is not None:
+            for task in tasks:
+                task.result()
+        writer.write(_full_result_columns(columns, outputs.array))
+        return len(columns["sessionId"])
+
+    try:
+        pending = None
+        for index, chunk in enumerate(_read_chunks(input_path, chunk_size)):
+            inputs, outputs = buffers[index % 2]
+            columns = _fill_inputs(chunk, inputs.array)
+            errors += int((columns["error"] != "").sum())
+            size = len(columns["sessionId"])
+            step = math.ceil(size / workers)
+            slices = [(inputs.memory.name, outputs.memory.name, chunk_size, first, min(first + step, size))
+                      for first in range(0, size, step)]
+            if executor is None:
+                tasks = [_score_slice(task) for task in slices]
+            else:
+                tasks = [executor.submit(_score_slice, task) for task in slices]
+
+            # Mientras el pool calcula este bloque, se escribe el anterior
+            if pending is not None:
+                processed += finish(pending)
+                elapsed = time.perf_counter() - start
+                print(f"{processed:,} perfiles ({processed / elapsed:,.0f} perfiles/s)", file=progress)
+            pending = ((inputs, outputs), columns, tasks)
+        if pending is not None:
+            processed += finish(pending)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        writer.close()
+        for inputs, outputs in buffers:
+            inputs.release()
+            outputs.release()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "perfiles": processed,
+        "errores": errors,
+        "segundos": round(elapsed, 3),
+        "perfiles_por_segundo": round(processed / elapsed, 1) if elapsed else 0.0,
+        "procesos": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula pensiones en lote (CSV o Parquet)")
+    parser.add_argument("input", type=Path, help="Archivo de perfiles (.csv o .parquet)")
+    parser.add_argument("output", type=Path, help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Perfiles por bloque")
+    parser.add_argument("--workers", type=int, help="Procesos (por defecto, todos los núcleos)")
+    args = parser.parse_args()
+
+    stats = run_batch(args.input, args.output, args.chunk_size, args.workers)
+    print(f"{stats['perfiles']:,} perfiles en {stats['segundos']:.2f} s "
+          f"({stats['perfiles_por_segundo']:,.0f} perfiles/s, {stats['procesos']} procesos, "
+          f"{stats['errores']:,} con error)")
+
+
+if __name__ == "__main__":
+    main()
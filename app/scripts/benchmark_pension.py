@@ -0,0 +1,275 @@
+"""
+Benchmark reproducible de la calculadora de pensiones.
+
+Genera un corpus fijo de perfiles (semilla configurable) y mide:
+  - calculate_pension_pre_reform y calculate_pension_post_reform en Python puro, con el corpus y
+    con el mismo corpus a SHORT_HORIZON_YEARS de jubilar (donde la forma cerrada no conviene)
+  - las mismas funciones en la versión compilada con Cython (si existe: make compile)
+  - POST /api/calculate_pension de punta a punta, con una colección en memoria en vez de MongoDB
+  - la serialización de las respuestas de /api/calculate_pension y /api/get_session: camino
+    estándar de FastAPI (jsonable_encoder + json) contra FastJSONResponse (orjson si está instalado)
+
+Los resultados se emiten como JSON para comparar entre versiones:
+
+    PYTHONPATH=$(pwd) python app/scripts/benchmark_pension.py --output benchmark.json
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.append(str(root_dir))
+
+PENSION_CORE_SOURCE = root_dir / "app" / "calculator" / "pension_core.py"
+DEFAULT_SEED = 20250201
+SHORT_HORIZON_YEARS = 5
+
+
+def build_corpus(size: int, seed: int = DEFAULT_SEED) -> list[dict]:
+    """
+    Genera perfiles realistas con los campos de PensionInput: edades de 22 a 59 años, sueldos
+    log-normales en torno a la mediana chilena y saldos coherentes con los años cotizados.
+    """
+    rng = np.random.default_rng(seed)
+    genders = rng.choice(["M", "F"], size=size)
+    age_years = rng.integers(22, 60, size=size)
+    age_months = rng.integers(0, 12, size=size)
+    salaries = np.clip(rng.lognormal(np.log(900000), 0.6, size=size), 460000, 8000000)
+    density = rng.uniform(0.4, 1.0, size=size)          # Fracción de meses cotizados
+    noise = rng.lognormal(0.0, 0.3, size=size)
+
+    corpus = []
+    for i in range(size):
+        gender = str(genders[i])
+        retirement_age = 65 if gender == "M" else int(rng.choice([60, 65]))
+        years_contributed = max(int(age_years[i]) - 25, 0)
+        balance = 0.10 * salaries[i] * 12 * years_contributed * density[i] * noise[i]
+        corpus.append({
+            "sessionId": f"benchmark-{seed}-{i}",
+            "name": f"Perfil {i}",
+            "current_age_years": int(age_years[i]),
+            "current_age_months": int(age_months[i]),
+            "retirement_age": retirement_age,
+            "current_balance": round(float(balance)),
+            "monthly_salary": round(float(salaries[i])),
+            "gender": gender,
+            "ideal_pension": round(float(salaries[i]) * 0.7)
+        })
+    return corpus
+
+
+def _profile_args(profile: dict) -> tuple:
+    current_age = profile["current_age_years"] + profile["current_age_months"] / 12
+    return (current_age, profile["retirement_age"], profile["current_balance"],
+            profile["monthly_salary"], profile["gender"])
+
+
+def _time_calls(call, items: list, repeat: int) -> dict:
+    """
+    Ejecuta `call` sobre todo el corpus `repeat` veces y resume el tiempo medio por llamada.
+    """
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            call(item)
+        per_call.append((time.perf_counter() - start) / len(items) * 1e6)
+    return {
+        "llamadas": len(items),
+        "repeticiones": repeat,
+        "mediana_us": round(statistics.median(per_call), 3),
+        "minimo_us": round(min(per_call), 3),
+        "maximo_us": round(max(per_call), 3)
+    }
+
+
+def _load_pure_python_core():
+    """
+    Carga pension_core desde el fuente .py aunque exista el módulo compilado, sin el kernel Cython.
+    """
+    spec = importlib.util.spec_from_file_location("pension_core_python", PENSION_CORE_SOURCE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.pension_kernels = None
+    return module
+
+
+def benchmark_kernels(corpus: list[dict], repeat: int) -> dict:
+    from app.calculator import pension_core
+
+    args = [_profile_args(profile) for profile in corpus]
+    short_args = [(retirement_age - SHORT_HORIZON_YEARS, retirement_age, *rest)
+                  for _, retirement_age, *rest in args]
+    variants = {"python": _load_pure_python_core()}
+    compiled = not pension_core.__file__.endswith(".py")
+    if compiled:
+        variants["cython"] = pension_core
+
+    results = {"cython_disponible": compiled}
+    for name, module in variants.items():
+        results[name] = {
+            "calculate_pension_pre_reform": _time_calls(
+                lambda a: module.calculate_pension_pre_reform(*a), args, repeat),
+            "calculate_pension_post_reform": _time_calls(
+                lambda a: module.calculate_pension_post_reform(*a), args, repeat),
+            "calculate_pension_post_reform_horizonte_corto": _time_calls(
+                lambda a: module.calculate_pension_post_reform(*a), short_args, repeat)
+        }
+    if compiled:
+        results["aceleracion"] = {
+            function: round(results["python"][function]["mediana_us"]
+                            / results["cython"][function]["mediana_us"], 2)
+            for function in results["python"]
+        }
+    return results
+
+
+class InMemoryCollection:
+    """
+    Reemplazo mínimo en memoria de una colección de Motor para medir la API sin MongoDB.
+    """
+
+    def __init__(self):
+        self.documents = []
+
+    async def insert_one(self, document: dict):
+        self.documents.append(dict(document))
+
+    async def insert_many(self, documents: list, ordered: bool = True):
+        self.documents.extend(dict(document) for document in documents)
+
+    async def find_one(self, query: dict, projection: dict = None):
+        for document in self.documents:
+            if all(document.get(key) == value for key, value in query.items()):
+                return dict(document)
+        return None
+
+
+def benchmark_api(corpus: list[dict], repeat: int) -> dict:
+    from fastapi.testclient import TestClient
+    import app.main as main
+
+    collection = InMemoryCollection()
+
+    async def get_collection():
+        return collection
+
+    async def ensure_indexes():
+        pass
+
+    main.get_collection = get_collection
+    main.ensure_indexes = ensure_indexes
+
+    # Como contexto para que corran startup y shutdown: la escritura diferida guarda los
+    # resultados durante la medición y se vacía al cerrar
+    with TestClient(main.app) as client:
+        def post(profile: dict):
+            response = client.post("/api/calculate_pension", json=profile)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code}: {response.text}")
+
+        # Sin cache: cada repetición parte con el cache de resultados vacío
+        cold = []
+        for _ in range(repeat):
+            main.PENSION_RESULT_CACHE.clear()
+            cold.append(_time_calls(post, corpus, 1)["mediana_us"])
+        warm = _time_calls(post, corpus, repeat)
+    return {
+        "calculate_pension": {
+            "llamadas": len(corpus),
+            "repeticiones": repeat,
+            "mediana_us": round(statistics.median(cold), 3),
+            "minimo_us": round(min(cold), 3),
+            "maximo_us": round(max(cold), 3)
+        },
+        "calculate_pension_con_cache": warm,
+        "documentos_insertados": len(collection.documents),
+        "escritura_diferida": main.calculation_writer.stats()
+    }
+
+
+def benchmark_json_encoding(corpus: list[dict], repeat: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.calculator.funds import cached_fund_comparison
+    from app.calculator.results import PensionResult
+    from app.utils import json_response
+    from app.utils.session_cache import serialize_response
+
+    # Resultados como los arma /api/calculate_pension (con la comparación de fondos)
+    pension_results = []
+    for profile in corpus:
+        args = _profile_args(profile)
+        fund_results = cached_fund_comparison(*args)
+        pre_result, post_result = fund_results["C"]
+        pension_results.append(PensionResult.from_calculation(
+            profile["sessionId"], profile["name"], args[0], profile["gender"], profile["retirement_age"],
+            profile["current_balance"], profile["monthly_salary"], profile["ideal_pension"],
+            pre_result, post_result, fund_results=fund_results))
+    responses = [result.to_response() for result in pension_results]
+    session_responses = [result.to_session_response() for result in pension_results]
+
+    payloads = {
+        # Dict devuelto por el endpoint: FastAPI aplica jsonable_encoder y luego JSONResponse
+        "calculate_pension": (responses,
+                              lambda content: JSONResponse(jsonable_encoder(content)).body,
+                              lambda content: json_response.FastJSONResponse(content).body),
+        # Respuesta cacheada de /api/get_session: se serializa una vez al guardar o cargar la sesión
+        "get_session": (session_responses, serialize_response, json_response.dumps_json),
+    }
+    results = {"orjson_disponible": json_response.orjson is not None}
+    for name, (contents, standard, fast) in payloads.items():
+        results[name] = {
+            "bytes_medio": round(statistics.mean(len(fast(content)) for content in contents)),
+            "estandar": _time_calls(standard, contents, repeat),
+            "rapido": _time_calls(fast, contents, repeat)
+        }
+        results[name]["aceleracion"] = round(results[name]["estandar"]["mediana_us"]
+                                             / results[name]["rapido"]["mediana_us"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la calculadora de pensiones")
+    parser.add_argument("--profiles", type=int, default=500, help="Cantidad de perfiles del corpus")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Semilla del corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada medición")
+    parser.add_argument("--skip-api", action="store_true", help="No medir el endpoint")
+    parser.add_argument("--output", type=Path, help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.profiles, args.seed)
+    report = {
+        "metadata": {
+            "fecha": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "perfiles": args.profiles,
+            "semilla": args.seed
+        },
+        "kernels": benchmark_kernels(corpus, args.repeat),
+        "serializacion_json": benchmark_json_encoding(corpus, args.repeat)
+    }
+    if not args.skip_api:
+        report["api"] = benchmark_api(corpus, args.repeat)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Genera offline la tabla sustituta de proyecciones aproximadas (ver app/calculator/surrogate.py).
+
+    PYTHONPATH=$(pwd) python app/scripts/generate_surrogate.py
+    PYTHONPATH=$(pwd) python app/scripts/generate_surrogate.py --step-months 3 --output /tmp/surrogate.npy
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.append(str(root_dir))
+
+from app.calculator.surrogate import (
+    SURROGATE_MAX_MONTHS,
+    SURROGATE_MAX_REFORM_MONTH,
+    SURROGATE_PATH,
+    generate_surrogate_table,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabla sustituta para proyecciones aproximadas")
+    parser.add_argument("--output", type=Path, default=SURROGATE_PATH, help="Archivo .npy de salida")
+    parser.add_argument("--step-months", type=int, default=1, help="Paso de la grilla en meses")
+    parser.add_argument("--max-months", type=int, default=SURROGATE_MAX_MONTHS,
+                        help="Máximo de meses hasta la jubilación")
+    parser.add_argument("--max-reform-month", type=int, default=SURROGATE_MAX_REFORM_MONTH,
+                        help="Último mes de la reforma cubierto")
+    parser.add_argument("--samples", type=int, default=2000, help="Perfiles para medir la cota de error")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = generate_surrogate_table(args.output, args.step_months, args.max_months,
+                                     args.max_reform_month, args.samples)
+    elapsed = time.perf_counter() - start
+
+    print(f"Tabla {table.sums.shape} ({table.sums.nbytes / 1e6:.1f} MB) generada en {elapsed:.2f} s: {args.output}")
+    print("Cota de error relativo:", json.dumps(table.error_bound, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import os
 from dotenv import load_dotenv
+from .executors import run_in_thread
 
 load_dotenv()
 
@@ -30,7 +31,10 @@ class EmailSender:
         pdf_attachment.add_header('Content-Disposition', 'attachment', filename='simulacion_pension.pdf')
         msg.attach(pdf_attachment)
 
-        # Enviar email
+        # Enviar email (smtplib es bloqueante: se ejecuta en el pool de hilos)
+        return await run_in_thread(self._deliver, msg)
+
+    def _deliver(self, msg):
         try:
             with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
                 server.starttls()
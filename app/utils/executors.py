@@ -0,0 +1,58 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+# Pools compartidos por la aplicación (se crean en el startup de FastAPI o al primer uso)
+_thread_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+
+DEFAULT_THREAD_WORKERS = 32
+
+
+def start_executors(thread_workers: int = DEFAULT_THREAD_WORKERS, process_workers: int = 0):
+    """
+    Crea los pools: hilos para clientes síncronos de I/O (SMTP, LLM) y procesos para cálculos
+    y renderizado que ocupan CPU. Con process_workers=0 el trabajo de CPU va al pool de hilos.
+    Los procesos se crean con "spawn" para no heredar los hilos del servidor.
+    """
+    global _thread_executor, _process_executor
+    shutdown_executors()
+    _thread_executor = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="io")
+    if process_workers > 0:
+        _process_executor = ProcessPoolExecutor(max_workers=process_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+
+
+def shutdown_executors():
+    global _thread_executor, _process_executor
+    if _process_executor is not None:
+        _process_executor.shutdown(wait=True, cancel_futures=True)
+        _process_executor = None
+    if _thread_executor is not None:
+        _thread_executor.shutdown(wait=True, cancel_futures=True)
+        _thread_executor = None
+
+
+def _get_thread_executor() -> Executor:
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(max_workers=DEFAULT_THREAD_WORKERS, thread_name_prefix="io")
+    return _thread_executor
+
+
+async def run_in_thread(func, /, *args, **kwargs):
+    """Ejecuta una llamada bloqueante en el pool de hilos sin detener el event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_thread_executor(), partial(func, *args, **kwargs))
+
+
+async def run_in_process(func, /, *args, **kwargs):
+    """
+    Ejecuta un cálculo de CPU en el pool de procesos. `func` y sus argumentos deben poder
+    serializarse con pickle (funciones de módulo, no lambdas).
+    """
+    loop = asyncio.get_running_loop()
+    executor = _process_executor if _process_executor is not None else _get_thread_executor()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
@@ -0,0 +1,45 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    # Codificador en Rust; sin él se usa json de la biblioteca estándar
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _encode_default(value: Any):
+    """Convierte los tipos que no son JSON nativos (numpy y fechas)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serializa a JSON compacto en UTF-8 (con orjson si está instalado), aceptando arreglos y
+    escalares de numpy y fechas sin pasarlos antes por jsonable_encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_encode_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_encode_default, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse que serializa el contenido directamente con dumps_json. Para evitar
+    jsonable_encoder el endpoint debe devolver la respuesta ya construida.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
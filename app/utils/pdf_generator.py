@@ -9,8 +9,15 @@ class PensionPDFGenerator:
         self.template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
         self.env = Environment(loader=FileSystemLoader(self.template_dir))
         self.template = self.env.get_template('plantilla.html')
-        self.advisor = PensionAdvisor()
-        
+        self._advisor = None
+
+    @property
+    def advisor(self):
+        # El asesor abre clientes externos: se crea sólo si hay que pedir consejos
+        if self._advisor is None:
+            self._advisor = PensionAdvisor()
+        return self._advisor
+
     def format_currency(self, value):
         if value is None:
             return "$0"
@@ -190,7 +197,7 @@ class PensionPDFGenerator:
         
         return formatted_advice 
 
-    def generate_pdf_bytes(self, data):
+    def generate_pdf_bytes(self, data, consejos=None):
         try:
             # Calcular años y meses para la edad actual
             edad_decimal = data['metadata']['edad']
@@ -202,8 +209,9 @@ class PensionPDFGenerator:
             expectativa_anos = int(expectativa_decimal)
             expectativa_meses = round((expectativa_decimal - expectativa_anos) * 12)
 
-            # Obtener consejos personalizados
-            consejos = self.advisor.get_personalized_advice(data)
+            # Obtener consejos personalizados (si no vienen ya calculados)
+            if consejos is None:
+                consejos = self.advisor.get_personalized_advice(data)
             
             # Preparar el contexto para la plantilla
             context = {
@@ -270,4 +278,15 @@ class PensionPDFGenerator:
 
         except Exception as e:
             print(f"Error generando PDF: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+
+# Generador reutilizado por cada proceso del pool (la plantilla se carga una vez)
+_pdf_generator = None
+
+def render_pdf_bytes(data, consejos):
+    """Genera el PDF en bytes con consejos ya calculados (apto para el pool de procesos)."""
+    global _pdf_generator
+    if _pdf_generator is None:
+        _pdf_generator = PensionPDFGenerator()
+    return _pdf_generator.generate_pdf_bytes(data, consejos)
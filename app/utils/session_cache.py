@@ -0,0 +1,79 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.calculator.result_cache import ResultCache
+
+
+def serialize_response(response: dict) -> bytes:
+    """Serializa igual que JSONResponse de FastAPI."""
+    return json.dumps(response, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class SessionResponseCache:
+    """
+    Respuestas de /api/get_session ya serializadas, acotadas por tamaño y TTL (ResultCache).
+
+    Se llena al guardar cada cálculo, así que la primera consulta de la sesión no va a MongoDB.
+    Ante fallos simultáneos para la misma sesión se hace una sola consulta: las demás
+    solicitudes esperan esa misma carga. Si mientras tanto se guarda un resultado de la sesión,
+    lo leído de MongoDB es anterior y se descarta en vez de reemplazarlo.
+    """
+
+    def __init__(self,
+                 maxsize: int = 10000,
+                 ttl: float = 600.0,
+                 serialize: Callable[[dict], bytes] = serialize_response,
+                 clock: Callable[[], float] = time.monotonic):
+        self._cache = ResultCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._serialize = serialize
+        self._loading: dict = {}          # sessionId -> tarea de carga en curso
+        self._versions: dict = {}         # sessionId -> resultados guardados durante su carga en curso
+        self._lock = threading.Lock()     # put también llega desde hilos del pool (run_in_thread)
+
+    def put(self, session_id: str, response: dict):
+        body = self._serialize(response)
+        with self._lock:
+            self._cache.put(session_id, body)
+            if session_id in self._versions:
+                self._versions[session_id] += 1
+
+    async def get_or_load(self, session_id: str, load: Callable[[], Awaitable[Optional[dict]]]) -> Optional[bytes]:
+        """
+        Respuesta serializada de la sesión; si no está, la obtiene con `load()` (None: no existe,
+        y no se cachea para que una sesión creada después se encuentre).
+        """
+        body = self._cache.get(session_id)
+        if body is not None:
+            return body
+        task = self._loading.get(session_id)
+        if task is None:
+            with self._lock:
+                self._versions[session_id] = 0
+            task = asyncio.ensure_future(self._load(session_id, load))
+            self._loading[session_id] = task
+            task.add_done_callback(lambda _: self._finish_load(session_id))
+        # shield: si una solicitud se cancela, la carga sigue para las demás
+        return await asyncio.shield(task)
+
+    async def _load(self, session_id: str, load: Callable[[], Awaitable[Optional[dict]]]) -> Optional[bytes]:
+        response = await load()
+        body = None if response is None else self._serialize(response)
+        with self._lock:
+            if self._versions.get(session_id):
+                # Se guardó un resultado durante la carga: es más nuevo que lo leído
+                return self._cache.get(session_id)
+            if body is not None:
+                self._cache.put(session_id, body)
+        return body
+
+    def _finish_load(self, session_id: str):
+        self._loading.pop(session_id, None)
+        with self._lock:
+            self._versions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "cargas_en_curso": len(self._loading)}
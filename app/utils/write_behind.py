@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBehindFull(Exception):
+    """La cola llegó a `max_pending` y no se pudo vaciar (p. ej. MongoDB no responde)."""
+
+
+class WriteBehindBuffer:
+    """
+    Escritura diferida de documentos en MongoDB.
+
+    Los documentos se encolan en memoria y una tarea de fondo los guarda con insert_many
+    cuando la cola llega a `max_batch` o cada `flush_interval` segundos; al detenerse se vacía
+    la cola. Mientras un documento está pendiente, get(session_id) lo devuelve (lectura de lo
+    recién escrito). Si la cola llega a `max_pending`, put() espera una escritura; si la cola
+    sigue llena, o la última escritura falló, rechaza el documento con WriteBehindFull en vez de
+    crecer sin límite o esperar otro intento fallido.
+    """
+
+    def __init__(self,
+                 get_collection: Callable[[], Awaitable],
+                 max_batch: int = 500,
+                 flush_interval: float = 0.5,
+                 max_pending: int = 10000):
+        self._get_collection = get_collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: list = []
+        self._pending: dict = {}          # sessionId -> último documento aún no guardado
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flushes = 0
+        self._written = 0
+        self._errors = 0
+        self._failing = False             # La última escritura dejó documentos sin guardar
+        self._rejected = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene la tarea de fondo y guarda todo lo pendiente."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._queue:
+            logging.error(f"Escritura diferida: {len(self._queue)} documentos sin guardar al detenerse")
+
+    async def put(self, document: dict):
+        """
+        Encola un documento (con _id asignado desde ya, para que los reintentos no lo dupliquen).
+        Lanza WriteBehindFull si la cola está llena y no se pudo vaciar.
+        """
+        if len(self._queue) >= self.max_pending and not self._failing:
+            await self.flush()
+        if len(self._queue) >= self.max_pending:
+            self._rejected += 1
+            logging.error(f"Escritura diferida: cola llena ({len(self._queue)} documentos), se rechaza {document.get('sessionId')}")
+            raise WriteBehindFull(f"Hay {len(self._queue)} resultados pendientes de guardar")
+        document.setdefault("_id", ObjectId())
+        self._queue.append(document)
+        self._pending[document["sessionId"]] = document
+        if len(self._queue) >= self.max_batch:
+            self._wake.set()
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Copia del documento pendiente de la sesión, si aún no se guarda."""
+        document = self._pending.get(session_id)
+        return dict(document) if document is not None else None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Guarda la cola en lotes de `max_batch`; lo que falla queda para el próximo intento."""
+        async with self._lock:
+            while self._queue:
+                batch = self._queue[:self.max_batch]
+                retry = []
+                try:
+                    collection = await self._get_collection()
+                    await collection.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # Un _id duplicado significa que el documento ya se guardó en un intento anterior
+                    failed = {error["index"] for error in e.details.get("writeErrors", [])
+                              if error.get("code") != DUPLICATE_KEY_ERROR}
+                    retry = [document for index, document in enumerate(batch) if index in failed]
+                except Exception as e:
+                    logging.error(f"Escritura diferida: error guardando {len(batch)} documentos: {e}")
+                    retry = batch
+                self._flushes += 1
+                self._written += len(batch) - len(retry)
+                self._errors += len(retry)
+
+                retried = {id(document) for document in retry}
+                for document in batch:
+                    if id(document) not in retried and self._pending.get(document["sessionId"]) is document:
+                        del self._pending[document["sessionId"]]
+                self._queue = retry + self._queue[len(batch):]
+                self._failing = bool(retry)
+                if retry:
+                    break
+
+    def stats(self) -> dict:
+        return {
+            "pendientes": len(self._queue),
+            "escrituras": self._flushes,
+            "documentos_guardados": self._written,
+            "errores": self._errors,
+            "rechazados": self._rejected,
+        }
@@ -32,6 +32,26 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
     OPENAI_API_BASE: str | None = os.getenv("OPENAI_API_BASE")
 
+    # Pools de ejecución: hilos para clientes bloqueantes (SMTP, LLM) y procesos para cálculos
+    # y PDFs (0 procesos: el trabajo de CPU usa el pool de hilos)
+    EXECUTOR_THREAD_WORKERS: int = int(os.getenv("EXECUTOR_THREAD_WORKERS", "32"))
+    EXECUTOR_PROCESS_WORKERS: int = int(os.getenv("EXECUTOR_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+    # Escritura diferida de resultados: tamaño de lote, intervalo (s) y máximo en cola
+    WRITE_BEHIND_MAX_BATCH: int = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+    WRITE_BEHIND_FLUSH_SECONDS: float = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "0.5"))
+    WRITE_BEHIND_MAX_PENDING: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+
+    # Cache de respuestas de /api/get_session: máximo de sesiones y vigencia (s)
+    SESSION_CACHE_MAX_ENTRIES: int = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+    SESSION_CACHE_TTL_SECONDS: float = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "600"))
+
+    # Tabla de rentas vitalicias de los cálculos: "expectativa_fija" (cálculo original) o "actuarial"
+    ANNUITY_TABLE: str = os.getenv("ANNUITY_TABLE", "expectativa_fija")
+
+    # Serializar las respuestas de cálculo y de sesión con FastJSONResponse (orjson)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
     # Configuración de frontend
     THEFULLSTACK_FRONTEND_URL: str = os.getenv("THEFULLSTACK_FRONTEND_URL")
     SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -3,13 +3,16 @@ from Cython.Build import cythonize
 
 # Usar ruta relativa para pension_core.py
 pension_core_path = "app/calculator/pension_core.py"
+# Kernel tipado de la acumulación mensual
+pension_kernels_path = "app/calculator/pension_kernels.pyx"
 
 setup(
     name="pensionfi",
     version="0.1.0",
     packages=find_packages(include=['app', 'app.*']),
     ext_modules=cythonize([
-        pension_core_path
+        pension_core_path,
+        pension_kernels_path
     ], compiler_directives={
         'language_level': "3",
         'always_allow_keywords': True
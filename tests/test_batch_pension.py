@@ -0,0 +1,54 @@
+import csv
+import io
+import math
+
+import pytest
+
+from app.calculator.pension_core import calculate_pension_comparison
+from app.scripts.batch_pension import run_batch
+
+PROFILES = [
+    # sessionId, current_age_years, current_age_months, retirement_age, current_balance, monthly_salary, gender
+    ("s0", "40", "6", "65", "10000000", "1000000", "M"),
+    ("s1", "35", "0", "60", "5000000", "abc", "F"),
+    ("s2", "58", "3", "60", "20000000", "1500000", " f "),
+    ("s3", "30", "0", "65", "1000000", "900000", "X"),
+    ("s4", "45", "11", "", "8000000", "1200000", "M"),
+    ("s5", "64", "0", "65", "30000000", "2500000", "M"),
+    ("s6", "25", "0", "65", "0", "600000", "F"),
+]
+COLUMNS = ("sessionId", "current_age_years", "current_age_months", "retirement_age",
+           "current_balance", "monthly_salary", "gender")
+
+
+@pytest.mark.parametrize("chunk_size", [2, 100])
+def test_rows_keep_input_order_and_report_errors(tmp_path, chunk_size):
+    input_path = tmp_path / "perfiles.csv"
+    output_path = tmp_path / "resultados.csv"
+    with open(input_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerows(PROFILES)
+
+    stats = run_batch(input_path, output_path, chunk_size=chunk_size, workers=1, progress=io.StringIO())
+    with open(output_path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+
+    assert stats["perfiles"] == len(PROFILES)
+    assert stats["errores"] == 3
+    assert [row["sessionId"] for row in rows] == [profile[0] for profile in PROFILES]
+    errors = {row["sessionId"]: row["error"] for row in rows if row["error"]}
+    assert errors == {
+        "s1": "monthly_salary: número inválido ('abc')",
+        "s3": "Género debe ser 'M' o 'F'",
+        "s4": "retirement_age: número inválido ('')",
+    }
+    for row, (session_id, years, months, retirement_age, balance, salary, gender) in zip(rows, PROFILES):
+        total = float(row["post_reforma.pension_total"])
+        if session_id in errors:
+            assert math.isnan(total)
+            continue
+        pre, post = calculate_pension_comparison(int(years) + int(months) / 12, float(retirement_age),
+                                                 float(balance), float(salary), gender.strip().upper())
+        assert float(row["pre_reforma.pension_total"]) == pytest.approx(pre[1], rel=1e-9)
+        assert total == pytest.approx(post[1] + post[2] + post[4], rel=1e-9)
@@ -0,0 +1,43 @@
+import pytest
+
+from app.calculator.funds import FUND_ANNUAL_RETURNS, GLIDE_PATH, compare_funds, default_fund
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    calculate_pension_comparison,
+    get_months_from_reform_start,
+)
+
+
+@pytest.mark.parametrize("gender, age, fund", [
+    ("M", 18, "B"), ("M", 35.99, "B"), ("M", 36, "C"), ("M", 55.99, "C"), ("M", 56, "D"), ("M", 80, "D"),
+    ("F", 18, "B"), ("F", 35.99, "B"), ("f", 36, "C"), ("F", 50.99, "C"), ("F", 51, "D"), ("F", 80, "D"),
+])
+def test_default_fund_by_age_and_gender(gender, age, fund):
+    assert default_fund(gender, age) == fund
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+def test_glide_path_matches_monthly_fund_switches(gender):
+    # Cruza los dos cambios de fondo de ambos géneros antes de jubilar
+    current_age, retirement_age, current_balance, monthly_salary = 30 + 5 / 12, 65, 1e7, 1e6
+    post = compare_funds(current_age, retirement_age, current_balance, monthly_salary, gender,
+                         options=(GLIDE_PATH,))[GLIDE_PATH][1]
+
+    months = int((retirement_age - current_age) * 12)
+    individual = REFORM_RATE_SCHEDULE.window("individual", get_months_from_reform_start(), months)
+    balance, salary = current_balance, monthly_salary
+    for month in range(months):
+        growth = (1 + FUND_ANNUAL_RETURNS[default_fund(gender, current_age + month / 12)]) ** (1 / 12)
+        balance = (balance + salary * individual[month]) * growth
+        if month % 3 == 2:
+            salary *= DEFAULT_SCENARIO.quarterly_salary_factor
+    assert post[0] == pytest.approx(balance, rel=1e-10)
+
+
+def test_fund_c_matches_fixed_return_projection():
+    assert FUND_ANNUAL_RETURNS["C"] == DEFAULT_SCENARIO.annual_interest_rate
+    pre, post = compare_funds(40, 65, 1e7, 1e6, "M", options=("C",))["C"]
+    expected_pre, expected_post = calculate_pension_comparison(40, 65, 1e7, 1e6, "M")
+    assert pre == pytest.approx(expected_pre, rel=1e-9)
+    assert post == pytest.approx(expected_post, rel=1e-9, abs=1e-3)
@@ -0,0 +1,45 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from app.calculator.mortality import (
+    LEGACY_ANNUITY_TABLE,
+    LIFE_EXPECTANCY,
+    get_annuity_table,
+)
+
+
+def test_legacy_factor_matches_original_truncation():
+    for gender, expectancy in LIFE_EXPECTANCY.items():
+        for age in (60, 62.5, 65, 67.25):
+            assert LEGACY_ANNUITY_TABLE.factor(gender, age) == int((expectancy - age) * 12)
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+def test_actuarial_life_expectancy_calibrated_at_65(gender):
+    table = get_annuity_table("actuarial")
+    assert table.life_expectancy(gender, 65) == pytest.approx(LIFE_EXPECTANCY[gender], abs=0.01)
+
+
+def test_actuarial_discounted_factor_against_direct_sum():
+    table = get_annuity_table("actuarial")
+    start = 65 * 12
+    # La supervivencia mensual sale de los factores sin descuento: a(x) = 1 + p(x) · a(x + 1)
+    undiscounted = table.factors[0, 0, start:]
+    survival = np.concatenate(([1.0], np.cumprod((undiscounted[:-1] - 1) / undiscounted[1:])))
+    rate = 0.03
+    direct = float(np.sum(survival * (1 + rate) ** (-np.arange(survival.size) / 12)))
+    assert table.factor("M", 65, rate) == pytest.approx(direct, rel=1e-9)
+    # El descuento y la edad reducen el factor; las mujeres viven más
+    assert table.factor("M", 65, 0.05) < table.factor("M", 65, rate) < table.factor("M", 65, 0.0)
+    assert table.factor("M", 70, rate) < table.factor("M", 65, rate) < table.factor("F", 65, rate)
+
+
+def test_named_tables_are_shared_and_pickle_by_name():
+    table = get_annuity_table("actuarial")
+    assert get_annuity_table("actuarial") is table
+    assert pickle.loads(pickle.dumps(table)) is table
+    assert len(pickle.dumps(table)) < 1000
+    with pytest.raises(ValueError):
+        get_annuity_table("desconocida")
@@ -0,0 +1,226 @@
+import random
+
+import pytest
+
+from app.calculator import pension_core
+from app.calculator.mortality import LEGACY_ANNUITY_TABLE
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    _accumulate,
+    _total_pension_post_reform,
+    calculate_future_value,
+    calculate_pension_batch,
+    calculate_pension_post_reform,
+    calculate_pension_pre_reform,
+    f_compensacion_mujeres,
+    f_FAPP_target,
+    f_individual_total,
+    get_months_from_reform_start,
+    iter_post_reform_trajectory,
+    pension_curve_by_retirement_age,
+    simulate_pension_post_reform,
+    solve_extra_monthly_saving,
+    solve_retirement_age,
+    sweep_pension_assumptions,
+)
+
+
+def _monthly_accumulation(current_month_index, months_to_retirement, monthly_salary, scenario):
+    """Proyección mes a mes, como la hacía el cálculo original, para contrastar la forma cerrada."""
+    sums = [0.0] * 6
+    for month in range(months_to_retirement):
+        reform_month_index = current_month_index + month
+        individual = monthly_salary * f_individual_total(reform_month_index)
+        sums[0] += monthly_salary
+        sums[1] = (sums[1] + monthly_salary) * scenario.fund_growth
+        sums[2] += individual
+        sums[3] += monthly_salary * f_compensacion_mujeres(reform_month_index)
+        sums[4] = (sums[4] + individual) * scenario.fund_growth
+        sums[5] = (sums[5] + monthly_salary * f_FAPP_target(reform_month_index)) * scenario.fapp_growth
+        if month % 3 == 2:
+            monthly_salary *= scenario.quarterly_salary_factor
+    return sums
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_accumulate_matches_monthly_loop(monkeypatch, compiled):
+    if compiled and pension_core.pension_kernels is None:
+        pytest.skip("kernel compilado no disponible")
+    if not compiled:
+        monkeypatch.setattr(pension_core, "pension_kernels", None)
+
+    rng = random.Random(2025)
+    offsets = [0, 1, 4, 5, 6, 12, 13, 14, 59, 60, 61, 119, 120, 240, 300, 500, 1000]
+    for _ in range(400):
+        current_month_index = rng.choice(offsets) + rng.randint(0, 2)
+        months_to_retirement = rng.randint(0, 600)
+        monthly_salary = rng.uniform(3e5, 5e6)
+        expected = _monthly_accumulation(current_month_index, months_to_retirement, monthly_salary,
+                                         DEFAULT_SCENARIO)
+        result = _accumulate(current_month_index, months_to_retirement, monthly_salary,
+                             REFORM_RATE_SCHEDULE, DEFAULT_SCENARIO)
+        for value, reference in zip(result, expected):
+            assert value == pytest.approx(reference, rel=1e-12, abs=1e-6)
+
+
+def test_extra_saving_returns_none_after_annuity_horizon():
+    # Jubilando después de la expectativa de vida (86.6) la pensión queda fija en la PGU:
+    # ningún ahorro cierra la brecha y el solver no debe quedarse duplicando para siempre
+    assert solve_extra_monthly_saving(40, 88, 1e7, 1e6, "M", 2e6) is None
+
+
+def test_extra_saving_closes_gap():
+    saving = solve_extra_monthly_saving(40, 65, 1e7, 1e6, "M", 2e6)
+    assert saving is not None and saving > 0
+    assert solve_extra_monthly_saving(40, 65, 1e7, 1e6, "M", 1.0) == 0.0
+
+
+@pytest.mark.parametrize("gender, horizon", [("M", 86.5), ("F", 90 + 8 / 12)])
+def test_legacy_table_horizon(gender, horizon):
+    assert LEGACY_ANNUITY_TABLE.horizon(gender) == pytest.approx(horizon)
+    assert DEFAULT_SCENARIO.annuity_factor(gender, LEGACY_ANNUITY_TABLE.horizon(gender)) >= 1
+
+
+@pytest.mark.parametrize("current_age", [25, 50])
+@pytest.mark.parametrize("salary_volatility", [None, 0.02])
+def test_simulation_mean_matches_deterministic(current_age, salary_volatility):
+    # Rendimientos y sueldos se sortean con media igual al escenario: la media simulada del saldo
+    # debe coincidir con el cálculo determinístico (la pensión no, por la PGU y los topes)
+    balance = calculate_pension_post_reform(current_age, 65, 1e7, 1e6, "M")[0]
+    simulation = simulate_pension_post_reform(current_age, 65, 1e7, 1e6, "M", seed=7,
+                                              salary_volatility=salary_volatility)
+    assert simulation["saldo_cuenta_individual"]["media"] == pytest.approx(balance, rel=0.01)
+    assert simulation["trayectorias"] * int((65 - current_age) * 12) <= pension_core.SIMULATION_MAX_PATH_MONTHS
+
+
+def _random_profiles(count, seed=0):
+    rng = random.Random(seed)
+    profiles = {"current_age": [], "retirement_age": [], "current_balance": [], "monthly_salary": [], "gender": []}
+    for _ in range(count):
+        current_age = rng.randint(18 * 12, 64 * 12) / 12
+        profiles["current_age"].append(current_age)
+        profiles["retirement_age"].append(rng.choice([60, 65, 70]) if current_age < 60 else 70)
+        profiles["current_balance"].append(rng.uniform(0, 1e8))
+        profiles["monthly_salary"].append(rng.uniform(5e5, 5e6))
+        profiles["gender"].append(rng.choice("MF"))
+    return profiles
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_batch_matches_scalar(monkeypatch, compiled):
+    if compiled and pension_core.pension_kernels is None:
+        pytest.skip("kernel compilado no disponible")
+    if not compiled:
+        monkeypatch.setattr(pension_core, "pension_kernels", None)
+    profiles = _random_profiles(50)
+    pre_batch, post_batch = calculate_pension_batch(profiles)
+    for i, args in enumerate(zip(*profiles.values())):
+        for batch_row, single in ((pre_batch[i], calculate_pension_pre_reform(*args)),
+                                  (post_batch[i], calculate_pension_post_reform(*args))):
+            assert batch_row.tolist() == pytest.approx(single, rel=1e-9, abs=1e-3)
+
+
+def test_empty_batch():
+    pre_batch, post_batch = calculate_pension_batch({name: [] for name in _random_profiles(0)})
+    assert pre_batch.shape == post_batch.shape == (0,)
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+def test_sweep_matches_scalar_at_grid_points(gender):
+    grid = {
+        "interest_rates": [0.03, 0.05],
+        "salary_growth_rates": [0.0, 0.02],
+        "inflation_rates": [0.02, 0.04],
+        "equivalent_fund_rates": [0.03, 0.06],
+    }
+    sweep = sweep_pension_assumptions(40, 65, 1e7, 1e6, gender, ideal_pension=8e5, **grid)
+    for i, interest_rate in enumerate(grid["interest_rates"]):
+        for j, salary_growth_rate in enumerate(grid["salary_growth_rates"]):
+            for k, inflation_rate in enumerate(grid["inflation_rates"]):
+                for n, equivalent_fund_rate in enumerate(grid["equivalent_fund_rates"]):
+                    scenario = DEFAULT_SCENARIO.replace(
+                        annual_interest_rate=interest_rate, salary_growth_rate=salary_growth_rate,
+                        inflation_rate=inflation_rate, equivalent_fund_rate=equivalent_fund_rate)
+                    pre = calculate_pension_pre_reform(40, 65, 1e7, 1e6, gender, scenario=scenario)
+                    post = calculate_pension_post_reform(40, 65, 1e7, 1e6, gender, scenario=scenario)
+                    pension_post = post[1] + post[2] + post[4]
+                    target = calculate_future_value(8e5, 25, inflation_rate)
+                    point = {name: values[i, j, k, n] for name, values in sweep.items()}
+                    assert point["saldo_pre_reforma"] == pytest.approx(pre[0], rel=1e-9)
+                    assert point["pension_pre_reforma"] == pytest.approx(pre[1], rel=1e-9)
+                    assert point["saldo_post_reforma"] == pytest.approx(post[0], rel=1e-9)
+                    assert point["pension_post_reforma"] == pytest.approx(pension_post, rel=1e-9)
+                    assert point["brecha_mensual_post_reforma"] == pytest.approx(
+                        max(0, target - pension_post), rel=1e-9, abs=1e-6)
+
+
+def _total_pension(current_age, retirement_age, gender, extra_saving=0.0):
+    """Pensión total post-reforma depositando `extra_saving` al inicio de cada mes hasta la jubilación."""
+    post = calculate_pension_post_reform(current_age, retirement_age, 1e7, 1e6, gender)
+    growth = DEFAULT_SCENARIO.fund_growth
+    months = int((retirement_age - current_age) * 12)
+    deposits = sum(extra_saving * growth ** (months - month) for month in range(months))
+    return _total_pension_post_reform(post[0] + deposits, post[3], retirement_age, gender,
+                                      get_months_from_reform_start())
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+@pytest.mark.parametrize("ideal_pension", [1e6, 2e6])
+def test_extra_saving_root_reproduces_target(gender, ideal_pension):
+    target = calculate_future_value(ideal_pension, 25, DEFAULT_SCENARIO.inflation_rate)
+    saving = solve_extra_monthly_saving(40, 65, 1e7, 1e6, gender, ideal_pension)
+    # El solver devuelve el extremo derecho del intervalo, a menos de $1 de la raíz
+    assert _total_pension(40, 65, gender, saving) == pytest.approx(target, rel=1e-6)
+    assert _total_pension(40, 65, gender, saving - 1) < target
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+@pytest.mark.parametrize("ideal_pension", [3e5, 5e5])
+def test_retirement_age_is_first_month_closing_gap(gender, ideal_pension):
+    def gap(age):
+        return _total_pension(40, age, gender) - calculate_future_value(
+            ideal_pension, age - 40, DEFAULT_SCENARIO.inflation_rate)
+
+    age = solve_retirement_age(40, 60, 1e7, 1e6, gender, ideal_pension)
+    assert 60 < age < 75
+    # La brecha cambia de signo justo en la edad devuelta
+    assert gap(age) >= 0
+    assert gap(age - 1 / 12) < 0
+
+
+def test_retirement_age_out_of_reach():
+    assert solve_retirement_age(40, 65, 1e7, 1e6, "M", 1e7) is None
+    assert solve_retirement_age(40, 65, 1e7, 1e6, "M", 1.0) == 65
+
+
+@pytest.mark.parametrize("step_months, max_points", [(1, None), (12, None), (12, 7), (1, 1)])
+def test_trajectory_ends_at_post_reform_result(step_months, max_points):
+    current_age = 40 + 5 / 12
+    post = calculate_pension_post_reform(current_age, 65, 1e7, 1e6, "M")
+    points = list(iter_post_reform_trajectory(current_age, 65, 1e7, 1e6, step_months, max_points))
+    last = points[-1]
+    assert last.mes == int((65 - current_age) * 12)
+    assert last.saldo_cuenta_individual == pytest.approx(post[0], rel=1e-12)
+    assert last.saldo_FAPP == pytest.approx(post[3], rel=1e-12)
+    if max_points is not None:
+        assert len(points) <= max_points
+    if len(points) > 1:
+        assert points[0].mes == 0 and points[0].saldo_cuenta_individual == 1e7
+
+
+@pytest.mark.parametrize("gender", ["M", "F"])
+def test_curve_matches_scalar_per_retirement_age(gender):
+    current_age = 58 + 7 / 12
+    ages = (60, 62.5, 65, 70, 58)
+    curve = pension_curve_by_retirement_age(current_age, 1e7, 1e6, gender, retirement_ages=ages)
+    assert [point["edad_jubilacion"] for point in curve] == list(ages)
+    for point in curve:
+        args = (current_age, point["edad_jubilacion"], 1e7, 1e6, gender)
+        pre = calculate_pension_pre_reform(*args)
+        post = calculate_pension_post_reform(*args)
+        assert point["pre_reforma"]["saldo_acumulado"] == pytest.approx(pre[0], rel=1e-12)
+        assert point["pre_reforma"]["pension_total"] == pytest.approx(pre[1], rel=1e-12)
+        assert point["post_reforma"]["saldo_cuenta_individual"] == pytest.approx(post[0], rel=1e-12)
+        assert point["post_reforma"]["pension_total"] == pytest.approx(post[1] + post[2] + post[4], rel=1e-12)
+        assert point["post_reforma"]["pgu_aplicada"] == post[10]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    REFORM_RATE_SCHEDULE,
+    _accumulate,
+    get_months_from_reform_start,
+)
+from app.calculator.population import project_population_csv, project_synthetic_population
+
+AFFILIATES = [
+    # current_age, retirement_age, monthly_salary, gender
+    (30.5, 65, 1.2e6, "M"),
+    (59.25, 60, 8e5, "F"),
+    (64.0, 65, 2e6, "M"),
+    (66.0, 65, 9e5, "M"),
+]
+
+
+def _write_csv(tmp_path):
+    path = tmp_path / "afiliados.csv"
+    path.write_text("current_age,retirement_age,monthly_salary,gender\n"
+                    + "".join(f"{age},{retirement},{salary},{gender}\n" for age, retirement, salary, gender in AFFILIATES))
+    return str(path)
+
+
+def test_csv_flows_match_individual_projections(tmp_path):
+    path = _write_csv(tmp_path)
+    flows = project_population_csv(path, horizon_months=480, chunk_size=3, workers=1)
+
+    current_month_index = get_months_from_reform_start()
+    total_salary = total_individual = 0.0
+    for current_age, retirement_age, salary, _ in AFFILIATES:
+        months = max(int((retirement_age - current_age) * 12), 0)
+        accumulation = _accumulate(current_month_index, months, salary, REFORM_RATE_SCHEDULE, DEFAULT_SCENARIO)
+        total_salary += accumulation.total_salary
+        total_individual += accumulation.total_individual_contribution
+
+    assert flows["afiliados"] == len(AFFILIATES)
+    # En el mes 0 cotizan todos los que no se han jubilado
+    assert flows["cotizantes"][0] == 3
+    assert flows["masa_salarial"].sum() == pytest.approx(total_salary, rel=1e-12)
+    assert (flows["aporte_trabajador"] + flows["aporte_empleador_cuenta_individual"]).sum() == pytest.approx(
+        total_individual, rel=1e-12)
+
+
+def test_csv_flows_do_not_depend_on_chunking(tmp_path):
+    path = _write_csv(tmp_path)
+    single = project_population_csv(path, horizon_months=480, chunk_size=1, workers=1)
+    whole = project_population_csv(path, horizon_months=480, chunk_size=len(AFFILIATES), workers=1)
+    for name, values in whole.items():
+        np.testing.assert_allclose(single[name], values, rtol=1e-12)
+
+
+def test_synthetic_population_is_reproducible():
+    flows = project_synthetic_population(1000, seed=3, horizon_months=120, chunk_size=400, workers=1)
+    again = project_synthetic_population(1000, seed=3, horizon_months=120, chunk_size=400, workers=1)
+    np.testing.assert_array_equal(flows["masa_salarial"], again["masa_salarial"])
+    assert flows["afiliados"] == 1000
+    assert flows["cotizantes"][0] <= 1000
@@ -0,0 +1,27 @@
+import pytest
+
+from app.calculator.pension_core import REFORM_RATE_SCHEDULE
+from app.calculator.rate_schedule import RATE_NAMES
+
+
+def _linear_band_rate(bands, month_index):
+    for start, value, slope in reversed(bands):
+        if month_index >= start:
+            return value + slope * (month_index - start), slope
+    return bands[0][1], bands[0][2]
+
+
+@pytest.mark.parametrize("name", RATE_NAMES)
+def test_band_rate_index_matches_linear_walk(name):
+    schedule = REFORM_RATE_SCHEDULE
+    bands = schedule.bands[name]
+    for month_index in range(-3, schedule.horizon + 24):
+        assert schedule.band_rate(name, month_index) == _linear_band_rate(bands, month_index)
+
+
+@pytest.mark.parametrize("name", RATE_NAMES)
+def test_band_rate_agrees_with_expanded_table(name):
+    schedule = REFORM_RATE_SCHEDULE
+    for month_index in range(schedule.horizon):
+        rate, _ = schedule.band_rate(name, month_index)
+        assert rate == pytest.approx(schedule.rate(name, month_index), abs=1e-12)
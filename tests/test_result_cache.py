@@ -0,0 +1,56 @@
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    cached_pension_comparison,
+    calculate_pension_comparison,
+)
+from app.calculator.result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResultCache(maxsize=4, ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expiraciones"] == 1
+    assert cache.stats()["entradas"] == 0
+
+
+def test_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2, ttl=10, clock=FakeClock())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Leer "a" la deja como la más reciente: al llenarse se descarta "b"
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["desalojos"] == 1
+
+
+def test_cached_comparison_matches_calculation():
+    cache = ResultCache()
+
+    def compare(*args, **kwargs):
+        return cached_pension_comparison(*args, cache=cache, **kwargs)
+
+    expected = calculate_pension_comparison(40.0, 65, 1e7, 1e6, "M")
+    assert compare(40.0, 65, 1e7, 1e6, "M") == expected
+    # Misma clave con el género en minúscula y montos iguales al centavo
+    assert compare(40.0, 65, 1e7 + 1e-4, 1e6, "m") == expected
+    assert cache.stats()["aciertos"] == 1
+    # Otro escenario no reutiliza el resultado
+    scenario = DEFAULT_SCENARIO.replace(annual_interest_rate=0.05)
+    assert compare(40.0, 65, 1e7, 1e6, "M", scenario=scenario) == calculate_pension_comparison(
+        40.0, 65, 1e7, 1e6, "M", scenario=scenario)
+    assert cache.stats()["fallos"] == 2
@@ -0,0 +1,46 @@
+import json
+from datetime import timezone
+
+import pytest
+
+from app.calculator.pension_core import (
+    DEFAULT_SCENARIO,
+    calculate_future_value,
+    calculate_pension_batch,
+    calculate_pension_comparison,
+)
+from app.calculator.results import PensionResult
+
+
+def _result(pre_result, post_result):
+    return PensionResult.from_calculation("s", "n", 40.0, "M", 65, 1e7, 1e6, 8e5, pre_result, post_result)
+
+
+def test_batch_and_single_results_serialize_identically():
+    pre_batch, post_batch = calculate_pension_batch({
+        "current_age": [40.0], "retirement_age": [65], "current_balance": [1e7],
+        "monthly_salary": [1e6], "gender": ["M"],
+    })
+    single = _result(*calculate_pension_comparison(40.0, 65, 1e7, 1e6, "M")).to_response()
+    batch = _result(pre_batch.tolist()[0], post_batch.tolist()[0]).to_response()
+    # Mismos tipos (0.0 y no 0 en los aportes del empleador pre-reforma y la compensación de hombres)
+    assert json.dumps(single) == json.dumps(batch)
+    assert single["pre_reforma"]["saldo_acumulado"]["aporte_empleador"] == 0.0
+    assert isinstance(single["post_reforma"]["pension_adicional_compensacion"], float)
+
+
+def test_document_round_trip():
+    result = _result(*calculate_pension_comparison(40.0, 65, 1e7, 1e6, "M"))
+    document = result.to_document()
+    assert PensionResult.from_document(document).to_session_response() == result.to_session_response()
+
+
+def test_target_uses_scenario_inflation():
+    scenario = DEFAULT_SCENARIO.replace(inflation_rate=0.05)
+    pre_result, post_result = calculate_pension_comparison(40.0, 65, 1e7, 1e6, "M", scenario=scenario)
+    result = PensionResult.from_calculation("s", "n", 40.0, "M", 65, 1e7, 1e6, 8e5, pre_result, post_result,
+                                            scenario=scenario)
+    document = result.to_document()
+    assert document["pension_objetivo"]["valor_futuro"] == pytest.approx(calculate_future_value(8e5, 25, 0.05))
+    assert document["pension_objetivo"]["tasa_inflacion_anual"] == 0.05
+    assert document["timestamp"].tzinfo is timezone.utc
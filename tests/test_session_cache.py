@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from app.utils.session_cache import SessionResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    """Carga de MongoDB simulada: cuenta las consultas y puede quedar esperando `release`."""
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.response
+
+
+def _body(response):
+    return json.dumps(response, separators=(",", ":")).encode("utf-8")
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = SessionResponseCache(ttl=10, clock=clock)
+
+    async def run():
+        loader = Loader({"v": "mongo"})
+        cache.put("s", {"v": "guardado"})
+        assert await cache.get_or_load("s", loader) == _body({"v": "guardado"})
+        clock.now = 10.0
+        assert await cache.get_or_load("s", loader) == _body({"v": "mongo"})
+        return loader.calls
+
+    assert asyncio.run(run()) == 1
+
+
+def test_evicts_least_recently_used_session():
+    cache = SessionResponseCache(maxsize=2)
+
+    async def run():
+        loader = Loader({"v": "mongo"})
+        for session_id in ("a", "b", "c"):
+            cache.put(session_id, {"v": session_id})
+        assert await cache.get_or_load("c", loader) == _body({"v": "c"})
+        assert await cache.get_or_load("a", loader) == _body({"v": "mongo"})
+        return loader.calls
+
+    assert asyncio.run(run()) == 1
+    assert cache.stats()["desalojos"] == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SessionResponseCache()
+
+    async def run():
+        loader = Loader({"v": "mongo"})
+        loader.release.clear()
+        requests = [asyncio.ensure_future(cache.get_or_load("s", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert cache.stats()["cargas_en_curso"] == 1
+        # Cancelar una solicitud no cancela la carga de las demás
+        requests[0].cancel()
+        loader.release.set()
+        bodies = await asyncio.gather(*requests[1:])
+        return loader.calls, bodies
+
+    calls, bodies = asyncio.run(run())
+    assert calls == 1
+    assert bodies == [_body({"v": "mongo"})] * 4
+    assert cache.stats()["cargas_en_curso"] == 0
+
+
+def test_missing_session_is_not_cached():
+    cache = SessionResponseCache()
+
+    async def run():
+        loader = Loader(None)
+        assert await cache.get_or_load("s", loader) is None
+        loader.response = {"v": "mongo"}
+        assert await cache.get_or_load("s", loader) == _body({"v": "mongo"})
+        return loader.calls
+
+    assert asyncio.run(run()) == 2
+
+
+def test_load_finishing_after_put_keeps_newer_result():
+    cache = SessionResponseCache()
+
+    async def run():
+        loader = Loader({"v": "antiguo"})
+        loader.release.clear()
+        request = asyncio.ensure_future(cache.get_or_load("s", loader))
+        await asyncio.sleep(0)
+        # Un cálculo nuevo se guarda mientras la lectura de MongoDB sigue en curso
+        cache.put("s", {"v": "nuevo"})
+        loader.release.set()
+        body = await request
+        return body, await cache.get_or_load("s", loader), loader.calls
+
+    body, cached, calls = asyncio.run(run())
+    assert body == cached == _body({"v": "nuevo"})
+    assert calls == 1
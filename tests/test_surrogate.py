@@ -0,0 +1,34 @@
+import pytest
+
+from app.calculator.mortality import get_annuity_table
+from app.calculator.pension_core import DEFAULT_SCENARIO, REFORM_RATE_SCHEDULE
+from app.calculator.rate_schedule import RateSchedule
+from app.calculator.surrogate import generate_surrogate_table, measure_error_bound
+
+
+@pytest.fixture(scope="module")
+def surrogate(tmp_path_factory):
+    path = tmp_path_factory.mktemp("surrogate") / "pension_surrogate.npy"
+    return generate_surrogate_table(path, step_months=3, max_months=600, max_reform_month=120, samples=2000)
+
+
+def test_surrogate_matches_any_annuity_table(surrogate):
+    actuarial = DEFAULT_SCENARIO.replace(annuity_table=get_annuity_table("actuarial"))
+    assert surrogate.matches(REFORM_RATE_SCHEDULE, DEFAULT_SCENARIO)
+    assert surrogate.matches(REFORM_RATE_SCHEDULE, actuarial)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_error_within_stored_bound(surrogate, seed):
+    # Perfiles distintos de los usados al generar la tabla (semilla 0)
+    errors = measure_error_bound(surrogate, samples=200, seed=seed)
+    assert errors.keys() == surrogate.error_bound.keys()
+    for name, error in errors.items():
+        assert error <= surrogate.error_bound[name]
+
+
+def test_rejects_other_schedule_or_scenario(surrogate):
+    assert not surrogate.matches(REFORM_RATE_SCHEDULE, DEFAULT_SCENARIO.replace(annual_interest_rate=0.05))
+    assert not surrogate.matches(REFORM_RATE_SCHEDULE, DEFAULT_SCENARIO.replace(pension_minima=300000))
+    other_schedule = RateSchedule.from_bands("otro", **REFORM_RATE_SCHEDULE.bands)
+    assert not surrogate.matches(other_schedule, DEFAULT_SCENARIO)
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.utils.write_behind import WriteBehindBuffer, WriteBehindFull
+
+
+class DownCollection:
+    def __init__(self):
+        self.calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        raise ConnectionError("MongoDB no responde")
+
+
+def test_put_rejects_when_queue_stays_full():
+    collection = DownCollection()
+
+    async def get_collection():
+        return collection
+
+    async def run():
+        writer = WriteBehindBuffer(get_collection, max_batch=2, flush_interval=10, max_pending=3)
+        for i in range(3):
+            await writer.put({"sessionId": f"s{i}"})
+        # La cola está llena y la escritura falla: se rechaza sin crecer
+        with pytest.raises(WriteBehindFull):
+            await writer.put({"sessionId": "s3"})
+        # Con la última escritura fallida no se vuelve a intentar en cada put
+        with pytest.raises(WriteBehindFull):
+            await writer.put({"sessionId": "s4"})
+        return writer
+
+    writer = asyncio.run(run())
+    assert collection.calls == 1
+    assert writer.stats()["pendientes"] == 3
+    assert writer.stats()["rechazados"] == 2
+    assert writer.get("s3") is None